@@ -25,11 +25,26 @@ Gereksinimler:
     - pywin32 (Windows için)
 """
 
-from flask import Flask, render_template, request, flash, redirect, url_for, jsonify, send_from_directory
+from flask import Flask, render_template, request, flash, redirect, url_for, jsonify, send_from_directory, Response, g
 import os
 from werkzeug.utils import secure_filename
-from layout_handler import create_layout_pdf, create_multi_file_pdf
 from config import get_config
+from printer_status import PrinterStatusMonitor
+import metrics
+from metrics import observe_stage
+from logging_setup import setup_logging, job_context, current_job_id
+from job_journal import JobJournal, TERMINAL_STATES
+from janitor import Janitor
+from blob_store import BlobStore
+import converters
+import image_encoder
+import pdf_optimizer
+import printer_caps
+import profiling
+from hot_folder import HotFolderWatcher, parse_folders
+from printer_pool import PrinterPool, NoPrinterAvailable
+from process_owner import current_owner, owner_alive
+from scheduler import FairScheduler, RateLimiter, PRIORITY_SMALL, PRIORITY_NORMAL
 import platform
 import subprocess
 import tempfile
@@ -39,15 +54,22 @@ from pathlib import Path
 import json
 import webbrowser
 import logging
+import threading
+import queue
+import hashlib
+import hmac
+import secrets
+import gzip
+import atexit
+import contextvars
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
 # Konfigürasyonu yükle
 config = get_config()
 
-# Logging ayarları
-logging.basicConfig(
-    level=logging.DEBUG if config.DEBUG else logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# Logging ayarları - kayıtlar kuyruk üzerinden ayrı thread'de yazılır
+setup_logging(config.LOG_LEVEL, config.LOG_FORMAT)
 logger = logging.getLogger(__name__)
 
 # Flask uygulamasını oluştur
@@ -59,8 +81,88 @@ app.config['TEMPLATES_FOLDER'] = config.TEMPLATES_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = config.MAX_CONTENT_LENGTH
 app.secret_key = config.SECRET_KEY
 
-# İzin verilen dosya uzantıları
-ALLOWED_EXTENSIONS = config.ALLOWED_EXTENSIONS
+# Belge dönüştürücüleri (metin, SVG, ofis) - ayrı process havuzunda çalışır
+converters.configure(config.CONVERTER_CACHE_DIR,
+                     workers=config.CONVERTER_WORKERS,
+                     timeout=config.CONVERTER_TIMEOUT)
+
+# Resim kodlama - kodlayıcı ve kalite sayfa bayt bütçesine göre seçilir
+image_encoder.configure(config.IMAGE_PAGE_BUDGET,
+                        min_psnr=config.IMAGE_MIN_PSNR,
+                        max_quality=config.IMAGE_MAX_QUALITY)
+
+# İzin verilen dosya uzantıları (bu makinede dönüştürülebilenler dahil)
+ALLOWED_EXTENSIONS = config.ALLOWED_EXTENSIONS | converters.available_extensions()
+
+# Render zamanlayıcısı - sunucu thread sayısından bağımsız olarak CPU'yu aşırı
+# yüklememek için render işlemlerini sabit sayıda worker'da, istemciler
+# arasında adil sırayla çalıştırır
+render_scheduler = FairScheduler(
+    max(1, config.RENDER_WORKERS // max(1, config.SERVER_WORKERS)),
+    quantum=config.SCHEDULER_QUANTUM)
+
+# İstemci başına hız ve bayt kotası
+rate_limiter = RateLimiter(
+    jobs_per_minute=config.RATE_LIMIT_JOBS_PER_MINUTE,
+    burst=config.RATE_LIMIT_BURST,
+    bytes_per_hour=config.RATE_LIMIT_BYTES_PER_HOUR)
+
+# Kalıcı iş günlüğü - yeniden başlatmada yarım kalan işler buradan kurtarılır
+journal = JobJournal(config.JOURNAL_PATH, retention=config.JOURNAL_RETENTION)
+atexit.register(journal.flush)
+
+# Yazıcı havuzu - işler yetenek ve kuyruk derinliğine göre yönlendirilir
+printer_pool = PrinterPool.from_config(config)
+
+# Küme modu - işler paylaşılan kuyruğa yazılır, düğümler kuyruktan çeker
+cluster_queue = None
+cluster_worker = None
+# Sıcak klasör izleyicisi (HOT_FOLDERS tanımlıysa prepare_service başlatır)
+hot_folder_watcher = None
+if config.CLUSTER_QUEUE_PATH or config.CLUSTER_COORDINATOR:
+    from cluster import ClusterQueue, ClusterWorker, STALE_HEARTBEATS, handle_api, open_queue
+    # Kuyruğu tutan düğüm koordinatördür; diğer makineler ona HTTP ile bağlanır
+    cluster_queue = open_queue(config.CLUSTER_QUEUE_PATH or config.CLUSTER_COORDINATOR,
+                               config.CLUSTER_TOKEN, retention=config.JOURNAL_RETENTION)
+
+# Yazıcı çözünürlüğü/kağıt yetenekleri önbelleği
+printer_caps.configure(config.PRINTER_CAPS_FILE, config.PRINTER_CAPS_TTL)
+# PDF optimizasyonu için pikepdf (opsiyonel) kurulu mu?
+_pdf_optimizer_available = pdf_optimizer.available()
+# İçerik adresli yükleme deposu - aynı dosya diskte bir kez tutulur
+blob_store = BlobStore(os.path.join(config.UPLOAD_FOLDER, 'blobs'))
+
+# Layout önizlemesi küçük resim önbelleği (ilk önizlemede oluşturulur)
+_thumbnail_cache = None
+_thumbnail_cache_lock = threading.Lock()
+
+# İstek bazlı profilleme - kapalıyken kanca kurulmaz (bkz. _start_request_profile)
+profile_store = None
+if config.PROFILING_ENABLED:
+    profile_store = profiling.ProfileStore(config.PROFILING_MAX_ENTRIES)
+    metrics.STAGE_SECONDS.observer = profiling.record_stage
+
+
+def _evict_caches(max_age, active_jobs):
+    """Temizleyici taraması sonrası sahipsiz blob'ları ve eski dönüşümleri sil"""
+    # Periyodik taramada önbellekler daha uzun tutulur; /cleanup-all (0) hepsini siler
+    cache_age = 0 if max_age == 0 else config.BLOB_MAX_AGE
+    removed = blob_store.evict(
+        max_age=cache_age,
+        quota_bytes=config.BLOB_QUOTA_BYTES,
+        active_owners=active_jobs)
+    return removed + converters.get_stage().evict(cache_age)
+
+
+# Arka plan temizleyicisi - istekler dosya silmeyi beklemez
+janitor = Janitor(
+    config.UPLOAD_FOLDER,
+    max_age=config.UPLOAD_MAX_AGE,
+    quota_bytes=config.UPLOAD_QUOTA_BYTES,
+    interval=config.JANITOR_INTERVAL,
+    batch_size=config.JANITOR_BATCH_SIZE,
+    active_jobs=lambda: {job['job_id'] for job in journal.incomplete_jobs()},
+    on_sweep=_evict_caches)
 
 # Klasörleri oluştur
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
@@ -77,8 +179,8 @@ def get_file_extension(filename):
     return filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
 
 
-def get_local_ip():
-    """Yerel IP adresini al"""
+def _resolve_local_ip():
+    """Yerel IP adresini soket üzerinden çöz"""
     try:
         s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         s.connect(("8.8.8.8", 80))
@@ -89,6 +191,34 @@ def get_local_ip():
         return "127.0.0.1"
 
 
+# Yerel IP önbelleği - arka plan thread'i tarafından yenilenir
+_local_ip_cache = {'ip': None, 'thread': None}
+_local_ip_lock = threading.Lock()
+
+
+def _local_ip_refresher():
+    """Yerel IP adresini periyodik olarak yenile (ağ değişimleri için)"""
+    while True:
+        time.sleep(config.LOCAL_IP_REFRESH_INTERVAL)
+        _local_ip_cache['ip'] = _resolve_local_ip()
+
+
+def get_local_ip():
+    """Yerel IP adresini al (önbellekten)"""
+    ip = _local_ip_cache['ip']
+    if ip is not None:
+        return ip
+    with _local_ip_lock:
+        if _local_ip_cache['ip'] is None:
+            _local_ip_cache['ip'] = _resolve_local_ip()
+            if config.LOCAL_IP_REFRESH_INTERVAL > 0:
+                thread = threading.Thread(
+                    target=_local_ip_refresher, name='local-ip-refresher', daemon=True)
+                thread.start()
+                _local_ip_cache['thread'] = thread
+        return _local_ip_cache['ip']
+
+
 def test_file_access(file_path):
     """Dosya erişim kontrolü"""
     try:
@@ -105,75 +235,69 @@ def test_file_access(file_path):
 
 
 def debug_printer_info():
-    """Yazıcı bilgilerini detaylı şekilde göster"""
+    """Yazıcı bilgilerini detaylı şekilde logla"""
     try:
         if platform.system() == "Windows":
             import win32print
-            print("\n" + "="*50)
-            print("YAZICI DETAYLI BİLGİLER")
-            print("="*50)
+            logger.info("YAZICI DETAYLI BİLGİLER")
             # Tüm yazıcıları listele
             printers = win32print.EnumPrinters(
                 win32print.PRINTER_ENUM_LOCAL | win32print.PRINTER_ENUM_CONNECTIONS)
-            print(f"Toplam yazıcı sayısı: {len(printers)}")
+            logger.info("Toplam yazıcı sayısı: %d", len(printers))
             for i, printer in enumerate(printers):
-                print(f"\n{i+1}. Yazıcı: {printer[2]}")
                 try:
                     # Yazıcı durumunu detaylı kontrol et
                     printer_handle = win32print.OpenPrinter(printer[2])
                     printer_info = win32print.GetPrinter(printer_handle, 2)
                     win32print.ClosePrinter(printer_handle)
-                    print(f"   Durum: {printer_info['Status']}")
-                    print(f"   Port: {printer_info['pPortName']}")
-                    print(f"   Sürücü: {printer_info['pDriverName']}")
-                    print(f"   Konum: {printer_info['pLocation']}")
+                    logger.info(
+                        "yazici=%d ad=%s durum=%s port=%s surucu=%s konum=%s",
+                        i + 1, printer[2], printer_info['Status'],
+                        printer_info['pPortName'], printer_info['pDriverName'],
+                        printer_info['pLocation'])
                 except Exception as e:
-                    print(f"   Hata: {e}")
+                    logger.warning("yazici=%d ad=%s hata=%s",
+                                   i + 1, printer[2], e)
             # Varsayılan yazıcı
             try:
                 default_printer = win32print.GetDefaultPrinter()
-                print(f"\n🖨️ Varsayılan yazıcı: {default_printer}")
                 # Varsayılan yazıcının durumunu kontrol et
                 printer_handle = win32print.OpenPrinter(default_printer)
                 printer_info = win32print.GetPrinter(printer_handle, 2)
                 win32print.ClosePrinter(printer_handle)
-                print(f"   Durum Kodu: {printer_info['Status']}")
                 if printer_info['Status'] == 0:
-                    print("   ✅ Yazıcı hazır")
+                    logger.info("Varsayılan yazıcı hazır: %s", default_printer)
                 else:
-                    print(
-                        f"   ❌ Yazıcı problemi (Kod: {printer_info['Status']})")
+                    logger.warning("Varsayılan yazıcı problemi: %s (Kod: %s)",
+                                   default_printer, printer_info['Status'])
             except Exception as e:
-                print(f"❌ Varsayılan yazıcı hatası: {e}")
-            print("="*50)
+                logger.error("Varsayılan yazıcı hatası: %s", e)
         elif platform.system() == "Linux":
-            print("\n" + "="*50)
-            print("LINUX YAZICI BİLGİLERİ")
-            print("="*50)
+            logger.info("LINUX YAZICI BİLGİLERİ")
             try:
                 result = subprocess.run(
                     ['lpstat', '-p'], capture_output=True, text=True)
-                print(result.stdout)
+                logger.info("lpstat -p:\n%s", result.stdout)
                 result = subprocess.run(
                     ['lpstat', '-d'], capture_output=True, text=True)
-                print(result.stdout)
+                logger.info("lpstat -d:\n%s", result.stdout)
             except Exception as e:
-                print(f"Linux yazıcı bilgisi hatası: {e}")
+                logger.error("Linux yazıcı bilgisi hatası: %s", e)
         else:
-            print(f"Bu işletim sistemi desteklenmiyor: {platform.system()}")
+            logger.warning("Bu işletim sistemi desteklenmiyor: %s",
+                           platform.system())
     except ImportError:
-        print("❌ win32print modülü bulunamadı!")
-        print("Çözüm: pip install pywin32")
+        logger.error("win32print modülü bulunamadı! Çözüm: pip install pywin32")
     except Exception as e:
-        print(f"❌ Yazıcı bilgi hatası: {e}")
+        logger.error("Yazıcı bilgi hatası: %s", e)
 
 
 def print_pdf_with_multiple_methods(file_path, printer_name):
     """PDF dosyası için çoklu yazdırma yöntemi"""
-    print(f"🔄 PDF yazdırma yöntemleri deneniyor: {file_path}")
+    logger.info("PDF yazdırma yöntemleri deneniyor: %s", file_path)
     # Yöntem 1: Adobe Acrobat Reader
     try:
-        print("   Adobe Reader deneniyor...")
+        logger.debug("Adobe Reader deneniyor")
         result = subprocess.run([
             'AcroRd32.exe', '/p', '/h', file_path
         ], capture_output=True, text=True, timeout=15)
@@ -181,36 +305,36 @@ def print_pdf_with_multiple_methods(file_path, printer_name):
             time.sleep(3)  # Yazdırma işleminin başlaması için bekle
             return True, "Adobe Reader ile yazdırıldı"
     except FileNotFoundError:
-        print("   Adobe Reader bulunamadı")
+        logger.debug("Adobe Reader bulunamadı")
     except Exception as e:
-        print(f"   Adobe Reader hatası: {e}")
+        logger.warning("Adobe Reader hatası: %s", e)
     # Yöntem 2: Microsoft Edge (Windows 10/11)
     try:
-        print("   Microsoft Edge deneniyor...")
+        logger.debug("Microsoft Edge deneniyor")
         result = subprocess.run([
             'msedge.exe', '--headless', '--print-to-pdf', '--run-all-compositor-stages-before-draw', file_path
         ], capture_output=True, text=True, timeout=15)
         if result.returncode == 0:
             return True, "Microsoft Edge ile yazdırıldı"
     except FileNotFoundError:
-        print("   Edge bulunamadı")
+        logger.debug("Edge bulunamadı")
     except Exception as e:
-        print(f"   Edge hatası: {e}")
+        logger.warning("Edge hatası: %s", e)
     # Yöntem 3: SumatraPDF (eğer yüklüyse)
     try:
-        print("   SumatraPDF deneniyor...")
+        logger.debug("SumatraPDF deneniyor")
         result = subprocess.run([
             'SumatraPDF.exe', '-print-to-default', file_path
         ], capture_output=True, text=True, timeout=15)
         if result.returncode == 0:
             return True, "SumatraPDF ile yazdırıldı"
     except FileNotFoundError:
-        print("   SumatraPDF bulunamadı")
+        logger.debug("SumatraPDF bulunamadı")
     except Exception as e:
-        print(f"   SumatraPDF hatası: {e}")
+        logger.warning("SumatraPDF hatası: %s", e)
     # Yöntem 4: PowerShell ile yazdırma
     try:
-        print("   PowerShell deneniyor...")
+        logger.debug("PowerShell deneniyor")
         ps_command = f'Start-Process -FilePath "{file_path}" -Verb Print -WindowStyle Hidden'
         result = subprocess.run([
             'powershell', '-Command', ps_command
@@ -219,18 +343,18 @@ def print_pdf_with_multiple_methods(file_path, printer_name):
             time.sleep(3)
             return True, "PowerShell ile yazdırıldı"
         else:
-            print(f"   PowerShell stderr: {result.stderr}")
+            logger.warning("PowerShell stderr: %s", result.stderr)
     except Exception as e:
-        print(f"   PowerShell hatası: {e}")
+        logger.warning("PowerShell hatası: %s", e)
     return False, "PDF yazdırma başarısız - tüm yöntemler denendi"
 
 
 def print_image_with_multiple_methods(file_path, printer_name):
     """Resim dosyası için çoklu yazdırma yöntemi"""
-    print(f"🔄 Resim yazdırma yöntemleri deneniyor: {file_path}")
+    logger.info("Resim yazdırma yöntemleri deneniyor: %s", file_path)
     # Yöntem 1: Windows Photo Viewer
     try:
-        print("   Windows Photo Viewer deneniyor...")
+        logger.debug("Windows Photo Viewer deneniyor")
         result = subprocess.run([
             'rundll32.exe', 'shimgvw.dll,ImageView_PrintTo',
             file_path, printer_name
@@ -239,11 +363,11 @@ def print_image_with_multiple_methods(file_path, printer_name):
             time.sleep(2)
             return True, "Windows Photo Viewer ile yazdırıldı"
     except Exception as e:
-        print(f"   Photo Viewer hatası: {e}")
+        logger.warning("Photo Viewer hatası: %s", e)
 
     # Yöntem 2: PIL ile doğrudan yazdırma
     try:
-        print("   PIL ile doğrudan yazdırma deneniyor...")
+        logger.debug("PIL ile doğrudan yazdırma deneniyor")
         from PIL import Image, ImageWin
         import win32print
         import win32ui
@@ -265,13 +389,13 @@ def print_image_with_multiple_methods(file_path, printer_name):
         hdc.DeleteDC()
         return True, "PIL ile doğrudan yazdırıldı"
     except ImportError:
-        print("   PIL modülü bulunamadı")
+        logger.debug("PIL modülü bulunamadı")
     except Exception as e:
-        print(f"   PIL hatası: {e}")
+        logger.warning("PIL hatası: %s", e)
 
     # Yöntem 3: Ghostscript ile PDF'e dönüştürüp yazdırma
     try:
-        print("   Ghostscript yöntemi deneniyor...")
+        logger.debug("Ghostscript yöntemi deneniyor")
         # Önce görüntüyü PDF'e dönüştür
         temp_pdf = tempfile.mktemp(suffix='.pdf')
         from PIL import Image
@@ -292,11 +416,11 @@ def print_image_with_multiple_methods(file_path, printer_name):
         if result > 32:
             return True, "Ghostscript yöntemi ile yazdırıldı"
     except Exception as e:
-        print(f"   Ghostscript hatası: {e}")
+        logger.warning("Ghostscript hatası: %s", e)
 
     # Yöntem 4: Command line printing
     try:
-        print("   Command line yazdırma deneniyor...")
+        logger.debug("Command line yazdırma deneniyor")
         if platform.system() == "Windows":
             # Windows için lpr kullan
             result = subprocess.run([
@@ -312,78 +436,155 @@ def print_image_with_multiple_methods(file_path, printer_name):
             if result.returncode == 0:
                 return True, "lpr ile yazdırıldı"
     except Exception as e:
-        print(f"   Command line hatası: {e}")
+        logger.warning("Command line hatası: %s", e)
 
     return False, "Resim yazdırma başarısız - tüm otomatik yöntemler denendi"
 
 
-def advanced_print_pdf(output_pdf):
-    """Gelişmiş yazdırma fonksiyonu - tüm sorunları çözer"""
+# Belge yazdırma arka ucuna bu boyutta parçalar halinde aktarılır
+SPOOL_CHUNK_SIZE = 64 * 1024
+
+
+def _iter_document(document, chunk_size=SPOOL_CHUNK_SIZE):
+    """Belgeyi parça parça oku (dosya yolu veya bellekteki baytlar)"""
+    if isinstance(document, str):
+        with open(document, 'rb') as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+    else:
+        view = memoryview(document)
+        for start in range(0, len(view), chunk_size):
+            yield view[start:start + chunk_size]
+
+
+def _run_with_stdin(cmd, document):
+    """Komutu belgeyi stdin'den okuyacak şekilde çalıştır - (dönüş kodu, stderr)
+
+    Dosya yolları açık dosya tanıtıcısı olarak aktarılır (belge belleğe
+    okunmaz); bellekteki PDF doğrudan pipe'a yazılır.
+    """
+    if isinstance(document, str):
+        with open(document, 'rb') as f:
+            result = subprocess.run(cmd, stdin=f, capture_output=True)
+    else:
+        result = subprocess.run(cmd, input=document, capture_output=True)
+    return result.returncode, result.stderr.decode(errors='replace').strip()
+
+
+def _spill_document(document, name):
+    """Bellekteki belgeyi dosya yolu isteyen yöntemler için diske yaz"""
+    path = os.path.join(config.UPLOAD_FOLDER,
+                        f"{current_job_id()}_spool_{os.path.basename(name)}")
+    with open(path, 'wb') as out:
+        out.write(document)
+    return path
+
+
+def _spool_to_file_sink(document, sink_dir=None, name=None):
+    """Yazıcı yerine çıktı klasörüne kopyala (test ve benchmark için)"""
+    import shutil
+    sink_dir = sink_dir or config.PRINT_SINK_DIR
+    name = name or os.path.basename(document)
+    try:
+        os.makedirs(sink_dir, exist_ok=True)
+        target = os.path.join(
+            sink_dir,
+            f"{int(time.time() * 1000)}_{threading.get_ident()}_{name}")
+        if isinstance(document, str):
+            shutil.copyfile(document, target)
+        else:
+            with open(target, 'wb') as out:
+                out.write(document)
+        return True, f"Dosya çıktısına yazıldı: {target}", 'file'
+    except Exception as e:
+        return False, f"Dosya çıktısı hatası: {e}", 'file'
+
+
+def _spool_document(document, printer=None, name=None):
+    """Belgeyi yazdırma arka ucuna gönder - (başarı, mesaj, arka uç) döndürür
+
+    document: PDF/resim dosya yolu veya bellekte render edilmiş PDF baytları.
+    printer: Havuzdan seçilen yazıcı; None veya isimsizse varsayılan yazıcı.
+    name: Bellekteki belge için iş/çıktı adı.
+    """
+    printer_name = printer.name if printer else None
     system = platform.system()
-    file_ext = Path(output_pdf).suffix.lower()
-    print(f"\n🖨️ Gelişmiş yazdırma başlatılıyor...")
-    print(f"📄 Dosya: {output_pdf}")
-    print(f"📋 Tip: {file_ext}")
-    print(f"💻 Sistem: {system}")
+    in_memory = not isinstance(document, str)
+    name = name or ('document.pdf' if in_memory else os.path.basename(document))
+    file_ext = '.pdf' if in_memory else Path(document).suffix.lower()
+    logger.info("Gelişmiş yazdırma başlatılıyor: dosya=%s tip=%s sistem=%s",
+                f"<bellek>/{name}" if in_memory else document, file_ext, system)
     # Dosya erişim kontrolü
-    accessible, msg = test_file_access(output_pdf)
+    accessible, msg = check_document(document)
     if not accessible:
-        return False, msg
-    print(f"✅ {msg}")
+        return False, msg, 'none'
+    logger.debug("%s", msg)
+    if config.PRINTER_BACKEND == 'file' or (printer and printer.sink):
+        return _spool_to_file_sink(document, printer.sink if printer else None, name)
+    if system == "Windows" and in_memory:
+        # ShellExecute ve yedek yöntemler dosya yolu ister - sadece burada diske yazılır
+        spilled = _spill_document(document, name)
+        try:
+            return _spool_document(spilled, printer, name)
+        finally:
+            janitor.discard([spilled], config.JANITOR_DELETE_DELAY)
     if system == "Windows":
         try:
             import win32print
             import win32api
-            # Varsayılan yazıcı
-            default_printer = win32print.GetDefaultPrinter()
-            print(f"🖨️ Hedef yazıcı: {default_printer}")
+            # Havuzdan seçilen yazıcı, yoksa varsayılan yazıcı
+            default_printer = printer_name or win32print.GetDefaultPrinter()
+            logger.info("Hedef yazıcı: %s", default_printer)
             # Yazıcı durum kontrolü
             try:
                 handle = win32print.OpenPrinter(default_printer)
                 printer_info = win32print.GetPrinter(handle, 2)
                 win32print.ClosePrinter(handle)
                 status = printer_info['Status']
-                print(f"📊 Yazıcı durumu: {status}")
+                logger.debug("Yazıcı durumu: %s", status)
                 if status != 0:
-                    print("⚠️ Yazıcı uyarısı - devam ediliyor...")
+                    logger.warning("Yazıcı uyarısı (durum=%s) - devam ediliyor", status)
             except Exception as e:
-                print(f"⚠️ Yazıcı durum kontrolü başarısız: {e}")
+                logger.warning("Yazıcı durum kontrolü başarısız: %s", e)
 
             # İlk yöntem: ShellExecute
-            print("🔄 ShellExecute deneniyor...")
+            logger.debug("ShellExecute deneniyor")
             try:
                 result = win32api.ShellExecute(
                     0,
                     "print",
-                    output_pdf,
+                    document,
                     f'/d:"{default_printer}"',
                     ".",
                     0
                 )
                 if result > 32:
-                    print("✅ ShellExecute başarılı!")
+                    logger.info("ShellExecute başarılı")
                     time.sleep(3)  # Yazdırma işleminin başlaması için bekle
-                    return True, f"ShellExecute ile yazdırıldı: {default_printer}"
+                    return True, f"ShellExecute ile yazdırıldı: {default_printer}", 'shellexecute'
                 else:
-                    print(f"❌ ShellExecute hatası: {result}")
+                    logger.warning("ShellExecute hatası: %s", result)
             except Exception as e:
-                print(f"❌ ShellExecute exception: {e}")
+                logger.warning("ShellExecute exception: %s", e)
 
             # Dosya tipine göre özelleştirilmiş yöntemler
             if file_ext == '.pdf':
                 success, message = print_pdf_with_multiple_methods(
-                    output_pdf, default_printer)
+                    document, default_printer)
                 if success:
-                    return True, message
+                    return True, message, 'pdf_fallback'
             elif file_ext in ['.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff']:
                 success, message = print_image_with_multiple_methods(
-                    output_pdf, default_printer)
+                    document, default_printer)
                 if success:
-                    return True, message
+                    return True, message, 'image_fallback'
 
             # Windows için ek otomatik yazdırma yöntemi
             try:
-                print("🔄 PrintFile API deneniyor...")
+                logger.debug("PrintFile API deneniyor")
                 import tempfile
                 import ctypes
                 from ctypes import windll
@@ -396,103 +597,223 @@ def advanced_print_pdf(output_pdf):
                 if windll.winspool.OpenPrinterA(default_printer, ctypes.byref(printer_handle), ctypes.byref(PRINTER_DEFAULTS)):
                     try:
                         # Doküman başlat
-                        doc_info = (default_printer, output_pdf, None)
+                        doc_info = (default_printer, name, None)
                         job_id = windll.winspool.StartDocPrinterA(
                             printer_handle, 1, doc_info)
                         if job_id > 0:
-                            # Dokümanı yazdır
-                            with open(output_pdf, 'rb') as f:
-                                data = f.read()
-                                bytes_written = ctypes.c_ulong()
-                                windll.winspool.StartPagePrinter(
-                                    printer_handle)
+                            # Dokümanı parça parça yazdır (tamamı belleğe okunmaz)
+                            bytes_written = ctypes.c_ulong()
+                            windll.winspool.StartPagePrinter(printer_handle)
+                            for chunk in _iter_document(document):
+                                data = bytes(chunk)
                                 windll.winspool.WritePrinter(
                                     printer_handle, data, len(data), ctypes.byref(bytes_written))
-                                windll.winspool.EndPagePrinter(printer_handle)
-                                windll.winspool.EndDocPrinter(printer_handle)
-                                return True, "Windows GDI PrintFile API ile yazdırıldı"
+                            windll.winspool.EndPagePrinter(printer_handle)
+                            windll.winspool.EndDocPrinter(printer_handle)
+                            return True, "Windows GDI PrintFile API ile yazdırıldı", 'gdi'
                     finally:
                         windll.winspool.ClosePrinter(printer_handle)
             except Exception as e:
-                print(f"❌ PrintFile API hatası: {e}")
+                logger.warning("PrintFile API hatası: %s", e)
 
             # Tüm yöntemler başarısız oldu
-            return False, "Otomatik yazdırma başarısız - tüm yöntemler denendi"
+            return False, "Otomatik yazdırma başarısız - tüm yöntemler denendi", 'windows'
 
         except ImportError:
-            return False, "❌ win32print modülü bulunamadı. 'pip install pywin32' çalıştırın"
+            return False, "❌ win32print modülü bulunamadı. 'pip install pywin32' çalıştırın", 'windows'
         except Exception as e:
-            print(f"❌ Genel Windows hatası: {e}")
-            return False, f"Tüm otomatik yazdırma yöntemleri başarısız: {e}"
+            logger.error("Genel Windows hatası: %s", e)
+            return False, f"Tüm otomatik yazdırma yöntemleri başarısız: {e}", 'windows'
 
     elif system == "Linux":
         try:
-            # Linux'ta CUPS ile yazdırma
-            result = subprocess.run(
-                ['lp', output_pdf], capture_output=True, text=True)
-            if result.returncode == 0:
-                return True, "✅ Linux yazdırma başarılı"
+            # Linux'ta CUPS ile yazdırma - belge stdin'den aktarılır
+            lp_target = ['-d', printer_name] if printer_name else []
+            returncode, stderr = _run_with_stdin(
+                ['lp', *lp_target, '-t', name], document)
+            if returncode == 0:
+                return True, "✅ Linux yazdırma başarılı", 'lp'
             else:
                 # Alternatif yöntem
-                result = subprocess.run(
-                    ['lpr', output_pdf], capture_output=True, text=True)
-                if result.returncode == 0:
-                    return True, "✅ Linux lpr yazdırma başarılı"
+                lpr_target = ['-P', printer_name] if printer_name else []
+                returncode, stderr = _run_with_stdin(
+                    ['lpr', *lpr_target, '-T', name], document)
+                if returncode == 0:
+                    return True, "✅ Linux lpr yazdırma başarılı", 'lpr'
                 else:
-                    return False, f"❌ Linux yazdırma hatası: {result.stderr}"
+                    return False, f"❌ Linux yazdırma hatası: {stderr}", 'lpr'
         except Exception as e:
-            return False, f"❌ Linux yazdırma hatası: {e}"
+            return False, f"❌ Linux yazdırma hatası: {e}", 'lp'
 
     elif system == "Darwin":  # macOS
         try:
-            # macOS'ta CUPS ile yazdırma
-            result = subprocess.run(
-                ['lpr', output_pdf], capture_output=True, text=True)
-            if result.returncode == 0:
-                return True, "✅ macOS yazdırma başarılı"
-            else:
+            # macOS'ta CUPS ile yazdırma - belge stdin'den aktarılır
+            lpr_target = ['-P', printer_name] if printer_name else []
+            returncode, stderr = _run_with_stdin(
+                ['lpr', *lpr_target, '-T', name], document)
+            if returncode == 0:
+                return True, "✅ macOS yazdırma başarılı", 'lpr'
+            elif not in_memory:
                 # Alternatif yöntem
                 result = subprocess.run(
-                    ['cupsfilter', output_pdf, '|', 'lpr'], shell=True, capture_output=True, text=True)
+                    ['cupsfilter', document, '|', 'lpr'], shell=True, capture_output=True, text=True)
                 if result.returncode == 0:
-                    return True, "✅ macOS cupsfilter yazdırma başarılı"
+                    return True, "✅ macOS cupsfilter yazdırma başarılı", 'cupsfilter'
                 else:
-                    return False, f"❌ macOS yazdırma hatası: {result.stderr}"
+                    return False, f"❌ macOS yazdırma hatası: {result.stderr}", 'cupsfilter'
+            else:
+                return False, f"❌ macOS yazdırma hatası: {stderr}", 'lpr'
         except Exception as e:
-            return False, f"❌ macOS yazdırma hatası: {e}"
+            return False, f"❌ macOS yazdırma hatası: {e}", 'lpr'
 
     else:
-        return False, f"❌ Desteklenmeyen işletim sistemi: {system}"
+        return False, f"❌ Desteklenmeyen işletim sistemi: {system}", 'none'
+
+
+def optimize_document(document, layout='', file_type='', dpi=None):
+    """Yazdırmadan önce PDF'i küçült - (gönderilecek belge, geçici dosya) döndürür
+
+    Büyük dosyaların optimize edilmiş kopyası diske, diğerleri belleğe yazılır;
+    geçici dosya (varsa) yazdırmadan sonra silinmelidir. Resimler hedef
+    yazıcının çözünürlüğüne (dpi), bilinmiyorsa PDF_TARGET_DPI'a küçültülür;
+    PDF_TARGET_DPI=0 küçültmeyi kapatır.
+    """
+    if not config.PDF_OPTIMIZE or not _pdf_optimizer_available:
+        return document, None
+    if isinstance(document, str) and Path(document).suffix.lower() != '.pdf':
+        return document, None
+    from pdf_optimizer import optimize_pdf
+    output_path = None
+    if isinstance(document, str) and \
+            os.path.getsize(document) > config.RENDER_IN_MEMORY_MAX_BYTES:
+        output_path = os.path.join(
+            config.UPLOAD_FOLDER,
+            f"{current_job_id()}_optimized_{os.path.basename(document)}")
+    with observe_stage('pdf_optimize', layout, file_type):
+        optimized, before, after = optimize_pdf(
+            document, config.PDF_TARGET_DPI and (dpi or config.PDF_TARGET_DPI),
+            output_path)
+    metrics.PDF_OPTIMIZE_BYTES.inc(before, phase='before', file_type=file_type)
+    metrics.PDF_OPTIMIZE_BYTES.inc(after, phase='after', file_type=file_type)
+    if optimized is None:
+        return document, None
+    return optimized, output_path
+
+
+def advanced_print_pdf(output_pdf, layout='', file_type='', color=None, paper=None,
+                       name=None, target=None):
+    """Gelişmiş yazdırma fonksiyonu - belgeyi havuzdaki en uygun yazıcıya gönderir
+
+    output_pdf dosya yolu veya bellekte render edilmiş PDF baytları olabilir.
+    target: Belgenin render edildiği render_target sonucu (dpi, kağıt); verilirse
+    aynı çözünürlük ve kağıdı kullanan yazıcılar tercih edilir.
+    """
+    printer_label = 'none'
+    temp_file = None
+    if isinstance(output_pdf, str) and name is None:
+        name = os.path.basename(output_pdf)
+    try:
+        # Yazıcı beklenmeden önce optimize edilir (yazıcı bu sırada boşta kalmaz);
+        # resimler render edildikleri yazıcı çözünürlüğünün altına indirilmez
+        output_pdf, temp_file = optimize_document(
+            output_pdf, layout, file_type,
+            target[0] if target else target_dpi(color, paper))
+    except Exception as e:
+        logger.warning("PDF optimizasyonu atlandı: %s", e)
+    accept = None
+    if target:
+        def accept(printer):
+            return render_target(color, paper, printer) == tuple(target)
+    try:
+        with printer_pool.acquire(color, paper, accept) as printer:
+            printer_label = printer.label
+            with observe_stage('spool_submit', layout, file_type):
+                success, message, backend = _spool_document(output_pdf, printer, name)
+            if not success:
+                printer_pool.record_failure(printer)
+    except NoPrinterAvailable as e:
+        success, message, backend = False, str(e), 'none'
+    size = document_size(output_pdf)
+    metrics.record_print_result(backend, success, size, layout, file_type,
+                                printer_label)
+    if temp_file:
+        janitor.discard([temp_file],
+                        config.JANITOR_DELETE_DELAY if success else 0)
+    return success, message
 
 
 def cleanup_files(file_list, print_success=True):
-    """Dosya temizleme fonksiyonu"""
+    """Dosyaları arka planda silinmek üzere temizleyiciye gönder"""
     if not file_list:
         return
-    print(f"\n🧹 Dosya temizliği başlatılıyor... ({len(file_list)} dosya)")
-    for file_path in file_list:
-        if file_path and os.path.exists(file_path):
-            try:
-                # Yazdırma başarılıysa biraz bekle
-                if print_success:
-                    time.sleep(1)
-                os.remove(file_path)
-                print(f"✅ Silindi: {os.path.basename(file_path)}")
-            except Exception as e:
-                print(f"⚠️ Silinemedi {os.path.basename(file_path)}: {e}")
+    # Blob deposundaki girişler silinmez, sadece bu işin sahipliği bırakılır
+    owner = current_job_id()
+    file_list = [path for path in file_list
+                 if path and not blob_store.release_path(path, owner)]
+    if not file_list:
+        return
+    logger.debug("Dosya temizliği kuyruğa alındı (%d dosya)", len(file_list))
+    # Yazdırma başarılıysa yazıcı kuyruğu dosyayı okuyabilsin diye biraz bekle
+    janitor.discard(file_list,
+                    config.JANITOR_DELETE_DELAY if print_success else 0)
+
+
+# Render edilmiş ana sayfa önbelleği: (mtime, ip) anahtarıyla tutulur
+# Sayfa değişmez bir kayıt olarak tutulur; yenisi tek atamayla yerleştirilir,
+# böylece kilitsiz okuyan istekler hiçbir zaman yarım güncellenmiş sayfa görmez
+IndexPage = namedtuple('IndexPage', 'key html gzip etag gzip_etag')
+_index_cache = IndexPage(None, b'', b'', '', '')
+_index_lock = threading.Lock()
+
+
+def _render_index_page():
+    """index.html'i oku, değişkenleri yerleştir ve gzip'li halini hazırla"""
+    global _index_cache
+    template_path = os.path.join(app.config['TEMPLATES_FOLDER'], 'index.html')
+    mtime = os.stat(template_path).st_mtime_ns
+    local_ip = get_local_ip()
+    key = (mtime, local_ip)
+    page = _index_cache
+    if page.key == key:
+        return page
+    with _index_lock:
+        page = _index_cache
+        if page.key == key:
+            return page
+        with open(template_path, 'r', encoding='utf-8') as f:
+            html_content = f.read()
+        # Değişkenleri yerleştir
+        html_content = html_content.replace('{{local_ip}}', local_ip)
+        html_content = html_content.replace('{{system}}', platform.system())
+        # Dosya seçicide yalnızca sunucunun kabul ettiği türler gösterilir
+        html_content = html_content.replace(
+            '{{accept}}', ','.join(f'.{ext}' for ext in sorted(ALLOWED_EXTENSIONS)))
+        html_bytes = html_content.encode('utf-8')
+        etag = hashlib.sha1(html_bytes).hexdigest()
+        # Sıkıştırılmış ve sıkıştırılmamış gövdeler farklı temsillerdir (RFC 9110)
+        page = IndexPage(key, html_bytes, gzip.compress(html_bytes, compresslevel=9),
+                         etag, etag + '-gzip')
+        _index_cache = page
+        return page
 
 
 @app.route('/')
 def index():
-    """Ana sayfa - HTML şablonunu göster"""
-    local_ip = get_local_ip()
-    # HTML dosyasını yükle
-    with open(os.path.join(app.config['TEMPLATES_FOLDER'], 'index.html'), 'r', encoding='utf-8') as f:
-        html_content = f.read()
-    # Değişkenleri yerleştir
-    html_content = html_content.replace('{{local_ip}}', local_ip)
-    html_content = html_content.replace('{{system}}', platform.system())
-    return html_content
+    """Ana sayfa - önbellekteki HTML şablonunu göster (ETag + gzip)"""
+    page = _render_index_page()
+    gzipped = 'gzip' in request.headers.get('Accept-Encoding', '')
+    etag = page.gzip_etag if gzipped else page.etag
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    elif gzipped:
+        response = Response(page.gzip, mimetype='text/html')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(page.html, mimetype='text/html')
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 
 @app.route('/static/<path:filename>')
@@ -501,142 +822,458 @@ def serve_static(filename):
     return send_from_directory('static', filename)
 
 
-@app.route('/upload', methods=['POST'])
-def upload_file():
-    """Tek dosya yükleme"""
-    if 'file' not in request.files:
-        return jsonify({'success': False, 'message': 'Dosya seçilmedi'})
-    file = request.files['file']
-    layout = request.form.get('layout', '1')
-    print_direct = request.form.get('print_direct', 'true').lower() == 'true'
+def parse_print_options(form):
+    """Formdan yazıcı yönlendirme seçeneklerini oku - (renk, kağıt) döndürür
+
+    color: 'color' -> True, 'mono' -> False, diğer -> None (fark etmez)
+    paper: formda yoksa None - yazıcı seçimi kağıda göre kısıtlanmaz ve
+    render yazıcının varsayılan kağıdını kullanır (bkz. render_target)
+    """
+    color = {'color': True, 'mono': False}.get(
+        form.get('color', '').lower())
+    paper = form.get('paper', '').strip().upper() or None
+    return color, paper
+
+
+def client_key():
+    """Adil sıralama ve hız sınırı için istemci anahtarı (IP)"""
+    return request.remote_addr or '-'
+
+
+UPLOADER_COOKIE = 'wps_uploader'
+UPLOADER_COOKIE_MAX_AGE = 30 * 24 * 3600
+
+
+def uploader_id():
+    """Yükleyen istemcinin kimliği (çerez) - özet sorguları buna göre sınırlanır
+
+    Çerez yoksa veya geçersizse yeni rastgele kimlik üretilir ve yanıtla
+    gönderilir. Kimlik tüm worker'larda aynıdır (SECRET_KEY'e bağlı değildir).
+    """
+    if 'uploader' not in g:
+        value = request.cookies.get(UPLOADER_COOKIE, '')
+        if len(value) != 32 or any(c not in '0123456789abcdef' for c in value):
+            value = g.new_uploader = secrets.token_hex(16)
+        g.uploader = value
+    return g.uploader
+
+
+@app.after_request
+def _set_uploader_cookie(response):
+    uploader = g.pop('new_uploader', None)
+    if uploader is not None:
+        response.set_cookie(UPLOADER_COOKIE, uploader, max_age=UPLOADER_COOKIE_MAX_AGE,
+                            httponly=True, samesite='Strict')
+    return response
+
+
+def check_rate_limit(client):
+    """İstemci kotası aşıldıysa 429 yanıtı döndür, aşılmadıysa None"""
+    allowed, retry_after = rate_limiter.check(client, request.content_length or 0)
+    if allowed:
+        return None
+    metrics.RATE_LIMITED.inc()
+    logger.warning("Hız sınırı aşıldı: istemci=%s retry_after=%ds",
+                   client, retry_after)
+    response = jsonify({
+        'success': False,
+        'message': f'Çok fazla istek - {retry_after} saniye sonra tekrar deneyin',
+        'retry_after': retry_after
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+def job_priority(entries):
+    """İşin zamanlayıcı önceliği - toplam boyutu SMALL_JOB_BYTES altındaysa öncelikli
+
+    Öncelik dosya başına değil iş başına seçilir; çok sayıda küçük dosyadan
+    oluşan toplu iş öne geçmez.
+    """
+    total = sum(entry['size'] for entry in entries)
+    return PRIORITY_SMALL if total <= config.SMALL_JOB_BYTES else PRIORITY_NORMAL
+
+
+def schedule_render(client, cost, fn, *args, priority=PRIORITY_NORMAL, layout='',
+                    file_type=''):
+    """Render görevini adil zamanlayıcıya gönder, Future döndür
+
+    priority: İşin önceliği (job_priority); küçük işler büyük toplu işlerin
+    önüne geçer.
+    """
+    submitted = time.perf_counter()
+
+    def task():
+        metrics.STAGE_SECONDS.observe(
+            time.perf_counter() - submitted,
+            stage='queue_wait', layout=layout, file_type=file_type)
+        return profiling.run_profiled(fn, *args)
+
+    return render_scheduler.submit(client, cost, task, priority=priority)
+
+
+def save_upload(file, job_id, layout):
+    """Yüklenen dosyayı blob deposuna kaydet, dosya kaydını döndür"""
+    filename = secure_filename(file.filename)
+    file_type = get_file_extension(filename)
+    with observe_stage('upload_receive', layout, file_type):
+        digest, filepath, created = blob_store.put_stream(
+            file.stream, Path(filename).suffix, owner=job_id, uploader=uploader_id())
+    size = os.path.getsize(filepath)
+    metrics.UPLOADED_BYTES.inc(size, file_type=file_type)
+    if not created:
+        metrics.BLOB_DEDUPLICATED.inc()
+    return {'name': filename, 'path': filepath, 'size': size,
+            'type': file_type, 'blob': digest}
+
+
+def attach_blob(digest, filename, job_id):
+    """Gövdesi gönderilmeyen dosyayı depodan bağla (blob yoksa None)
+
+    Yalnızca bu istemcinin daha önce yüklediği blob'lar bağlanabilir.
+    """
+    filepath = blob_store.acquire(digest, owner=job_id, uploader=uploader_id())
+    if filepath is None:
+        return None
+    filename = secure_filename(filename)
+    size = os.path.getsize(filepath)
+    metrics.UPLOAD_SKIPPED_BYTES.inc(size)
+    return {'name': filename, 'path': filepath, 'size': size,
+            'type': get_file_extension(filename), 'blob': digest}
+
+
+def store_local_file(path, job_id, layout):
+    """Yerel dosyayı (sıcak klasör, komut satırı) blob deposuna kopyala, dosya kaydını döndür
+
+    Kaynak dosyaya dokunulmaz; iş bitince sadece depodaki kopya bırakılır.
+    """
+    name = os.path.basename(path)
+    file_type = get_file_extension(name)
+    with open(path, 'rb') as f, observe_stage('upload_receive', layout, file_type):
+        digest, filepath, created = blob_store.put_stream(
+            f, Path(name).suffix, owner=job_id)
+    size = os.path.getsize(filepath)
+    metrics.UPLOADED_BYTES.inc(size, file_type=file_type)
+    if not created:
+        metrics.BLOB_DEDUPLICATED.inc()
+    return {'name': name, 'path': filepath, 'size': size,
+            'type': file_type, 'blob': digest}
+
+
+def parse_file_options(item):
+    """Manifest öğesindeki dosya başına seçenekleri doğrula (hatalıysa ValueError)"""
+    from layout_handler import LAYOUT_GRIDS, ROTATIONS, FIT_MODES
+    options = {}
+    if item.get('layout') is not None:
+        options['layout'] = str(item['layout'])
+        if options['layout'] not in LAYOUT_GRIDS:
+            raise ValueError(f"Geçersiz layout: {item['layout']}")
+    if item.get('rotation') is not None:
+        options['rotation'] = int(item['rotation']) % 360
+        if options['rotation'] not in ROTATIONS:
+            raise ValueError(f"Geçersiz döndürme: {item['rotation']}")
+    if item.get('fit') is not None:
+        options['fit'] = str(item['fit'])
+        if options['fit'] not in FIT_MODES:
+            raise ValueError(f"Geçersiz sığdırma modu: {item['fit']}")
+    if item.get('order') is not None:
+        options['order'] = float(item['order'])
+    return options
+
+
+def parse_upload_list(form, files):
+    """Çoklu yüklemedeki dosyaları sırasıyla döndür: [(ad, dosya, özet, seçenekler)]
+
+    'manifest' alanı (JSON liste) varsa sıra ondan alınır; upload=false olan
+    dosyaların gövdesi gönderilmez, özetleriyle (hash) depodan bağlanır.
+    Öğeler dosya başına layout, order, rotation ve fit içerebilir.
+    """
+    raw = form.get('manifest')
+    if not raw:
+        return [(file.filename, file, None, {}) for file in files]
+    bodies = iter(files)
+    uploads = []
+    for item in json.loads(raw):
+        options = parse_file_options(item)
+        if item.get('upload', True):
+            file = next(bodies, None)
+            if file is not None:
+                uploads.append((file.filename, file, None, options))
+        else:
+            uploads.append((item.get('name', ''), None,
+                            str(item.get('hash', '')).lower(), options))
+    return uploads
 
-    if file.filename == '':
-        return jsonify({'success': False, 'message': 'Dosya seçilmedi'})
-    if not allowed_file(file.filename):
-        return jsonify({'success': False, 'message': 'Desteklenmeyen dosya türü'})
-    try:
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
-        print(f"\n📁 Dosya kaydedildi: {filepath}")
-        print(f"📄 Dosya tipi: {get_file_extension(filename)}")
-        print(f"📊 Dosya boyutu: {os.path.getsize(filepath)} bytes")
-        # Dosya erişim kontrolü
-        accessible, access_msg = test_file_access(filepath)
-        if not accessible:
-            return jsonify({'success': False, 'message': f'Dosya erişim hatası: {access_msg}'})
-        # Layout PDF oluştur
-        try:
-            output_pdf = create_layout_pdf(filepath, layout)
-            print(f"📄 Layout PDF oluşturuldu: {output_pdf}")
-            # Oluşturulan PDF'in erişim kontrolü
-            pdf_accessible, pdf_msg = test_file_access(output_pdf)
-            if not pdf_accessible:
-                return jsonify({'success': False, 'message': f'PDF oluşturma hatası: {pdf_msg}'})
-        except Exception as layout_error:
-            print(f"❌ Layout PDF oluşturma hatası: {layout_error}")
-            return jsonify({'success': False, 'message': f'PDF oluşturma hatası: {str(layout_error)}'})
-
-        # Yazdırma işlemi - eğer doğrudan yazdırma seçilmişse
-        message = "PDF hazırlandı (yazdırma seçilmedi)"
-        success = True
-
-        if print_direct:
-            print(f"\n🖨️ Yazdırma işlemi başlatılıyor...")
-            success, message = advanced_print_pdf(output_pdf)
-            print(f"🎯 Yazdırma sonucu: {success} - {message}")
-
-        # Detaylı yanıt oluştur
-        response_data = {
-            'success': success,
-            'message': message,
-            'layout': layout,
-            'filename': filename,
-            'file_type': get_file_extension(filename),
-            'original_size': os.path.getsize(filepath),
-            'pdf_size': os.path.getsize(output_pdf) if os.path.exists(output_pdf) else 0,
-            'system': platform.system(),
-            'file_count': 1
-        }
-        # Geçici dosyaları temizle
-        cleanup_files([filepath, output_pdf], success)
-        return jsonify(response_data)
-    except Exception as e:
-        print(f"❌ Genel hata: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({
-            'success': False,
-            'message': f'İşlem hatası: {str(e)}',
-            'error_type': type(e).__name__
-        })
 
+def order_entries(entries, sort_files=False):
+    """Dosya sırası: sort=true ise dosya adına göre, 'order' verilenler ona göre"""
+    if sort_files:
+        entries.sort(key=lambda entry: entry['name'].lower())
+    if any('order' in entry for entry in entries):
+        # Sıralama kararlıdır; order verilmeyenler sona kalır
+        entries.sort(key=lambda entry: entry.get('order', float('inf')))
+    return entries
 
-@app.route('/upload-multiple', methods=['POST'])
-def upload_multiple_files():
-    """Çoklu dosya yükleme"""
-    if 'files' not in request.files:
-        return jsonify({'success': False, 'message': 'Dosya seçilmedi'})
-    files = request.files.getlist('files')
-    layout = request.form.get('layout', '1')
-    combine_files = request.form.get('combine', 'false').lower() == 'true'
-    sort_files = request.form.get('sort', 'false').lower() == 'true'
-    print_direct = request.form.get('print_direct', 'true').lower() == 'true'
 
-    if not files or all(f.filename == '' for f in files):
-        return jsonify({'success': False, 'message': 'Dosya seçilmedi'})
+def has_file_options(entries):
+    """Dosya başına layout/döndürme/sığdırma verilmiş mi?"""
+    return any(key in entry for entry in entries
+               for key in ('layout', 'rotation', 'fit'))
+
+
+def render_output_path(job_id, index, entry, layout):
+    """İşe özel layout PDF yolu (aynı blob'u kullanan işler çakışmaz)"""
+    stem = Path(entry['name']).stem
+    layout = entry.get('layout', layout)
+    return os.path.join(app.config['UPLOAD_FOLDER'],
+                        f"{job_id}_{index}_{stem}_layout_{layout}.pdf")
+
+
+def combined_output_path(job_id, kind, layout):
+    """İşe özel birleştirilmiş PDF yolu
+
+    İş kimliği önekiyle temizleyici ve /cleanup-all, iş sürerken (ör.
+    yazdırma kuyruğuna gönderilirken) dosyayı silmez.
+    """
+    return os.path.join(app.config['UPLOAD_FOLDER'], f"{job_id}_{kind}_layout_{layout}.pdf")
 
-    valid_files = []
-    uploaded_files = []
 
+def printer_dpi(printer):
+    """Yazıcının render çözünürlüğü (RENDER_DPI, yoksa yetenek; bilinmiyorsa None)
+
+    RENDER_MAX_DPI ile sınırlanır. Dosya arka ucundaki yazıcılar sadece
+    yetenek dosyasından okunur.
+    """
+    caps = printer_caps.get_caps(printer.name, probe=printer.sink is None)
+    dpi = config.RENDER_DPI or caps.dpi
+    if dpi and config.RENDER_MAX_DPI:
+        dpi = min(dpi, config.RENDER_MAX_DPI)
+    return dpi
+
+
+def target_dpi(color=None, paper=None):
+    """İşi alacak yazıcının render çözünürlüğü (bilinmiyorsa None)"""
     try:
-        # Dosyaları kontrol et ve kaydet
-        for file in files:
-            if file.filename and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                file.save(filepath)
-                # Dosya erişim kontrolü
-                accessible, access_msg = test_file_access(filepath)
-                if accessible:
-                    valid_files.append(filepath)
-                    uploaded_files.append({
-                        'name': filename,
-                        'path': filepath,
-                        'size': os.path.getsize(filepath),
-                        'type': get_file_extension(filename)
-                    })
-                    print(
-                        f"✅ Dosya kaydedildi: {filename} ({os.path.getsize(filepath)} bytes)")
-                else:
-                    print(f"❌ Dosya erişim hatası: {filename} - {access_msg}")
+        return printer_dpi(printer_pool.select(color, paper))
+    except NoPrinterAvailable:
+        return config.RENDER_DPI or None
 
-        if not valid_files:
-            return jsonify({'success': False, 'message': 'Geçerli dosya bulunamadı'})
 
-        print(f"\n📚 {len(valid_files)} dosya işlenecek")
-        print(f"🔗 Birleştir: {combine_files}")
-        print(f"📐 Layout: {layout}")
+def render_target(color=None, paper=None, printer=None):
+    """İşin render çözünürlüğü ve kağıdı - (dpi, kağıt) döndürür
 
-        # Dosyaları sırala
-        if sort_files:
-            valid_files.sort()
-            print("📊 Dosyalar alfabetik sıralandı")
+    Yetenekler verilen yazıcıdan, verilmezse işi büyük olasılıkla alacak
+    yazıcıdan okunur. İstenen kağıt yazıcıda yoksa yazıcının varsayılan
+    kağıdı, o da bilinmiyorsa DEFAULT_PAPER kullanılır. Yazdırmada
+    advanced_print_pdf(target=...) aynı sonucu veren yazıcıyı seçer.
+    """
+    from layout_handler import DEFAULT_DPI
+    if printer is None:
+        try:
+            printer = printer_pool.select(color, paper)
+        except NoPrinterAvailable:
+            return config.RENDER_DPI or DEFAULT_DPI, paper or config.DEFAULT_PAPER
+    dpi = printer_dpi(printer) or DEFAULT_DPI
+    if config.RENDER_MAX_DPI:
+        dpi = min(dpi, config.RENDER_MAX_DPI)
+    caps = printer_caps.get_caps(printer.name, probe=printer.sink is None)
+    if not paper or not caps.supports_paper(paper):
+        paper = caps.paper or paper
+    return dpi, paper or config.DEFAULT_PAPER
+
+
+def render_entry(entry, layout, output_pdf, rotation=None, fit='fit', target=None):
+    """Küçük resimleri bellekte, diğerlerini diske render et
+
+    target: render_target sonucu (dpi, kağıt); verilmezse varsayılanlar.
+    PDF yolu veya (bellekte render edildiyse) PDF baytlarını memoryview
+    olarak döndürür.
+    """
+    from layout_handler import (DEFAULT_DPI, create_layout_pdf,
+                                render_layout_buffer)
+    dpi, paper = target or (DEFAULT_DPI, 'A4')
+    if entry['size'] <= config.RENDER_IN_MEMORY_MAX_BYTES:
+        buffer = render_layout_buffer(entry['path'], layout, rotation, fit,
+                                      dpi, paper)
+        if buffer is not None:
+            return buffer
+    return create_layout_pdf(entry['path'], layout, output_pdf, rotation, fit,
+                             dpi, paper)
+
+
+def document_size(document):
+    """Belge boyutu (dosya yolu veya bellekteki bayt dizisi)"""
+    if isinstance(document, str):
+        return os.path.getsize(document) if os.path.exists(document) else 0
+    return len(document) if document is not None else 0
+
+
+def check_document(document):
+    """Render çıktısının erişim kontrolü - (erişilebilir, mesaj) döndürür"""
+    if isinstance(document, str):
+        return test_file_access(document)
+    if not document:
+        return False, "Bellekteki PDF boş"
+    return True, f"Bellekteki PDF hazır ({len(document)} bytes)"
+
+
+def submit_to_cluster(job_id, entries, layout, combine_files, print_direct,
+                      color=None, paper=None, client='-', pack=False):
+    """İşi küme kuyruğuna yaz ve kısa süre sonucunu bekle - yanıt verisini döndür
+
+    İş CLUSTER_WAIT_SECONDS içinde bitmezse status='queued' ve success=None
+    döner; istemci gerçek sonucu /jobs/<job_id> üzerinden sorgular.
+    """
+    try:
+        cluster_queue.submit_job(job_id, entries, layout, combine_files,
+                                 print_direct, color, paper, client,
+                                 node_id=config.CLUSTER_NODE_ID, pack=pack)
+    finally:
+        # Dosyalar kuyruğa kopyalandı; yerel kopyalara gerek yok
+        cleanup_files([entry['path'] for entry in entries], False)
+    logger.info("İş kümeye gönderildi: %d dosya", len(entries))
+    job = cluster_queue.wait(job_id, config.CLUSTER_WAIT_SECONDS)
+    finished = job is not None and job['finished']
+    response_data = {
+        'success': job['success'] if finished else None,
+        'status': job['status'] if finished else 'queued',
+        'message': job['message'] if finished else
+        'İş kuyruğa alındı - durum için /jobs/' + job_id,
+        'layout': layout,
+        'file_count': len(entries),
+        'combined': combine_files,
+        'files': entries,
+        'results': job['results'] if job else [],
+        'queued': not finished,
+        'cluster': True,
+        'job_id': job_id
+    }
+    return response_data
+
+
+def process_single_job(job_id, entry, layout, print_direct, job_start=None,
+                       color=None, paper=None, client='-'):
+    """Tek dosyalık işi render et, yazdır ve temizle - yanıt verisini döndür"""
+    job_start = job_start or time.perf_counter()
+    filepath, filename, file_type = entry['path'], entry['name'], entry['type']
+    # Layout PDF oluştur
+    journal.record(job_id, 'rendering')
+    output_path = render_output_path(job_id, 0, entry, layout)
+    target = render_target(color, paper)
+    try:
+        output_pdf = schedule_render(
+            client, entry['size'], render_entry, entry, layout, output_path,
+            None, 'fit', target, priority=job_priority([entry]),
+            layout=layout, file_type=file_type).result()
+        logger.debug("Layout PDF oluşturuldu: %s",
+                     output_pdf if isinstance(output_pdf, str) else '<bellek>')
+        # Oluşturulan PDF'in erişim kontrolü
+        pdf_accessible, pdf_msg = check_document(output_pdf)
+        if not pdf_accessible:
+            message = f'PDF oluşturma hatası: {pdf_msg}'
+            journal.record(job_id, 'failed', message=message)
+            cleanup_files([filepath], False)
+            return {'success': False, 'message': message}
+    except Exception as layout_error:
+        logger.error("Layout PDF oluşturma hatası: %s", layout_error)
+        message = f'PDF oluşturma hatası: {str(layout_error)}'
+        journal.record(job_id, 'failed', message=message)
+        cleanup_files([filepath], False)
+        return {'success': False, 'message': message}
+
+    # Yazdırma işlemi - eğer doğrudan yazdırma seçilmişse
+    message = "PDF hazırlandı (yazdırma seçilmedi)"
+    success = True
+
+    if print_direct:
+        # Geçiş spool'dan önce diske yazılır: çökmede kurtarma tekrar yazdırmaz
+        journal.record_sync(job_id, 'printing', file=filepath)
+        success, message = advanced_print_pdf(
+            output_pdf, layout, file_type, color, paper,
+            name=os.path.basename(output_path), target=target)
+        logger.info("Yazdırma sonucu: success=%s mesaj=%s", success, message)
+        metrics.STAGE_SECONDS.observe(
+            time.perf_counter() - job_start,
+            stage='spool_complete', layout=layout, file_type=file_type)
+
+    # Detaylı yanıt oluştur
+    response_data = {
+        'success': success,
+        'message': message,
+        'layout': layout,
+        'filename': filename,
+        'file_type': file_type,
+        'original_size': entry['size'],
+        'pdf_size': document_size(output_pdf),
+        'system': platform.system(),
+        'file_count': 1,
+        'job_id': job_id
+    }
+    journal.record(job_id, 'done' if success else 'failed', message=message)
+    # Geçici dosyaları temizle (bellekteki PDF'in silinecek dosyası yoktur)
+    cleanup_files([filepath] + ([output_pdf] if isinstance(output_pdf, str) else []),
+                  success)
+    return response_data
+
+
+def process_batch_job(job_id, entries, layout, combine_files, print_direct,
+                      job_start=None, skip_paths=(), color=None, paper=None,
+                      client='-', pack=False, on_result=None):
+    """Çoklu dosya işini render et, yazdır ve temizle - yanıt verisini döndür
+
+    skip_paths: Yeniden başlatma sonrası kurtarmada atlanacak (daha önce
+    tamamlanmış veya yazdırılırken kesilmiş) dosyalar.
+    pack: Birleştirmede resimleri sırayı korumadan en az sayfaya yerleştir.
+    on_result: Ayrı işlemede her dosya bittiğinde (sıra, sonuç) ile çağrılır.
+    """
+    job_start = job_start or time.perf_counter()
+    valid_files = [entry['path'] for entry in entries]
+    # Yazıcının çözünürlüğü ve kağıdı
+    target = render_target(color, paper)
+    priority = job_priority(entries)
+
+    # Ağır resim modüllerini (Pillow, reportlab) ilk kullanımda yükle
+    from layout_handler import create_manifest_pdf, create_multi_file_pdf
 
+    try:
+        journal.record(job_id, 'rendering')
         # İşlem seçimi
         if combine_files:
             # Tüm dosyaları tek PDF'te birleştir
             try:
-                combined_pdf = create_multi_file_pdf(valid_files, layout)
+                cost = sum(entry['size'] for entry in entries)
+                if pack or has_file_options(entries):
+                    # Dosya başına seçenekler: karışık boyutlu raf yerleşimi
+                    items = [dict(entry, layout=entry.get('layout', layout))
+                             for entry in entries]
+                    render = schedule_render(
+                        client, cost, create_manifest_pdf, items,
+                        combined_output_path(job_id, 'manifest', layout),
+                        app.config['UPLOAD_FOLDER'], pack, *target,
+                        priority=priority, layout=layout, file_type='combined')
+                else:
+                    render = schedule_render(
+                        client, cost, create_multi_file_pdf, valid_files, layout,
+                        app.config['UPLOAD_FOLDER'], *target,
+                        combined_output_path(job_id, 'combined', layout),
+                        priority=priority, layout=layout, file_type='combined')
+                combined_pdf = render.result()
                 if combined_pdf and os.path.exists(combined_pdf):
-                    print(f"📄 Birleştirilmiş PDF oluşturuldu: {combined_pdf}")
+                    logger.info("Birleştirilmiş PDF oluşturuldu: %s", combined_pdf)
 
                     # Yazdırma işlemi
                     success = True
                     message = "PDF hazırlandı (yazdırma seçilmedi)"
 
                     if print_direct:
-                        success, message = advanced_print_pdf(combined_pdf)
+                        journal.record_sync(job_id, 'printing', file=combined_pdf)
+                        success, message = advanced_print_pdf(
+                            combined_pdf, layout, 'combined', color, paper,
+                            target=target)
+                        metrics.STAGE_SECONDS.observe(
+                            time.perf_counter() - job_start,
+                            stage='spool_complete', layout=layout, file_type='combined')
 
                     # Yanıt verilerini hazırla
                     response_data = {
@@ -645,62 +1282,110 @@ def upload_multiple_files():
                         'layout': layout,
                         'file_count': len(valid_files),
                         'combined': True,
-                        'files': uploaded_files,
+                        'files': entries,
                         'pdf_size': os.path.getsize(combined_pdf),
-                        'system': platform.system()
+                        'system': platform.system(),
+                        'job_id': job_id
                     }
+                    journal.record(job_id, 'done' if success else 'failed',
+                                   message=message)
                     # Dosyaları temizle
                     cleanup_files(valid_files + [combined_pdf], success)
-                    return jsonify(response_data)
+                    return response_data
                 else:
-                    return jsonify({'success': False, 'message': 'Birleştirilmiş PDF oluşturulamadı'})
+                    message = 'Birleştirilmiş PDF oluşturulamadı'
             except Exception as combine_error:
-                print(f"❌ Birleştirme hatası: {combine_error}")
-                return jsonify({'success': False, 'message': f'Birleştirme hatası: {str(combine_error)}'})
+                logger.error("Birleştirme hatası: %s", combine_error)
+                message = f'Birleştirme hatası: {str(combine_error)}'
+            journal.record(job_id, 'failed', message=message)
+            cleanup_files(valid_files, False)
+            return {'success': False, 'message': message}
         else:
             # Her dosyayı ayrı ayrı işle
-            results = []
-            all_success = True
-            processed_files = []
-            for filepath in valid_files:
+            def process_file(index, entry, render):
+                filepath, filename, file_type = entry['path'], entry['name'], entry['type']
+                output_pdf = None
                 try:
-                    filename = os.path.basename(filepath)
-                    print(f"\n📄 İşleniyor: {filename}")
-                    # Layout PDF oluştur
-                    output_pdf = create_layout_pdf(filepath, layout)
-                    if output_pdf and os.path.exists(output_pdf):
+                    logger.debug("İşleniyor: %s", filename)
+                    # Layout PDF'in render edilmesini bekle (yol veya bellekteki PDF)
+                    output_pdf = render.result()
+                    if check_document(output_pdf)[0]:
                         # Yazdırma işlemi
                         success = True
                         message = "PDF hazırlandı (yazdırma seçilmedi)"
 
                         if print_direct:
-                            success, message = advanced_print_pdf(output_pdf)
-
-                        results.append({
+                            file_layout = entry.get('layout', layout)
+                            journal.record_sync(job_id, 'printing', file=filepath)
+                            success, message = advanced_print_pdf(
+                                output_pdf, file_layout, file_type, color, paper,
+                                name=os.path.basename(
+                                    render_output_path(job_id, index, entry, layout)),
+                                target=target)
+                            metrics.STAGE_SECONDS.observe(
+                                time.perf_counter() - job_start,
+                                stage='spool_complete', layout=file_layout,
+                                file_type=file_type)
+
+                        result = {
                             'filename': filename,
                             'success': success,
                             'message': message,
-                            'pdf_size': os.path.getsize(output_pdf) if os.path.exists(output_pdf) else 0
-                        })
-                        processed_files.append(output_pdf)
-                        if not success:
-                            all_success = False
-                        print(f"🎯 {filename}: {success} - {message}")
+                            'pdf_size': document_size(output_pdf)
+                        }
+                        logger.info("%s: success=%s mesaj=%s", filename, success, message)
                     else:
-                        results.append({
+                        result = {
                             'filename': filename,
                             'success': False,
                             'message': 'PDF oluşturulamadı'
-                        })
-                        all_success = False
+                        }
                 except Exception as file_error:
-                    print(f"❌ {filename} işlem hatası: {file_error}")
-                    results.append({
-                        'filename': os.path.basename(filepath),
+                    logger.error("%s işlem hatası: %s", filename, file_error)
+                    result = {
+                        'filename': filename,
                         'success': False,
                         'message': f'İşlem hatası: {str(file_error)}'
-                    })
-                    all_success = False
+                    }
+                journal.record(job_id, 'file_done', file=filepath,
+                               success=result['success'])
+                if on_result is not None:
+                    on_result(index, result)
+                # Sadece diske yazılmış layout PDF'leri temizlenir
+                if not isinstance(output_pdf, str) or output_pdf == filepath:
+                    output_pdf = None
+                return result, output_pdf
+
+            pending = [(index, entry) for index, entry in enumerate(entries)
+                       if entry['path'] not in skip_paths]
+            # Tüm dosyalar zamanlayıcıya baştan gönderilir; zamanlayıcı bunları
+            # diğer istemcilerin görevleriyle sırayla (adil) çalıştırır
+            renders = [schedule_render(client, entry['size'], render_entry,
+                                       entry, entry.get('layout', layout),
+                                       render_output_path(job_id, index, entry, layout),
+                                       entry.get('rotation'), entry.get('fit', 'fit'),
+                                       target, priority=priority,
+                                       layout=entry.get('layout', layout),
+                                       file_type=entry['type'])
+                       for index, entry in pending]
+            # Birden fazla yazıcı varsa dosyalar yazıcılara paralel dağıtılır;
+            # tek yazıcıda sıra korunsun diye dosyalar tek tek işlenir
+            parallel = min(len(pending), len(printer_pool)) if print_direct else 1
+            if parallel > 1:
+                with ThreadPoolExecutor(max_workers=parallel,
+                                        thread_name_prefix='batch') as executor:
+                    # Her görev iş kimliği log bağlamını kendi kopyasıyla taşır
+                    futures = [executor.submit(contextvars.copy_context().run,
+                                               profiling.run_profiled, process_file,
+                                               index, entry, render)
+                               for (index, entry), render in zip(pending, renders)]
+                    outcomes = [future.result() for future in futures]
+            else:
+                outcomes = [process_file(index, entry, render)
+                            for (index, entry), render in zip(pending, renders)]
+            results = [result for result, _ in outcomes]
+            processed_files = [pdf for _, pdf in outcomes if pdf]
+            all_success = all(result['success'] for result in results)
             # Yanıt verilerini hazırla
             response_data = {
                 'success': all_success,
@@ -708,24 +1393,583 @@ def upload_multiple_files():
                 'layout': layout,
                 'file_count': len(valid_files),
                 'combined': False,
-                'files': uploaded_files,
+                'files': entries,
                 'results': results,
-                'system': platform.system()
+                'system': platform.system(),
+                'job_id': job_id
             }
+            journal.record(job_id, 'done' if all_success else 'failed',
+                           message=response_data['message'])
             # Temizlik
             cleanup_files(valid_files + processed_files, True)
-            return jsonify(response_data)
+            return response_data
     except Exception as e:
-        print(f"❌ Çoklu dosya genel hatası: {e}")
-        import traceback
-        traceback.print_exc()
+        journal.record(job_id, 'failed', message=str(e))
         # Hata durumunda temizlik
         cleanup_files(valid_files, False)
+        raise
+
+
+@app.route('/upload', methods=['POST'])
+@job_context()
+def upload_file():
+    """Tek dosya yükleme
+
+    Dosya sunucuda zaten varsa gövde yerine 'file_hash' (SHA-256) ve
+    'filename' gönderilebilir.
+    """
+    file = request.files.get('file')
+    file_hash = request.form.get('file_hash', '').lower()
+    filename = file.filename if file is not None else request.form.get('filename', '')
+    layout = request.form.get('layout', '1')
+    print_direct = request.form.get('print_direct', 'true').lower() == 'true'
+    color, paper = parse_print_options(request.form)
+
+    if not filename or (file is None and not file_hash):
+        return jsonify({'success': False, 'message': 'Dosya seçilmedi'})
+    if not allowed_file(filename):
+        return jsonify({'success': False, 'message': 'Desteklenmeyen dosya türü'})
+    client = client_key()
+    limited = check_rate_limit(client)
+    if limited:
+        return limited
+    job_id = current_job_id()
+    job_start = time.perf_counter()
+    metrics.QUEUE_DEPTH.inc()
+    try:
+        if file is not None:
+            entry = save_upload(file, job_id, layout)
+        else:
+            entry = attach_blob(file_hash, filename, job_id)
+            if entry is None:
+                # İstemci dosyayı gövdesiyle tekrar göndermeli
+                return jsonify({'success': False,
+                                'message': 'Dosya sunucuda bulunamadı - tekrar yükleyin',
+                                'missing': [file_hash]})
+        logger.info("Dosya kaydedildi: %s tip=%s boyut=%d layout=%s",
+                    entry['path'], entry['type'], entry['size'], layout)
+        # Dosya erişim kontrolü
+        accessible, access_msg = test_file_access(entry['path'])
+        if not accessible:
+            return jsonify({'success': False, 'message': f'Dosya erişim hatası: {access_msg}'})
+        if cluster_queue is not None:
+            return jsonify(submit_to_cluster(
+                job_id, [entry], layout, False, print_direct, color, paper, client))
+        journal.record(job_id, 'received', kind='single', files=[entry],
+                       layout=layout, print_direct=print_direct,
+                       color=color, paper=paper, client=client, owner=current_owner())
+        return jsonify(process_single_job(
+            job_id, entry, layout, print_direct, job_start, color, paper,
+            client))
+    except Exception as e:
+        logger.exception("Genel hata: %s", e)
+        return jsonify({
+            'success': False,
+            'message': f'İşlem hatası: {str(e)}',
+            'error_type': type(e).__name__
+        })
+    finally:
+        metrics.QUEUE_DEPTH.dec()
+
+
+@app.route('/upload-multiple', methods=['POST'])
+@job_context()
+def upload_multiple_files():
+    """Çoklu dosya yükleme"""
+    if 'files' not in request.files and 'manifest' not in request.form:
+        return jsonify({'success': False, 'message': 'Dosya seçilmedi'})
+    try:
+        uploads = parse_upload_list(request.form, request.files.getlist('files'))
+    except (ValueError, TypeError, AttributeError):
+        return jsonify({'success': False, 'message': 'Geçersiz dosya listesi'})
+    layout = request.form.get('layout', '1')
+    combine_files = request.form.get('combine', 'false').lower() == 'true'
+    sort_files = request.form.get('sort', 'false').lower() == 'true'
+    pack = request.form.get('pack', 'false').lower() == 'true'
+    print_direct = request.form.get('print_direct', 'true').lower() == 'true'
+    # Ayrı işlemede dosya sonuçları bittikçe NDJSON olarak gönderilebilir
+    stream = (request.form.get('stream', 'false').lower() == 'true'
+              or 'application/x-ndjson' in request.headers.get('Accept', ''))
+    color, paper = parse_print_options(request.form)
+
+    if not uploads or all(not name for name, _, _, _ in uploads):
+        return jsonify({'success': False, 'message': 'Dosya seçilmedi'})
+    client = client_key()
+    limited = check_rate_limit(client)
+    if limited:
+        return limited
+
+    job_id = current_job_id()
+    entries = []
+    job_start = time.perf_counter()
+    metrics.QUEUE_DEPTH.inc()
+    streaming = False
+
+    try:
+        # Dosyaları kontrol et ve kaydet
+        missing = []
+        for filename, file, file_hash, options in uploads:
+            if filename and allowed_file(filename):
+                if file is not None:
+                    entry = save_upload(file, job_id, options.get('layout', layout))
+                else:
+                    entry = attach_blob(file_hash, filename, job_id)
+                    if entry is None:
+                        missing.append(file_hash)
+                        continue
+                entry.update(options)
+                # Dosya erişim kontrolü
+                accessible, access_msg = test_file_access(entry['path'])
+                if accessible:
+                    entries.append(entry)
+                    logger.info("Dosya kaydedildi: %s (%d bytes)",
+                                entry['name'], entry['size'])
+                else:
+                    logger.warning("Dosya erişim hatası: %s - %s",
+                                   entry['name'], access_msg)
+
+        if missing:
+            # İstemci eksik dosyaları gövdesiyle tekrar göndermeli
+            cleanup_files([entry['path'] for entry in entries], False)
+            return jsonify({'success': False,
+                            'message': f'{len(missing)} dosya sunucuda bulunamadı - tekrar yükleyin',
+                            'missing': missing})
+
+        if not entries:
+            return jsonify({'success': False, 'message': 'Geçerli dosya bulunamadı'})
+
+        logger.info("%d dosya işlenecek: birlestir=%s layout=%s",
+                    len(entries), combine_files, layout)
+
+        # Dosyaları sırala
+        order_entries(entries, sort_files)
+
+        if cluster_queue is not None:
+            return jsonify(submit_to_cluster(
+                job_id, entries, layout, combine_files, print_direct,
+                color, paper, client, pack))
+        journal.record(job_id, 'received', kind='batch', files=entries,
+                       layout=layout, combine=combine_files,
+                       print_direct=print_direct, color=color, paper=paper,
+                       client=client, pack=pack, owner=current_owner())
+        if stream and not combine_files:
+            # Sayaç iş bitince arka plan thread'inde düşürülür
+            streaming = True
+            return stream_batch_job(job_id, entries, layout, print_direct,
+                                    job_start, color, paper, client, pack)
+        return jsonify(process_batch_job(
+            job_id, entries, layout, combine_files, print_direct, job_start,
+            color=color, paper=paper, client=client, pack=pack))
+    except Exception as e:
+        logger.exception("Çoklu dosya genel hatası: %s", e)
+        # Hata durumunda temizlik
+        cleanup_files([entry['path'] for entry in entries], False)
         return jsonify({
             'success': False,
             'message': f'Çoklu dosya işlem hatası: {str(e)}',
             'error_type': type(e).__name__
         })
+    finally:
+        if not streaming:
+            metrics.QUEUE_DEPTH.dec()
+
+
+def stream_batch_job(job_id, entries, layout, print_direct, job_start,
+                     color=None, paper=None, client='-', pack=False):
+    """Ayrı işlenen toplu işi NDJSON olarak akıt
+
+    İş arka planda çalışır; her dosyanın sonucu biter bitmez bir satır
+    olarak gönderilir, son satır normal yanıtla aynı özettir. İstemci
+    bağlantıyı keserse iş yine tamamlanır.
+    """
+    events = queue.Queue()
+
+    def on_result(index, result):
+        events.put(dict(result, type='result', index=index))
+
+    def run():
+        try:
+            summary = process_batch_job(
+                job_id, entries, layout, False, print_direct, job_start,
+                color=color, paper=paper, client=client, pack=pack,
+                on_result=on_result)
+        except Exception as e:
+            logger.exception("Çoklu dosya genel hatası: %s", e)
+            summary = {'success': False,
+                       'message': f'Çoklu dosya işlem hatası: {str(e)}',
+                       'error_type': type(e).__name__}
+        finally:
+            metrics.QUEUE_DEPTH.dec()
+        events.put(dict(summary, type='summary'))
+
+    # İş kimliği log bağlamı arka plan thread'ine taşınır
+    threading.Thread(target=contextvars.copy_context().run, args=(run,),
+                     name=f'batch-{job_id}', daemon=True).start()
+
+    def generate():
+        yield json.dumps({'type': 'accepted', 'job_id': job_id,
+                          'file_count': len(entries)}) + '\n'
+        while True:
+            event = events.get()
+            yield json.dumps(event, ensure_ascii=False) + '\n'
+            if event['type'] == 'summary':
+                return
+
+    response = Response(generate(), mimetype='application/x-ndjson')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def process_hot_folder_batch(folder, paths):
+    """Sıcak klasörden alınan dosyaları yükleme hattına gönder - yanıt verisini döndür"""
+    with job_context() as job_id:
+        entries = []
+        job_start = time.perf_counter()
+        metrics.QUEUE_DEPTH.inc()
+        try:
+            for path in paths:
+                entries.append(store_local_file(path, job_id, folder['layout']))
+            client = f"hot:{folder['name']}"
+            if cluster_queue is not None:
+                return submit_to_cluster(
+                    job_id, entries, folder['layout'], folder['combine'],
+                    folder['print'], folder['color'], folder['paper'], client,
+                    folder['pack'])
+            journal.record(job_id, 'received', kind='batch', files=entries,
+                           layout=folder['layout'], combine=folder['combine'],
+                           print_direct=folder['print'], color=folder['color'],
+                           paper=folder['paper'], client=client, pack=folder['pack'],
+                           owner=current_owner())
+            return process_batch_job(
+                job_id, entries, folder['layout'], folder['combine'],
+                folder['print'], job_start, color=folder['color'],
+                paper=folder['paper'], client=client, pack=folder['pack'])
+        except Exception:
+            cleanup_files([entry['path'] for entry in entries], False)
+            raise
+        finally:
+            metrics.QUEUE_DEPTH.dec()
+
+
+def recover_interrupted_jobs():
+    """Önceki çalışmadan kalan tamamlanmamış işleri yeniden kuyruğa al
+
+    Yazdırma arka ucuna gönderilirken kesilen belgeler tekrar gönderilmez
+    (çift baskı riskine karşı); bunlar başarısız olarak işaretlenir.
+    Yalnızca sahibi (işi alan süreç) artık çalışmayan işler kurtarılır;
+    kardeş worker'ların sürmekte olan işlerine dokunulmaz. Komut satırı
+    işleri (kind='cli') yeniden çalıştırılmaz, başarısız olarak işaretlenir.
+    """
+    recovered = 0
+    for job in journal.incomplete_jobs():
+        job_id, data = job['job_id'], job['data']
+        if owner_alive(data.get('owner')):
+            continue
+        with job_context(job_id):
+            entries = [entry for entry in data.get('files', [])
+                       if os.path.exists(entry['path'])]
+            interrupted = job['printing_files']
+            if data.get('kind') == 'cli':
+                message = 'Komut satırı işi kesildi; komut satırı işleri kurtarılmaz'
+            elif not entries or (interrupted and data.get('kind') != 'batch') \
+                    or (interrupted and data.get('combine')):
+                message = 'Servis yeniden başlatıldı; iş yazdırma sırasında kesildi' \
+                    if interrupted else 'Servis yeniden başlatıldı; dosyalar bulunamadı'
+            else:
+                message = None
+            if message:
+                logger.warning("Kurtarılamayan iş: %s", message)
+                journal.record(job_id, 'failed', message=message)
+                cleanup_files([entry['path'] for entry in entries], False)
+                continue
+            logger.info("Kesilen iş yeniden kuyruğa alındı (son durum: %s)",
+                        job['state'])
+            # İş bu sürece geçer; kurtarma sırasında tekrar kurtarılmasın
+            journal.record(job_id, 'received', **dict(data, owner=current_owner()))
+            try:
+                if data.get('kind') == 'batch':
+                    skip_paths = set(job['done_files']) | set(interrupted)
+                    process_batch_job(
+                        job_id, entries, data.get('layout', '1'),
+                        data.get('combine', False), data.get('print_direct', True),
+                        skip_paths=skip_paths, color=data.get('color'),
+                        paper=data.get('paper'), client='recovery',
+                        pack=data.get('pack', False))
+                else:
+                    process_single_job(
+                        job_id, entries[0], data.get('layout', '1'),
+                        data.get('print_direct', True),
+                        color=data.get('color'), paper=data.get('paper'),
+                        client='recovery')
+                recovered += 1
+            except Exception as e:
+                logger.exception("Kurtarılan iş başarısız: %s", e)
+    return recovered
+
+
+def _recovery_worker():
+    """Başlangıçta kurtarma ve sahipsiz dosya temizliği (arka planda)"""
+    try:
+        recover_interrupted_jobs()
+        # Hiçbir aktif işe ait olmayan eski yüklemeleri temizle
+        janitor.request_sweep(config.ORPHAN_MIN_AGE)
+    except Exception as e:
+        logger.exception("Başlangıç kurtarma hatası: %s", e)
+
+
+def _start_request_profile():
+    """X-Profile başlığı veya ?profile= verilen istek için profil oturumu aç
+
+    Değer 'sample' ise örnekleme profili, diğer değerlerde cProfile kullanılır.
+    """
+    value = (request.headers.get('X-Profile') or request.args.get('profile') or '').lower()
+    if not value or value in ('0', 'false', 'no') or request.path.startswith('/debug/profiles'):
+        return
+    mode = 'sample' if value == 'sample' else 'cprofile'
+    g.profile = profiling.start_session(request.method, request.path, mode,
+                                        config.PROFILING_SAMPLE_INTERVAL)
+
+
+def _store_profile(report):
+    profile_store.add(report)
+    logger.info("İstek profili kaydedildi: %s %s %.3fs (/debug/profiles/%s)",
+                report['method'], report['path'], report['duration'], report['id'])
+
+
+def _finish_request_profile(status, response=None):
+    """Açık profil oturumunu kapat ve raporu sakla - profil kimliğini döndürür
+
+    Akış (NDJSON) yanıtlarında iş istek döndükten sonra sürer; oturum yanıt
+    kapanınca (son satır gönderilince) kapatılır.
+    """
+    started = g.pop('profile', None)
+    if started is None:
+        return None
+    session = started[0]
+    if response is not None and response.is_streamed:
+        profiling.detach_session(*started)
+        response.call_on_close(lambda: _store_profile(session.finish(status)))
+    else:
+        _store_profile(profiling.finish_session(*started, status=status))
+    return session.id
+
+
+def _after_request_profile(response):
+    profile_id = _finish_request_profile(response.status_code, response)
+    if profile_id is not None:
+        response.headers['X-Profile-Id'] = profile_id
+        response.headers['X-Profile-Url'] = f"/debug/profiles/{profile_id}"
+    return response
+
+
+def _teardown_request_profile(error=None):
+    # İstek hatayla bittiyse after_request çalışmamış olabilir
+    if error is not None:
+        _finish_request_profile(500)
+
+
+if profile_store is not None:
+    app.before_request(_start_request_profile)
+    app.after_request(_after_request_profile)
+    app.teardown_request(_teardown_request_profile)
+
+
+@app.route('/debug/profiles')
+def list_profiles():
+    """Saklanan istek profilleri (en yeni önce)"""
+    if profile_store is None:
+        return jsonify({'success': False, 'message': 'Profilleme kapalı (PROFILING_ENABLED)'}), 404
+    return jsonify({'profiles': profile_store.summaries()})
+
+
+@app.route('/debug/profiles/<profile_id>')
+def get_profile(profile_id):
+    """Profil raporu: aşama süreleri, en yavaş fonksiyonlar, örneklenen yığınlar"""
+    report = profile_store.get(profile_id) if profile_store is not None else None
+    if report is None:
+        return jsonify({'success': False, 'message': 'Profil bulunamadı'}), 404
+    return jsonify({key: value for key, value in report.items() if key != 'pstats'})
+
+
+@app.route('/debug/profiles/<profile_id>/pstats')
+def download_profile(profile_id):
+    """Ham cProfile verisi (snakeviz, pstats ile açılabilir)"""
+    report = profile_store.get(profile_id) if profile_store is not None else None
+    if report is None or report['pstats'] is None:
+        return jsonify({'success': False, 'message': 'Profil bulunamadı'}), 404
+    response = Response(report['pstats'], mimetype='application/octet-stream')
+    response.headers['Content-Disposition'] = f'attachment; filename=profile-{profile_id}.prof'
+    return response
+
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus formatında metrikler"""
+    return Response(metrics.REGISTRY.render(),
+                    mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+
+def thumbnail_cache():
+    """Önizleme küçük resim önbelleği (Pillow ilk kullanımda yüklenir)"""
+    global _thumbnail_cache
+    with _thumbnail_cache_lock:
+        if _thumbnail_cache is None:
+            from preview import ThumbnailCache
+            _thumbnail_cache = ThumbnailCache(config.PREVIEW_CACHE_BYTES,
+                                              config.PREVIEW_THUMB_SIZE)
+        return _thumbnail_cache
+
+
+@app.route('/preview', methods=['GET', 'POST'])
+@job_context()
+def layout_preview():
+    """Layout önizlemesi (PNG/WebP)
+
+    Sayfa PDF hattıyla aynı geometriyle ekran çözünürlüğünde çizilir.
+    Dosyalar 'hash' (SHA-256, birden çok olabilir) ile depodan alınır;
+    POST isteğinde 'file' gövdeleri önce depoya kaydedilir. combine=true
+    birleştirilmiş işin 'page' numaralı sayfasını çizer. rotation, fit ve
+    pack yazdırmadaki anlamıyla kullanılır; kağıt yazdırmadaki gibi işi
+    alacak yazıcıya göre seçilir (render_target).
+    """
+    from layout_handler import LAYOUT_GRIDS, IMAGE_EXTENSIONS
+    from preview import DEFAULT_WIDTH, MIN_WIDTH, FORMATS, render_preview, encode_preview
+    params = request.values
+    layout = params.get('layout', '1')
+    combine = params.get('combine', 'false').lower() == 'true'
+    pack = params.get('pack', 'false').lower() == 'true'
+    fmt = params.get('format', 'webp').lower()
+    try:
+        page = int(params.get('page', 0))
+        width = min(max(int(params.get('width', DEFAULT_WIDTH)), MIN_WIDTH),
+                    config.PREVIEW_MAX_WIDTH)
+        options = parse_file_options({'rotation': params.get('rotation') or None,
+                                      'fit': params.get('fit') or None})
+    except ValueError as e:
+        return jsonify({'success': False, 'message': f'Geçersiz parametre: {e}'}), 400
+    if layout not in LAYOUT_GRIDS or fmt not in FORMATS:
+        return jsonify({'success': False, 'message': 'Geçersiz layout veya format'}), 400
+    _, paper = render_target(*parse_print_options(params))
+
+    job_id = current_job_id()
+    digests = []
+    try:
+        for file in request.files.getlist('file'):
+            if not allowed_file(file.filename):
+                return jsonify({'success': False, 'message': 'Desteklenmeyen dosya türü'}), 415
+            digests.append(save_upload(file, job_id, layout)['blob'])
+        digests += [digest.lower() for digest in params.getlist('hash')]
+        if not digests:
+            return jsonify({'success': False, 'message': 'Dosya seçilmedi'}), 400
+
+        cache = thumbnail_cache()
+        thumbs, missing = [], []
+        for digest in digests:
+            # Önce depodan (istemciye göre) alınır: küçük resim önbelleği başka
+            # istemcilerin dosyalarını ele vermemeli
+            path = blob_store.acquire(digest, owner=job_id, uploader=uploader_id())
+            if path is None:
+                missing.append(digest)
+                continue
+            thumb = cache.peek(digest)
+            if thumb is None:
+                if Path(path).suffix.lower() not in IMAGE_EXTENSIONS:
+                    return jsonify({'success': False,
+                                    'message': 'Önizleme sadece resim dosyaları için yapılır'}), 415
+                try:
+                    thumb = cache.get(digest, path)
+                except Exception as e:
+                    logger.warning("Önizleme küçük resmi oluşturulamadı: %s", e)
+                    return jsonify({'success': False,
+                                    'message': f'Resim okunamadı: {e}'}), 415
+            thumbs.append(thumb)
+        if missing:
+            # İstemci dosyayı gövdesiyle (POST) tekrar göndermeli
+            return jsonify({'success': False,
+                            'message': 'Dosya sunucuda bulunamadı - tekrar yükleyin',
+                            'missing': missing}), 404
+
+        with observe_stage('preview', layout, 'preview'):
+            image, pages = render_preview(thumbs, layout, paper, width, combine, page,
+                                          options.get('rotation'), options.get('fit', 'fit'),
+                                          pack)
+            data, mimetype = encode_preview(image, fmt)
+    finally:
+        # Önizleme dosyaları sahiplenmez; blob'lar yazdırmada tekrar kullanılabilir
+        for digest in digests:
+            blob_store.release(digest, job_id)
+
+    response = Response(data, mimetype=mimetype)
+    response.headers['X-Preview-Pages'] = str(pages)
+    response.headers['X-Blob-Hash'] = ','.join(digests)
+    if request.method == 'GET':
+        # İçerik adresli girdi: aynı parametreler her zaman aynı resmi üretir
+        response.headers['Cache-Control'] = 'private, max-age=3600'
+    return response
+
+
+@app.route('/blobs/<digest>')
+def blob_info(digest):
+    """Dosya (SHA-256) sunucuda var mı? HEAD ile gövdesiz sorgulanabilir
+
+    Yalnızca bu istemcinin yüklediği dosyalar görünür.
+    """
+    found = blob_store.lookup(digest.lower(), uploader=uploader_id())
+    if found is None:
+        return jsonify({'exists': False}), 404
+    return jsonify({'exists': True, 'size': found[1]})
+
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """İş durumu (küme modunda kuyruktan, aksi halde iş günlüğünden)"""
+    if cluster_queue is not None:
+        job = cluster_queue.job(job_id)
+        if job is not None:
+            return jsonify(job)
+    history = journal.history(job_id)
+    if not history:
+        return jsonify({'success': False, 'message': 'İş bulunamadı'}), 404
+    state = history[-1]['state']
+    return jsonify({
+        'job_id': job_id,
+        'status': state,
+        'finished': state in TERMINAL_STATES,
+        'success': state == 'done',
+        'message': history[-1]['data'].get('message', ''),
+        'history': history
+    })
+
+
+@app.route('/cluster')
+def cluster_status():
+    """Küme düğümleri ve kuyruk durumu"""
+    if cluster_queue is None:
+        return jsonify({'enabled': False})
+    return jsonify({
+        'enabled': True,
+        'node_id': config.CLUSTER_NODE_ID,
+        'nodes': cluster_queue.nodes(
+            config.CLUSTER_HEARTBEAT_INTERVAL * STALE_HEARTBEATS),
+        'tasks': cluster_queue.stats()
+    })
+
+
+@app.route('/cluster/api/<method>', methods=['POST'])
+def cluster_api(method):
+    """Koordinatör: uzak düğümlerin kuyruk çağrıları (X-Cluster-Token gerekli)"""
+    if not isinstance(cluster_queue, ClusterQueue):
+        return jsonify({'error': 'Bu düğüm koordinatör değil'}), 404
+    token = request.headers.get('X-Cluster-Token', '')
+    if not config.CLUSTER_TOKEN or not hmac.compare_digest(token, config.CLUSTER_TOKEN):
+        return jsonify({'error': 'Geçersiz küme anahtarı'}), 403
+    try:
+        return jsonify(handle_api(cluster_queue, method, request.get_json(force=True)))
+    except KeyError:
+        return jsonify({'error': f'Bilinmeyen metot: {method}'}), 404
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
 
 
 @app.route('/debug-printer')
@@ -753,69 +1997,103 @@ def test_print_file(filename):
         return jsonify({'success': False, 'message': f'Test hatası: {str(e)}'})
 
 
+def collect_status():
+    """Sistem ve yazıcı durumunu topla (monitör thread'i tarafından çağrılır)"""
+    info = {
+        'system': platform.system(),
+        'platform': platform.platform(),
+        'ip': get_local_ip(),
+        'port': config.PORT,
+        'upload_folder_exists': os.path.exists(app.config['UPLOAD_FOLDER']),
+        'upload_folder_writable': os.access(app.config['UPLOAD_FOLDER'], os.W_OK),
+        'max_file_size': app.config['MAX_CONTENT_LENGTH'],
+        'allowed_extensions': sorted(ALLOWED_EXTENSIONS)
+    }
+    if platform.system() == "Windows":
+        try:
+            import win32print
+            default_printer = win32print.GetDefaultPrinter()
+            info['default_printer'] = default_printer
+            info['win32print_available'] = True
+            # Yazıcı durumu
+            try:
+                handle = win32print.OpenPrinter(default_printer)
+                printer_info = win32print.GetPrinter(handle, 2)
+                win32print.ClosePrinter(handle)
+                info['printer_status'] = printer_info['Status']
+                info['printer_ready'] = printer_info['Status'] == 0
+                info['printer_port'] = printer_info.get(
+                    'pPortName', 'Bilinmiyor')
+            except Exception as printer_error:
+                info['printer_error'] = str(printer_error)
+        except ImportError:
+            info['win32print_available'] = False
+            info['error'] = 'win32print modülü bulunamadı - pip install pywin32'
+        except Exception as e:
+            info['win32print_error'] = str(e)
+    # Yazıcı başına kuyruk durumu
+    printer_pool.refresh()
+    info['printers'] = printer_pool.snapshot()
+    info['render_queue'] = render_scheduler.stats()
+    info['blob_store'] = blob_store.stats()
+    info['converters'] = converters.get_stage().stats()
+    info['image_encoder'] = image_encoder.get_encoder().stats()
+    info['printer_caps'] = printer_caps.get_cache().snapshot()
+    if _thumbnail_cache is not None:
+        info['preview_cache'] = _thumbnail_cache.stats()
+    if hot_folder_watcher is not None:
+        info['hot_folders'] = hot_folder_watcher.stats()
+    if cluster_queue is not None:
+        info['cluster_nodes'] = cluster_queue.nodes(
+            config.CLUSTER_HEARTBEAT_INTERVAL * STALE_HEARTBEATS)
+    return info
+
+
+# Yazıcı durum monitörü - /status sadece önbellekteki görüntüyü okur
+status_monitor = PrinterStatusMonitor(
+    collect_status, interval=config.STATUS_REFRESH_INTERVAL)
+
+
 @app.route('/status')
 def status():
-    """Sistem durumu"""
+    """Sistem durumu (önbellekten)"""
     try:
-        info = {
-            'system': platform.system(),
-            'platform': platform.platform(),
-            'ip': get_local_ip(),
-            'port': 5000,
-            'upload_folder_exists': os.path.exists(app.config['UPLOAD_FOLDER']),
-            'upload_folder_writable': os.access(app.config['UPLOAD_FOLDER'], os.W_OK),
-            'max_file_size': app.config['MAX_CONTENT_LENGTH'],
-            'allowed_extensions': list(ALLOWED_EXTENSIONS)
-        }
-        if platform.system() == "Windows":
-            try:
-                import win32print
-                default_printer = win32print.GetDefaultPrinter()
-                info['default_printer'] = default_printer
-                info['win32print_available'] = True
-                # Yazıcı durumu
-                try:
-                    handle = win32print.OpenPrinter(default_printer)
-                    printer_info = win32print.GetPrinter(handle, 2)
-                    win32print.ClosePrinter(handle)
-                    info['printer_status'] = printer_info['Status']
-                    info['printer_ready'] = printer_info['Status'] == 0
-                    info['printer_port'] = printer_info.get(
-                        'pPortName', 'Bilinmiyor')
-                except Exception as printer_error:
-                    info['printer_error'] = str(printer_error)
-            except ImportError:
-                info['win32print_available'] = False
-                info['error'] = 'win32print modülü bulunamadı - pip install pywin32'
-            except Exception as e:
-                info['win32print_error'] = str(e)
-        return jsonify(info)
+        return jsonify(status_monitor.snapshot())
     except Exception as e:
         return jsonify({'error': str(e)})
 
 
+# Açık SSE bağlantıları birer sunucu thread'i tutar; sayıları sınırlanır
+_status_stream_slots = threading.BoundedSemaphore(
+    config.STATUS_STREAM_MAX_CLIENTS)
+
+
+@app.route('/status/stream')
+def status_stream():
+    """Durum değişikliklerini Server-Sent Events ile ilet"""
+    if not _status_stream_slots.acquire(blocking=False):
+        # İstemci periyodik /status sorgusuna geri döner
+        return jsonify({'error': 'Çok fazla durum bağlantısı'}), 503
+    response = Response(status_monitor.stream(max_age=config.STATUS_STREAM_MAX_AGE),
+                        mimetype='text/event-stream')
+    # Slot yanıt kapanınca bırakılır; üretecin finally bloğu, yanıt ilk
+    # parçadan önce kapanırsa hiç çalışmaz
+    response.call_on_close(_status_stream_slots.release)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @app.route('/cleanup-all')
 def cleanup_all_files():
-    """Tüm geçici dosyaları temizle"""
-    try:
-        upload_folder = app.config['UPLOAD_FOLDER']
-        files_deleted = 0
-        if os.path.exists(upload_folder):
-            for filename in os.listdir(upload_folder):
-                file_path = os.path.join(upload_folder, filename)
-                try:
-                    if os.path.isfile(file_path):
-                        os.remove(file_path)
-                        files_deleted += 1
-                except Exception as e:
-                    print(f"Dosya silinemedi {file_path}: {e}")
-        return jsonify({
-            'success': True,
-            'message': f'{files_deleted} dosya temizlendi',
-            'files_deleted': files_deleted
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'message': f'Temizlik hatası: {str(e)}'})
+    """Aktif işlere ait olmayan tüm geçici dosyaları arka planda temizle"""
+    janitor.request_sweep(max_age=0)
+    return jsonify({
+        'success': True,
+        'message': 'Temizlik arka planda başlatıldı',
+        'scheduled': True,
+        'janitor': janitor.stats()
+    }), 202
 
 # HTML şablonunu oluştur (ilk çalıştırmada)
 
@@ -824,7 +2102,7 @@ def create_html_template():
     """index.html şablonunu oluştur"""
     template_path = os.path.join(app.config['TEMPLATES_FOLDER'], 'index.html')
     if not os.path.exists(template_path):
-        print("HTML şablonu oluşturuluyor...")
+        logger.info("HTML şablonu oluşturuluyor...")
         # Burada HTML kodunu bir dosyaya yazıyoruz
         with open(template_path, 'w', encoding='utf-8') as f:
             # Frontend kısmındaki HTML kodu buraya gelecek
@@ -843,12 +2121,12 @@ def create_html_template():
 </body>
 </html>"""
             f.write(html_content)
-        print(f"HTML şablonu oluşturuldu: {template_path}")
+        logger.info("HTML şablonu oluşturuldu: %s", template_path)
 
 
-if __name__ == '__main__':
+def print_startup_banner():
+    """Başlangıç bilgilerini logla"""
     local_ip = get_local_ip()
-
     logger.info("=" * 60)
     logger.info("🖨️  WEB PRINT SERVICE - AĞ YAZDIRMA SERVİSİ v2.0")
     logger.info("=" * 60)
@@ -865,8 +2143,50 @@ if __name__ == '__main__':
     logger.info(f"   • Desteklenen formatlar: {', '.join(ALLOWED_EXTENSIONS)}")
     logger.info(
         f"   • Maksimum dosya boyutu: {app.config['MAX_CONTENT_LENGTH']//1024//1024}MB")
+    logger.info(f"   • Sunucu: {config.SERVER_ENGINE}")
     logger.info("=" * 60)
 
+
+# Tekil servislerin sahibi olan sürecin kilit dosyası (açık kaldıkça kilitli)
+_service_lock = None
+
+
+def acquire_service_lock():
+    """Süreçler arası tekil servis kilidini almayı dene - alındıysa True
+
+    Gunicorn'da her worker dener; kilidi tutan worker ölürse kilit serbest
+    kalır ve yerine başlatılan worker alır. fcntl olmayan platformlarda
+    (Windows: tek süreçli waitress) her zaman True döner.
+    """
+    global _service_lock
+    if _service_lock is not None:
+        return True
+    try:
+        import fcntl
+    except ImportError:
+        return True
+    handle = open(os.path.join(config.UPLOAD_FOLDER, '.service.lock'), 'a')
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return False
+    _service_lock = handle
+    return True
+
+
+def prepare_service():
+    """Sunucu motorundan bağımsız başlangıç adımları - tekil servisler başladıysa True
+
+    İş kurtarma, periyodik temizlik, küme worker'ı ve sıcak klasörler
+    yalnızca tek süreçte çalışır (aynı iş iki kez yazdırılmasın diye);
+    diğer süreçler yalnızca kendi geçici dosyalarını siler.
+    """
+    if not acquire_service_lock():
+        janitor.periodic = False
+        logger.info("Tekil servisler başka bir süreçte çalışıyor (pid %d)", os.getpid())
+        return False
+
     # HTML şablonunu oluştur
     create_html_template()
 
@@ -880,14 +2200,64 @@ if __name__ == '__main__':
         logger.info(
             f"📁 Upload klasörü oluşturuldu: {app.config['UPLOAD_FOLDER']}")
 
-    logger.info("\n🚀 Servis başlatılıyor...")
-    logger.info("⏹️ Servisi durdurmak için Ctrl+C")
-    logger.info("=" * 60)
+    # Yarım kalan işleri kurtar ve sahipsiz dosyaları temizle
+    threading.Thread(target=_recovery_worker,
+                     name='job-recovery', daemon=True).start()
+
+    # Küme modunda bu düğüm de kuyruktan görev çeker
+    start_cluster_worker()
+
+    # Sıcak klasörleri izlemeye başla
+    start_hot_folders()
+    return True
+
+
+def start_cluster_worker():
+    """Küme modunda bu düğümün render/yazdırma thread'lerini başlat"""
+    global cluster_worker
+    if cluster_queue is None or cluster_worker is not None:
+        return
+    roles = [role for role in config.CLUSTER_ROLES.split(',') if role]
+    cluster_worker = ClusterWorker(
+        cluster_queue, config.CLUSTER_NODE_ID, roles,
+        print_fn=advanced_print_pdf, printer_pool=printer_pool, target_fn=render_target,
+        render_threads=max(1, config.RENDER_WORKERS // max(1, config.SERVER_WORKERS)),
+        poll_interval=config.CLUSTER_POLL_INTERVAL,
+        heartbeat_interval=config.CLUSTER_HEARTBEAT_INTERVAL)
+    cluster_worker.start()
+
+
+def start_hot_folders():
+    """HOT_FOLDERS tanımlıysa klasör izleyicisini başlat"""
+    global hot_folder_watcher
+    folders = parse_folders(config.HOT_FOLDERS)
+    if not folders or hot_folder_watcher is not None:
+        return
+    hot_folder_watcher = HotFolderWatcher(
+        folders, process_hot_folder_batch, extensions=ALLOWED_EXTENSIONS,
+        poll_interval=config.HOT_FOLDER_POLL_INTERVAL,
+        settle_seconds=config.HOT_FOLDER_SETTLE_SECONDS,
+        batch_size=config.HOT_FOLDER_BATCH_SIZE)
+    hot_folder_watcher.start()
+
+
+if __name__ == '__main__':
+    print_startup_banner()
+    prepare_service()
+
+    if config.SERVER_ENGINE != 'werkzeug':
+        # Üretim sunucusu (waitress)
+        from server import serve_waitress
+        serve_waitress(app, config)
+    else:
+        logger.info("\n🚀 Servis başlatılıyor...")
+        logger.info("⏹️ Servisi durdurmak için Ctrl+C")
+        logger.info("=" * 60)
 
-    # Tarayıcıyı otomatik aç (sadece konfigürasyonda etkinse ve reloader değilse)
-    # WERKZEUG_RUN_MAIN environment variable'ı reloader'ın ikinci çalışmasını belirtir
-    if config.AUTO_OPEN_BROWSER and os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
-        webbrowser.open(f"http://localhost:{config.PORT}")
+        # Tarayıcıyı otomatik aç (sadece konfigürasyonda etkinse ve reloader değilse)
+        # WERKZEUG_RUN_MAIN environment variable'ı reloader'ın ikinci çalışmasını belirtir
+        if config.AUTO_OPEN_BROWSER and os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
+            webbrowser.open(f"http://localhost:{config.PORT}")
 
-    # Flask uygulamasını başlat
-    app.run(host=config.HOST, port=config.PORT, debug=config.DEBUG)
+        # Flask geliştirme sunucusunu başlat
+        app.run(host=config.HOST, port=config.PORT, debug=config.DEBUG)
@@ -0,0 +1,401 @@
+"""
+Benchmark - Render ve Yazdırma Hattı Performans Ölçümü
+
+Bu script, sentetik resimler üretip layout_handler fonksiyonlarının
+(create_layout_pdf, create_multi_file_pdf) gecikme, verim ve tepe bellek
+(peak RSS) değerlerini her layout için ölçer. Ayrıca /upload ve
+/upload-multiple uç noktalarını, gerçek yazıcı yerine dosya çıktısı
+(PRINTER_BACKEND=file) kullanan yerel bir sunucuya karşı eşzamanlı olarak
+yük testine tabi tutar. Sonuçlar sürümler arasında karşılaştırılabilir
+bir JSON raporuna yazılır.
+
+Kullanım:
+    python benchmark.py --output bench.json
+    python benchmark.py --quick --compare bench.json
+    python benchmark.py --skip-http --megapixels 2,12 --layouts 1,9
+
+Karşılaştırma modunda (--compare), önceki rapora göre gecikmesi
+--fail-threshold oranından fazla artan durum varsa çıkış kodu 1 olur.
+"""
+
+import argparse
+import concurrent.futures
+import io
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BASE_DIR = Path(__file__).resolve().parent
+LAYOUTS = ('1', '2', '4', '6', '9')
+FORMAT_EXTENSIONS = {'jpg': 'JPEG', 'png': 'PNG', 'bmp': 'BMP',
+                     'tiff': 'TIFF', 'gif': 'GIF'}
+REPORT_VERSION = 1
+
+
+def peak_rss_kb():
+    """Mevcut sürecin tepe bellek kullanımı (KB)"""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS bayt, Linux KB döndürür
+    return usage // 1024 if sys.platform == 'darwin' else usage
+
+
+def make_synthetic_image(path, megapixels, mode, fmt, seed=0):
+    """Fotoğrafa benzer sıkıştırılabilirlikte sentetik bir resim üret"""
+    from PIL import Image, ImageChops
+    width = int((megapixels * 1_000_000 * 4 / 3) ** 0.5)
+    height = int(width * 3 / 4)
+    # Gradyan + gürültü: tamamen düz veya tamamen rastgele olmayan içerik
+    gradient = Image.linear_gradient('L').resize((width, height))
+    noise = Image.effect_noise((width, height), 40 + seed % 20)
+    red = ImageChops.add(gradient, noise, scale=2.0)
+    green = gradient.rotate(90, expand=False)
+    blue = ImageChops.multiply(noise, gradient.transpose(
+        Image.Transpose.FLIP_LEFT_RIGHT))
+    img = Image.merge('RGB', (red, green, blue))
+    if mode == 'RGBA':
+        img.putalpha(gradient)
+    elif mode != 'RGB':
+        img = img.convert(mode)
+    pil_format = FORMAT_EXTENSIONS[fmt]
+    if pil_format == 'JPEG' and img.mode not in ('RGB', 'L', 'CMYK'):
+        img = img.convert('RGB')
+    save_kwargs = {'quality': 90} if pil_format == 'JPEG' else {}
+    img.save(path, pil_format, **save_kwargs)
+    return path
+
+
+def _summarize(latencies):
+    """Gecikme listesinden özet istatistikler"""
+    ordered = sorted(latencies)
+
+    def percentile(p):
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    return {
+        'runs': len(ordered),
+        'mean_s': statistics.fmean(ordered),
+        'p50_s': percentile(50),
+        'p95_s': percentile(95),
+        'min_s': ordered[0],
+        'max_s': ordered[-1]
+    }
+
+
+def _run_render_case(case):
+    """Tek bir render durumunu ölç (ayrı süreçte çalışır)"""
+    import logging
+    logging.disable(logging.WARNING)
+    sys.path.insert(0, str(BASE_DIR))
+    from layout_handler import create_layout_pdf, create_multi_file_pdf
+    latencies = []
+    output_bytes = 0
+    for _ in range(case['repeat']):
+        start = time.perf_counter()
+        if case['kind'] == 'single':
+            output = create_layout_pdf(case['inputs'][0], case['layout'])
+        else:
+            output = create_multi_file_pdf(case['inputs'], case['layout'])
+        latencies.append(time.perf_counter() - start)
+        if output and output not in case['inputs'] and os.path.exists(output):
+            output_bytes = os.path.getsize(output)
+            os.remove(output)
+    result = _summarize(latencies)
+    result['output_bytes'] = output_bytes
+    result['peak_rss_kb'] = peak_rss_kb()
+    return result
+
+
+def run_render_benchmarks(args, workdir):
+    """Tüm layout/resim kombinasyonları için render ölçümü"""
+    results = {}
+    ctx = multiprocessing.get_context('spawn')
+    images = {}
+    for mp in args.megapixels:
+        for mode in args.modes:
+            for fmt in args.formats:
+                name = f"img_{mp}mp_{mode}_{fmt}.{fmt}"
+                path = os.path.join(workdir, name)
+                make_synthetic_image(path, mp, mode, fmt)
+                images[(mp, mode, fmt)] = path
+
+    cases = []
+    for (mp, mode, fmt), path in images.items():
+        for layout in args.layouts:
+            cases.append({
+                'id': f"single/{mp}mp/{mode}/{fmt}/layout{layout}",
+                'kind': 'single', 'layout': layout, 'inputs': [path],
+                'repeat': args.repeat, 'input_bytes': os.path.getsize(path)
+            })
+    # Çoklu dosya: ilk moddaki resimlerden bir grup
+    batch = [path for (mp, mode, fmt), path in images.items()
+             if mode == args.modes[0]][:args.batch_size]
+    batch = (batch * args.batch_size)[:args.batch_size]
+    for layout in args.layouts:
+        cases.append({
+            'id': f"multi/{len(batch)}files/layout{layout}",
+            'kind': 'multi', 'layout': layout, 'inputs': batch,
+            'repeat': args.repeat,
+            'input_bytes': sum(os.path.getsize(p) for p in batch)
+        })
+
+    for case in cases:
+        # Her durum yeni bir süreçte çalışır ki tepe bellek ölçümü ayrışsın
+        with concurrent.futures.ProcessPoolExecutor(1, mp_context=ctx) as pool:
+            result = pool.submit(_run_render_case, case).result()
+        result['input_bytes'] = case['input_bytes']
+        result['throughput_per_s'] = (
+            1.0 / result['mean_s'] if result['mean_s'] else None)
+        results[case['id']] = result
+        print(f"  {case['id']:<45} p50={result['p50_s'] * 1000:8.1f} ms "
+              f"rss={result['peak_rss_kb']} KB", file=sys.stderr)
+    return results
+
+
+def _encode_multipart(fields, files):
+    """multipart/form-data gövdesi oluştur"""
+    boundary = uuid.uuid4().hex
+    body = io.BytesIO()
+    for name, value in fields.items():
+        body.write(f'--{boundary}\r\nContent-Disposition: form-data; '
+                   f'name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, filename, data in files:
+        body.write(f'--{boundary}\r\nContent-Disposition: form-data; '
+                   f'name="{name}"; filename="{filename}"\r\n'
+                   f'Content-Type: application/octet-stream\r\n\r\n'.encode())
+        body.write(data)
+        body.write(b'\r\n')
+    body.write(f'--{boundary}--\r\n'.encode())
+    return body.getvalue(), f'multipart/form-data; boundary={boundary}'
+
+
+def _post(url, fields, files):
+    """Tek bir HTTP isteği gönder, (süre, başarı) döndür"""
+    body, content_type = _encode_multipart(fields, files)
+    request = urllib.request.Request(
+        url, data=body, headers={'Content-Type': content_type})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=300) as response:
+            payload = response.read()
+        elapsed = time.perf_counter() - start
+        # NDJSON akışında son satır işin özetidir
+        return elapsed, bool(json.loads(payload.splitlines()[-1]).get('success'))
+    except Exception:
+        return time.perf_counter() - start, False
+
+
+def run_http_benchmarks(args, workdir):
+    """/upload ve /upload-multiple için eşzamanlı yük testi"""
+    sink_dir = os.path.join(workdir, 'sink')
+    upload_dir = os.path.join(workdir, 'uploads')
+    os.environ.update({
+        'PRINTER_BACKEND': 'file',
+        'PRINT_SINK_DIR': sink_dir,
+        'UPLOAD_FOLDER': upload_dir,
+        'JOURNAL_PATH': os.path.join(workdir, 'jobs.db'),
+        'FLASK_ENV': 'production',
+        'LOG_LEVEL': 'WARNING',
+        'AUTO_OPEN_BROWSER': 'False'
+    })
+    sys.path.insert(0, str(BASE_DIR))
+    import logging
+    from werkzeug.serving import make_server
+    import app as web_app
+    # Her istek için erişim logu basılmasın
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    server = make_server('127.0.0.1', 0, web_app.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f'http://127.0.0.1:{server.server_port}'
+
+    image_path = make_synthetic_image(
+        os.path.join(workdir, 'http.jpg'), args.megapixels[0], 'RGB', 'jpg')
+    with open(image_path, 'rb') as f:
+        image_data = f.read()
+
+    scenarios = {
+        'upload': lambda i: _post(
+            f'{base_url}/upload', {'layout': '4', 'print_direct': 'true'},
+            [('file', f'u{i}.jpg', image_data)]),
+        'upload-multiple': lambda i: _post(
+            f'{base_url}/upload-multiple',
+            {'layout': '4', 'combine': 'false', 'print_direct': 'true'},
+            [('files', f'm{i}_{n}.jpg', image_data) for n in range(3)]),
+        'upload-multiple-stream': lambda i: _post(
+            f'{base_url}/upload-multiple',
+            {'layout': '4', 'combine': 'false', 'print_direct': 'true',
+             'stream': 'true'},
+            [('files', f's{i}_{n}.jpg', image_data) for n in range(3)]),
+        'upload-multiple-combined': lambda i: _post(
+            f'{base_url}/upload-multiple',
+            {'layout': '4', 'combine': 'true', 'print_direct': 'true'},
+            [('files', f'c{i}_{n}.jpg', image_data) for n in range(3)]),
+    }
+    results = {}
+    try:
+        for name, call in scenarios.items():
+            start = time.perf_counter()
+            with concurrent.futures.ThreadPoolExecutor(args.concurrency) as pool:
+                outcomes = list(pool.map(call, range(args.requests)))
+            wall = time.perf_counter() - start
+            result = _summarize([elapsed for elapsed, _ in outcomes])
+            result['concurrency'] = args.concurrency
+            result['success_rate'] = (
+                sum(1 for _, ok in outcomes if ok) / len(outcomes))
+            result['throughput_per_s'] = len(outcomes) / wall
+            results[f'http/{name}/c{args.concurrency}'] = result
+            print(f"  http/{name:<28} p50={result['p50_s'] * 1000:8.1f} ms "
+                  f"ok={result['success_rate']:.0%} "
+                  f"rps={result['throughput_per_s']:.2f}", file=sys.stderr)
+    finally:
+        server.shutdown()
+    results['http/peak_rss_kb'] = {'peak_rss_kb': peak_rss_kb()}
+    return results
+
+
+def _git_revision():
+    """Çalışma dizininin git revizyonu (varsa)"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              cwd=BASE_DIR, capture_output=True, text=True,
+                              timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _environment():
+    """Rapor için ortam bilgisi"""
+    versions = {}
+    for module in ('PIL', 'reportlab', 'flask'):
+        try:
+            versions[module] = getattr(__import__(module), '__version__', None) or \
+                getattr(__import__(module), 'Version', None)
+        except ImportError:
+            versions[module] = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'git_revision': _git_revision(),
+        'versions': versions
+    }
+
+
+def compare_reports(current, baseline, threshold):
+    """İki raporu karşılaştır; gerileyen durumların listesini döndür"""
+    regressions = []
+    print(f"\n{'durum':<50} {'önce':>10} {'sonra':>10} {'fark':>8}")
+    for case_id, result in sorted(current['results'].items()):
+        before = baseline.get('results', {}).get(case_id)
+        if not before or 'p50_s' not in result or 'p50_s' not in before:
+            continue
+        delta = (result['p50_s'] - before['p50_s']) / before['p50_s']
+        marker = ' !' if delta > threshold else ''
+        print(f"{case_id:<50} {before['p50_s'] * 1000:9.1f}ms "
+              f"{result['p50_s'] * 1000:9.1f}ms {delta:+7.1%}{marker}")
+        if delta > threshold:
+            regressions.append(case_id)
+    return regressions
+
+
+def _csv(value, cast=str):
+    return [cast(v) for v in value.split(',') if v]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Render ve yazdırma hattı benchmark aracı')
+    parser.add_argument('--output', '-o', default='bench_report.json',
+                        help='JSON rapor dosyası')
+    parser.add_argument('--compare', help='Karşılaştırılacak önceki rapor')
+    parser.add_argument('--fail-threshold', type=float, default=0.15,
+                        help='Gerileme sayılacak p50 artış oranı (varsayılan: 0.15)')
+    parser.add_argument('--quick', action='store_true',
+                        help='Küçük ve hızlı bir alt küme çalıştır')
+    parser.add_argument('--layouts', type=lambda v: _csv(v), default=list(LAYOUTS))
+    parser.add_argument('--megapixels', type=lambda v: _csv(v, float),
+                        default=[2.0, 8.0, 24.0])
+    parser.add_argument('--modes', type=lambda v: _csv(v), default=['RGB', 'RGBA', 'L', 'P'])
+    parser.add_argument('--formats', type=lambda v: _csv(v), default=['jpg', 'png'])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--batch-size', type=int, default=12,
+                        help='Çoklu dosya durumundaki dosya sayısı')
+    parser.add_argument('--concurrency', type=int, default=8,
+                        help='HTTP yük testi eşzamanlılığı')
+    parser.add_argument('--requests', type=int, default=32,
+                        help='HTTP senaryosu başına istek sayısı')
+    parser.add_argument('--skip-render', action='store_true')
+    parser.add_argument('--skip-http', action='store_true')
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.megapixels = [min(args.megapixels)]
+        args.modes = args.modes[:1]
+        args.formats = args.formats[:1]
+        args.repeat = 1
+        args.batch_size = min(args.batch_size, 4)
+        args.requests = min(args.requests, 8)
+        args.concurrency = min(args.concurrency, 4)
+    for fmt in args.formats:
+        if fmt not in FORMAT_EXTENSIONS:
+            parser.error(f"Desteklenmeyen format: {fmt}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix='print-bench-')
+    report = {
+        'report_version': REPORT_VERSION,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'environment': _environment(),
+        'parameters': {k: v for k, v in vars(args).items()
+                       if k not in ('output', 'compare')},
+        'results': {}
+    }
+    try:
+        if not args.skip_render:
+            print("Render benchmark'ları çalışıyor...", file=sys.stderr)
+            report['results'].update(run_render_benchmarks(args, workdir))
+        if not args.skip_http:
+            print("HTTP yük testi çalışıyor...", file=sys.stderr)
+            report['results'].update(run_http_benchmarks(args, workdir))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"Rapor yazıldı: {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_reports(report, baseline, args.fail_threshold)
+        if regressions:
+            print(f"\n{len(regressions)} durumda gerileme var", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,264 @@
+"""
+Blob Store - İçerik Adresli, Referans Sayımlı Dosya Deposu
+
+Yüklenen dosyalar SHA-256 özetleriyle UPLOAD_FOLDER/blobs altında bir kez
+saklanır. Aynı dosya tekrar yüklendiğinde diskte ikinci kopya oluşmaz;
+istemci dosyanın özetini önceden sorup (HEAD /blobs/<sha256>) sunucuda
+varsa dosya gövdesini hiç göndermeden yazdırabilir.
+
+Özet sorguları yükleyen istemciyle sınırlıdır: blob'u yükleyen istemciler
+(uploader) kaydedilir ve lookup/acquire bir istemci kimliğiyle çağrılırsa
+yalnızca o istemcinin yüklediği blob'lar görünür. Böylece ağdaki başka bir
+istemci bir belgenin yazdırılıp yazdırılmadığını özetinden öğrenemez.
+
+Her blob'u kullanan işler sahip (owner) olarak kaydedilir. Sahibi olan
+blob'lar silinmez; sahibi kalmayan blob'lar tekrar kullanılabilmek için
+tutulur ve yaş/boyut kotasına göre en uzun süredir kullanılmayandan
+başlanarak (LRU) silinir.
+
+Örnek Kullanım:
+    >>> from blob_store import BlobStore
+    >>> store = BlobStore('uploads/blobs')
+    >>> digest, path, new = store.put_stream(file.stream, '.jpg', owner=job_id,
+    ...                                      uploader=client_id)
+    >>> path = store.acquire(digest, owner=job_id, uploader=client_id)
+    >>> store.release_path(path, owner=job_id)        # iş bitti
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+
+# Logger yapılandırması
+logger = logging.getLogger(__name__)
+
+_HASH_RE = re.compile(r'^[0-9a-f]{64}$')
+_CHUNK_SIZE = 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    ext TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS refs (
+    digest TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (digest, owner)
+);
+CREATE TABLE IF NOT EXISTS uploaders (
+    digest TEXT NOT NULL,
+    uploader TEXT NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (digest, uploader)
+);
+"""
+
+
+def is_valid_digest(digest):
+    """Küçük harfli 64 karakterlik SHA-256 özeti mi?"""
+    return bool(digest) and bool(_HASH_RE.match(digest))
+
+
+class BlobStore:
+    """SHA-256 ile adreslenen, sahip bazlı referans sayımlı depo"""
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self):
+        """İndeks veritabanı (ilk kullanımda açılır)"""
+        if self._conn is None:
+            os.makedirs(self.root, exist_ok=True)
+            conn = sqlite3.connect(os.path.join(self.root, 'index.db'),
+                                   timeout=30, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def path_for(self, digest, ext):
+        """Blob'un disk yolu (ilk iki karakter alt klasör)"""
+        return os.path.join(self.root, digest[:2], digest + ext)
+
+    def digest_of(self, path):
+        """Yol bu depodaki bir blob'a aitse özetini döndür"""
+        if os.path.dirname(os.path.dirname(os.path.abspath(path))) != os.path.abspath(self.root):
+            return None
+        digest = os.path.splitext(os.path.basename(path))[0]
+        return digest if is_valid_digest(digest) else None
+
+    def _find(self, conn, digest, uploader=None):
+        """Transaction içinde blob'u bul - (yol, boyut) veya None
+
+        Disk ile indeks uyuşmuyorsa indeks düzeltilir.
+        """
+        if uploader is not None and conn.execute(
+                'SELECT 1 FROM uploaders WHERE digest = ? AND uploader = ?',
+                (digest, uploader)).fetchone() is None:
+            return None
+        row = conn.execute(
+            'SELECT ext, size FROM blobs WHERE digest = ?', (digest,)).fetchone()
+        if row is None:
+            return None
+        path = self.path_for(digest, row[0])
+        if not os.path.exists(path):
+            conn.execute('DELETE FROM blobs WHERE digest = ?', (digest,))
+            return None
+        return path, row[1]
+
+    def lookup(self, digest, uploader=None):
+        """Blob varsa (yol, boyut) döndür, yoksa None
+
+        uploader verilirse yalnızca bu istemcinin yüklediği blob'lar bulunur.
+        """
+        if not is_valid_digest(digest):
+            return None
+        with self._lock, self._db() as conn:
+            return self._find(conn, digest, uploader)
+
+    def acquire(self, digest, owner, uploader=None):
+        """Var olan blob'a sahip ekle ve yolunu döndür (yoksa None)
+
+        Varlık kontrolü ve sahip ekleme tek transaction'dadır; eşzamanlı
+        evict() blob'u ya bundan önce siler (kayıp) ya da sahibini görüp atlar.
+        """
+        if not is_valid_digest(digest):
+            return None
+        now = time.time()
+        with self._lock, self._db() as conn:
+            found = self._find(conn, digest, uploader)
+            if found is None or not conn.execute(
+                    'UPDATE blobs SET last_used = ? WHERE digest = ?',
+                    (now, digest)).rowcount:
+                return None
+            conn.execute('INSERT OR IGNORE INTO refs (digest, owner, created)'
+                         ' VALUES (?, ?, ?)', (digest, owner, now))
+        return found[0]
+
+    def _add_uploader(self, conn, digest, uploader, now):
+        if uploader is not None:
+            conn.execute('INSERT OR IGNORE INTO uploaders (digest, uploader, created)'
+                         ' VALUES (?, ?, ?)', (digest, uploader, now))
+
+    def put_stream(self, stream, ext, owner, uploader=None):
+        """Akışı özetini hesaplayarak depoya yaz - (özet, yol, yeni_mi) döndürür
+
+        uploader: dosyayı gönderen istemci (sonraki özet sorguları için).
+        """
+        os.makedirs(self.root, exist_ok=True)
+        sha = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                while True:
+                    chunk = stream.read(_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    sha.update(chunk)
+                    out.write(chunk)
+            digest = sha.hexdigest()
+            path = self.acquire(digest, owner)
+            if path is not None:
+                os.remove(tmp_path)
+                with self._lock, self._db() as conn:
+                    self._add_uploader(conn, digest, uploader, time.time())
+                return digest, path, False
+            path = self.path_for(digest, ext.lower())
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        now = time.time()
+        with self._lock, self._db() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO blobs (digest, ext, size, created, last_used)'
+                ' VALUES (?, ?, ?, ?, ?)',
+                (digest, ext.lower(), os.path.getsize(path), now, now))
+            conn.execute('INSERT OR IGNORE INTO refs (digest, owner, created)'
+                         ' VALUES (?, ?, ?)', (digest, owner, now))
+            self._add_uploader(conn, digest, uploader, now)
+        return digest, path, True
+
+    def release(self, digest, owner):
+        """Sahibi kaldır (tekrar çağrılması zararsızdır)"""
+        with self._lock, self._db() as conn:
+            conn.execute('DELETE FROM refs WHERE digest = ? AND owner = ?',
+                         (digest, owner))
+
+    def release_path(self, path, owner):
+        """Yol bir blob'a aitse sahibi kaldır - blob yolu ise True döndür"""
+        digest = self.digest_of(path)
+        if digest is None:
+            return False
+        self.release(digest, owner)
+        return True
+
+    def evict(self, max_age=None, quota_bytes=0, active_owners=None, min_ref_age=60):
+        """Sahipsiz blob'ları yaş ve boyut kotasına göre sil (LRU)
+
+        active_owners verilirse, bu kümede olmayan ve min_ref_age'den eski
+        sahiplikler (ör. çökme sonrası kalanlar) düşürülür.
+        """
+        now = time.time()
+        with self._lock, self._db() as conn:
+            if active_owners is not None:
+                stale = [(digest, owner) for digest, owner in conn.execute(
+                    'SELECT digest, owner FROM refs WHERE created < ?',
+                    (now - min_ref_age,)) if owner not in active_owners]
+                conn.executemany('DELETE FROM refs WHERE digest = ? AND owner = ?', stale)
+            total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM blobs').fetchone()[0]
+            candidates = conn.execute(
+                'SELECT digest, ext, size, last_used FROM blobs'
+                ' WHERE digest NOT IN (SELECT digest FROM refs)'
+                ' ORDER BY last_used').fetchall()
+        removed = []
+        for digest, ext, size, last_used in candidates:
+            too_old = max_age is not None and now - last_used >= max_age
+            over_quota = quota_bytes and total > quota_bytes
+            if not (too_old or over_quota):
+                continue
+            with self._lock, self._db() as conn:
+                # Bu arada yeni bir sahip eklendiyse silme
+                deleted = conn.execute(
+                    'DELETE FROM blobs WHERE digest = ? AND digest NOT IN'
+                    ' (SELECT digest FROM refs)', (digest,)).rowcount
+                if not deleted:
+                    continue
+                conn.execute('DELETE FROM uploaders WHERE digest = ?', (digest,))
+                # Dosya transaction açıkken silinir: aynı içerik eşzamanlı tekrar
+                # yüklenirse yeni dosya bu silmeden sonra yazılır
+                try:
+                    os.remove(self.path_for(digest, ext))
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.warning("Blob silinemedi %s: %s", digest[:12], e)
+            total -= size
+            removed.append(digest)
+        if removed:
+            logger.info("Blob deposu: %d blob silindi", len(removed))
+        return len(removed)
+
+    def stats(self):
+        """Blob sayısı, toplam boyut ve sahipli blob sayısı"""
+        with self._lock:
+            conn = self._db()
+            count, size = conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs').fetchone()
+            referenced = conn.execute(
+                'SELECT COUNT(DISTINCT digest) FROM refs').fetchone()[0]
+        return {'blobs': count, 'bytes': size, 'referenced': referenced}
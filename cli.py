@@ -0,0 +1,209 @@
+"""
+CLI - Komut Satırından Toplu Yazdırma
+
+Web sunucusu olmadan bir klasördeki veya glob desenine uyan dosyaları
+servisle aynı hattan (blob deposu, adil render zamanlayıcısı, layout/
+birleştirme, PDF optimizasyonu, yazıcı havuzu) geçirerek yazdırır. Gece
+çalışan toplu işler ve betikli benchmark'lar için kullanılır.
+
+İlerleme stderr'e, --json verilirse özet stdout'a yazılır. Tüm dosyalar
+başarılıysa çıkış kodu 0, değilse 1'dir.
+
+Kullanım:
+    python cli.py taramalar/ --layout 4 --combine
+    python cli.py 'fotolar/**/*.jpg' --layout 1 --paper A5 --workers 4 --json
+    python cli.py belgeler/ --sink /tmp/cikti    # yazıcı yerine klasöre yaz
+    python cli.py belgeler/ --no-print --json    # sadece render (ölçüm)
+
+Not: Komut satırı işleri iş günlüğüne kind='cli' olarak yazılır; böylece aynı
+günlüğü paylaşan servisin temizleyicisi ve blob deposu işin dosyalarına
+dokunmaz. Bu işler kurtarılmaz: süreç kesilirse servis işi tekrar yazdırmak
+yerine başarısız olarak işaretler.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import threading
+import time
+
+LAYOUTS = ('1', '2', '4', '6', '9')
+
+
+def collect_paths(inputs, recursive=False):
+    """Dosya, klasör ve glob desenlerini sıralı dosya listesine çevir"""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            if recursive:
+                for root, dirs, files in os.walk(item):
+                    dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+                    paths.extend(os.path.join(root, name) for name in sorted(files))
+            else:
+                paths.extend(os.path.join(item, name) for name in sorted(os.listdir(item)))
+        elif os.path.isfile(item):
+            paths.append(item)
+        else:
+            paths.extend(sorted(glob.glob(item, recursive=True)))
+    # Aynı dosya birden çok girdiyle seçildiyse bir kez alınır
+    seen = set()
+    unique = []
+    for path in paths:
+        real = os.path.realpath(path)
+        if os.path.isfile(path) and not os.path.basename(path).startswith('.') \
+                and real not in seen:
+            seen.add(real)
+            unique.append(path)
+    return unique
+
+
+class Progress:
+    """Dosya sonuçlarını stderr'e satır satır yazan ilerleme göstergesi"""
+
+    def __init__(self, total, stream=None, enabled=True):
+        self.total = total
+        self.stream = stream or sys.stderr
+        self.enabled = enabled
+        self.done = 0
+        self.failed = 0
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def message(self, text):
+        if self.enabled:
+            print(text, file=self.stream, flush=True)
+
+    def update(self, index, result):
+        """process_batch_job on_result geri çağrısı (thread'lerden çağrılır)"""
+        with self._lock:
+            self.done += 1
+            self.failed += not result['success']
+            elapsed = time.perf_counter() - self.started
+            self.message(
+                f"[{self.done:>{len(str(self.total))}}/{self.total}] "
+                f"{'✓' if result['success'] else '✗'} {result['filename']} - "
+                f"{result['message']} ({self.done / elapsed:.1f} dosya/sn)")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Dosyaları web servisiyle aynı render/yazdırma hattından yazdır')
+    parser.add_argument('inputs', nargs='+',
+                        help='Dosya, klasör veya glob deseni (ör. "tarama/*.jpg")')
+    parser.add_argument('--layout', '-l', default='1', choices=LAYOUTS,
+                        help='Sayfa başına kopya (varsayılan: 1)')
+    parser.add_argument('--combine', '-c', action='store_true',
+                        help='Tüm dosyaları tek PDF olarak birleştirip yazdır')
+    parser.add_argument('--pack', action='store_true',
+                        help='Birleştirmede resimleri en az sayfaya yerleştir')
+    parser.add_argument('--no-sort', dest='sort', action='store_false',
+                        help='Dosyaları ad yerine verildiği sırayla işle')
+    parser.add_argument('--recursive', '-r', action='store_true',
+                        help='Klasörlerin alt klasörlerini de tara')
+    parser.add_argument('--color', choices=('color', 'mono', 'any'), default='any',
+                        help='Yazıcı seçiminde renk gereksinimi')
+    parser.add_argument('--paper', help='Kağıt boyutu (varsayılan: yazıcının kağıdı, '
+                                        'bilinmiyorsa DEFAULT_PAPER)')
+    parser.add_argument('--workers', '-w', type=int, default=0,
+                        help='Paralel render thread sayısı (varsayılan RENDER_WORKERS)')
+    parser.add_argument('--no-print', dest='print_direct', action='store_false',
+                        help='Sadece render et, yazdırma')
+    parser.add_argument('--sink', help='Yazıcı yerine PDF\'leri bu klasöre yaz')
+    parser.add_argument('--json', action='store_true',
+                        help='Özet raporu stdout\'a JSON olarak yaz')
+    parser.add_argument('--quiet', '-q', action='store_true',
+                        help='İlerleme satırlarını gösterme')
+    parser.add_argument('--log-level', default='WARNING',
+                        help='Servis loglarının seviyesi (varsayılan: WARNING)')
+    args = parser.parse_args(argv)
+    if args.workers < 0:
+        parser.error('--workers negatif olamaz')
+    return args
+
+
+def _configure_environment(args):
+    """Servis modülleri yüklenmeden önce ortam değişkenlerini ayarla
+
+    config.py ayarları import sırasında okuduğu için app burada değil,
+    ayarlardan sonra yüklenir.
+    """
+    os.environ['LOG_LEVEL'] = args.log_level.upper()
+    # Tek süreç: render thread'lerinin tamamı bu işe ayrılır
+    os.environ['SERVER_WORKERS'] = '1'
+    if args.workers:
+        os.environ['RENDER_WORKERS'] = str(args.workers)
+    if args.sink:
+        os.environ['PRINTER_BACKEND'] = 'file'
+        os.environ['PRINT_SINK_DIR'] = os.path.abspath(args.sink)
+    # Sıcak klasörler ve küme bu süreçte çalıştırılmaz
+    os.environ['HOT_FOLDERS'] = ''
+
+
+def run(args):
+    _configure_environment(args)
+    import app as service
+    from logging_setup import job_context
+
+    color = {'color': True, 'mono': False}.get(args.color)
+    # Kağıt verilmezse servisteki gibi yazıcının kağıdı kullanılır (render_target)
+    paper = args.paper.upper() if args.paper else None
+
+    paths = collect_paths(args.inputs, args.recursive)
+    accepted = [path for path in paths if service.allowed_file(os.path.basename(path))]
+    skipped = [path for path in paths if path not in set(accepted)]
+    progress = Progress(len(accepted), enabled=not args.quiet)
+    for path in skipped:
+        progress.message(f"Atlandı (desteklenmeyen format): {path}")
+    if not accepted:
+        progress.message("Yazdırılacak dosya bulunamadı")
+        return {'success': False, 'message': 'Dosya bulunamadı',
+                'file_count': 0, 'skipped': skipped}, 1
+
+    started = time.perf_counter()
+    with job_context() as job_id:
+        entries = [service.store_local_file(path, job_id, args.layout)
+                   for path in accepted]
+        # Sonuçlar dosya adıyla eşleşir; kaynak yol ayrıca rapora eklenir
+        for entry, path in zip(entries, accepted):
+            entry['source'] = path
+        service.order_entries(entries, args.sort)
+        service.journal.record(
+            job_id, 'received', kind='cli', files=entries, layout=args.layout,
+            combine=args.combine, print_direct=args.print_direct, color=color,
+            paper=paper, client='cli', pack=args.pack, owner=service.current_owner())
+        progress.message(
+            f"{len(entries)} dosya alındı - layout={args.layout} "
+            f"{'birleştirilmiş' if args.combine else 'ayrı'}, "
+            f"{service.render_scheduler.workers} render thread")
+        if args.combine:
+            progress.message("Birleştirilmiş PDF render ediliyor...")
+        summary = service.process_batch_job(
+            job_id, entries, args.layout, args.combine, args.print_direct,
+            color=color, paper=paper, client='cli', pack=args.pack,
+            on_result=progress.update)
+    if args.combine:
+        progress.message(f"{'✓' if summary['success'] else '✗'} {summary['message']}")
+
+    elapsed = time.perf_counter() - started
+    summary = dict(summary, skipped=skipped, elapsed_seconds=round(elapsed, 3),
+                   files_per_second=round(len(entries) / elapsed, 2) if elapsed else None)
+    summary['files'] = [{key: entry[key] for key in ('name', 'source', 'size', 'type')}
+                        for entry in entries]
+    progress.message(f"Bitti: {summary['message']} ({elapsed:.1f} sn)")
+    # Gecikmeli silinecek geçici dosyalar süreç kapanmadan temizlenir
+    service.janitor.flush(timeout=service.config.JANITOR_DELETE_DELAY + 5)
+    return summary, 0 if summary['success'] else 1
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    summary, code = run(args)
+    if args.json:
+        print(json.dumps(summary, indent=2, ensure_ascii=False))
+    return code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,887 @@
+"""
+Cluster - Çok Düğümlü Yazdırma Çiftliği
+
+Bu modül, birden fazla servis sürecinin veya makinenin (ör. her yazıcı
+grubu için ayrı düğüm) tek bir iş kuyruğunu paylaşmasını sağlar. Herhangi
+bir düğüm yüklemeyi kabul eder ve kuyruğa yazar; düğümler yazıcılarını
+ilan eder ve yazdırabilecekleri işleri kuyruktan çeker. Render ve yazdırma
+ayrı görevler olduğu için bir belgeyi bir düğüm render edip başka bir düğüm
+yazdırabilir.
+
+Kuyruk arka uçları aynı arayüzü (ClusterBackend) sağlar:
+    - ClusterQueue: yerel SQLite (WAL modu); giriş dosyaları ve render
+      edilmiş PDF'ler de veritabanında tutulur. WAL paylaşılan bellek
+      gerektirdiği için dosya yerel diskte olmalı ve yalnızca aynı
+      makinedeki süreçlerce açılmalıdır (NFS/SMB üzerinden kullanılamaz).
+    - HttpClusterQueue: başka makinelerdeki düğümler kuyruğa, SQLite
+      kuyruğunu tutan koordinatör düğümün /cluster/api/<metot> uç noktası
+      üzerinden erişir (paylaşılan CLUSTER_TOKEN ile).
+
+Görev akışı:
+    render (pending -> claimed -> done) -> print (pending -> claimed -> done)
+    Düğüm kaybolursa (heartbeat kesilirse) render görevleri tekrar kuyruğa
+    alınır; yazdırma görevleri çift baskı riskine karşı başarısız sayılır.
+
+Kullanım:
+    # Web düğümü (yüklemeleri kabul eder, kendi yazıcısıyla da çalışır)
+    CLUSTER_QUEUE_PATH=/srv/farm/queue.db python app.py
+
+    # Aynı makinede çalışan düğümler (burada test için dosya çıktılı)
+    python cluster.py worker --queue /srv/farm/queue.db --node-id A --sink /tmp/sinkA
+    python cluster.py worker --queue /srv/farm/queue.db --node-id B --roles print \\
+        --printers '[{"name": "HP-B", "color": true}]'
+
+    # Başka makinedeki düğüm (koordinatör: kuyruğu tutan web düğümü)
+    CLUSTER_TOKEN=gizli python cluster.py worker --queue http://farm-a:5000 --node-id C
+
+    # Düğüm ve iş durumu
+    python cluster.py status --queue /srv/farm/queue.db
+"""
+
+import argparse
+import base64
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+
+# Logger yapılandırması
+logger = logging.getLogger(__name__)
+
+# SQLite WAL'ın güvenle çalışmadığı ağ dosya sistemleri (/proc/mounts türleri)
+_NETWORK_FILESYSTEMS = ('nfs', 'nfs4', 'cifs', 'smbfs', 'smb3', 'fuse.sshfs', '9p')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    node_id TEXT PRIMARY KEY,
+    roles TEXT NOT NULL,
+    printers TEXT,
+    started REAL NOT NULL,
+    heartbeat REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    created REAL NOT NULL,
+    finished REAL,
+    node_id TEXT,
+    client TEXT,
+    layout TEXT NOT NULL,
+    combine INTEGER NOT NULL,
+    print_direct INTEGER NOT NULL,
+    color INTEGER,
+    paper TEXT,
+    file_count INTEGER NOT NULL,
+    pack INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS files (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    data BLOB NOT NULL,
+    options TEXT,
+    PRIMARY KEY (job_id, seq)
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    seq INTEGER,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    node_id TEXT,
+    claimed_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    payload BLOB,
+    result TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_pending ON tasks (kind, status, task_id);
+CREATE INDEX IF NOT EXISTS tasks_job ON tasks (job_id);
+"""
+
+# Eski kuyruk veritabanlarına sonradan eklenen sütunlar
+_COLUMNS = (
+    ('jobs', 'pack', 'INTEGER NOT NULL DEFAULT 0'),
+    ('files', 'options', 'TEXT'),
+)
+
+# Dosya başına render seçenekleri (manifest)
+_FILE_OPTIONS = ('layout', 'rotation', 'fit')
+
+# Bir düğümün kayıp sayılması için kaçırması gereken heartbeat sayısı
+STALE_HEARTBEATS = 3
+
+# Koordinatörün uzak düğümlere açtığı kuyruk metotları (/cluster/api/<metot>)
+API_METHODS = frozenset((
+    'register_node', 'heartbeat', 'nodes', 'submit_files', 'claim', 'load_inputs',
+    'load_payload', 'complete_render', 'complete_print', 'fail_task', 'job',
+    'stats', 'reap'))
+
+
+def network_filesystem(path):
+    """Yol bir ağ dosya sistemindeyse türünü döndür (Linux; bilinmiyorsa None)"""
+    try:
+        with open('/proc/mounts') as mounts:
+            entries = [line.split()[1:3] for line in mounts]
+    except OSError:
+        return None
+    path = os.path.realpath(path)
+    best = None
+    for mount_point, fstype in entries:
+        mount_point = mount_point.replace('\\040', ' ')
+        if (path == mount_point or path.startswith(mount_point.rstrip('/') + '/')) \
+                and (best is None or len(mount_point) > len(best[0])):
+            best = (mount_point, fstype)
+    if best and best[1] in _NETWORK_FILESYSTEMS:
+        return best[1]
+    return None
+
+
+def printer_supports(printer, color=None, paper=None):
+    """İlan edilen yazıcı (Printer.to_dict) istenen yeteneklere uyuyor mu?"""
+    if color and printer.get('color') is False:
+        return False
+    papers = printer.get('paper')
+    if paper and papers is not None and paper.upper() not in papers:
+        return False
+    return True
+
+
+def _encode(value):
+    """Kuyruk verisini JSON'a uygun hale getir (bayt -> base64)"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return {'$b64': base64.b64encode(bytes(value)).decode('ascii')}
+    if isinstance(value, dict):
+        return {key: _encode(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    return value
+
+
+def _decode(value):
+    """_encode'un tersi"""
+    if isinstance(value, dict):
+        if set(value) == {'$b64'}:
+            return base64.b64decode(value['$b64'])
+        return {key: _decode(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    return value
+
+
+class ClusterBackend:
+    """Küme kuyruğu arka ucu arayüzü
+
+    Düğümler ve app.py kuyruğa yalnızca bu metotlarla erişir; yerel SQLite
+    (ClusterQueue) ve koordinatör üzerinden HTTP (HttpClusterQueue) arka
+    uçları birbirinin yerine kullanılabilir.
+    """
+
+    # wait() iş durumunu bu aralıkla sorgular
+    wait_poll_interval = 0.2
+
+    def submit_job(self, job_id, entries, layout, combine=False, print_direct=True,
+                   color=None, paper=None, client='-', node_id=None, pack=False):
+        """Yüklenen dosyaları kuyruğa yaz ve render görevlerini oluştur"""
+        files = []
+        for entry in entries:
+            options = {key: entry[key] for key in _FILE_OPTIONS if key in entry}
+            with open(entry['path'], 'rb') as f:
+                files.append({'name': entry['name'], 'type': entry['type'],
+                              'data': f.read(), 'options': options})
+        self.submit_files(job_id, files, layout, combine, print_direct, color,
+                          paper, client, node_id, pack)
+
+    def wait(self, job_id, timeout):
+        """İş bitene kadar (en fazla timeout saniye) bekle, iş durumunu döndür"""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.job(job_id)
+            if job is None or job['finished'] or time.monotonic() >= deadline:
+                return job
+            time.sleep(self.wait_poll_interval)
+
+    def register_node(self, node_id, roles, printers=None):
+        raise NotImplementedError
+
+    def heartbeat(self, node_id, printers=None):
+        raise NotImplementedError
+
+    def nodes(self, stale_after):
+        raise NotImplementedError
+
+    def submit_files(self, job_id, files, layout, combine=False, print_direct=True,
+                     color=None, paper=None, client='-', node_id=None, pack=False):
+        """files: {'name', 'type', 'data', 'options'} sözlükleri"""
+        raise NotImplementedError
+
+    def claim(self, node_id, kind, printers=None):
+        raise NotImplementedError
+
+    def load_inputs(self, task):
+        raise NotImplementedError
+
+    def load_payload(self, task):
+        raise NotImplementedError
+
+    def complete_render(self, task, pdf_bytes):
+        raise NotImplementedError
+
+    def complete_print(self, task, success, message):
+        raise NotImplementedError
+
+    def fail_task(self, task, message):
+        raise NotImplementedError
+
+    def job(self, job_id):
+        raise NotImplementedError
+
+    def stats(self):
+        raise NotImplementedError
+
+    def reap(self, stale_after):
+        raise NotImplementedError
+
+
+class ClusterQueue(ClusterBackend):
+    """SQLite tabanlı paylaşımlı iş kuyruğu (tek makine; koordinatörde)"""
+
+    def __init__(self, path, retention=86400):
+        self.path = path
+        self.retention = retention
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fstype = network_filesystem(directory)
+        if fstype:
+            logger.error("Küme kuyruğu ağ dosya sisteminde (%s): %s - SQLite WAL "
+                         "yalnızca yerel diskte ve tek makinede güvenlidir; diğer "
+                         "makineler CLUSTER_COORDINATOR ile bağlanmalı", fstype, path)
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        for table, column, definition in _COLUMNS:
+            existing = {row['name'] for row in conn.execute(f'PRAGMA table_info({table})')}
+            if column not in existing:
+                conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+
+    def _conn(self):
+        """Thread başına bir bağlantı (transaction'lar elle yönetilir)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Yazma kilidini baştan alan transaction (atomik görev alma için)"""
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    # --- Düğümler ---------------------------------------------------------
+
+    def register_node(self, node_id, roles, printers=None):
+        """Düğümü kaydet veya bilgilerini güncelle
+
+        Aynı kimlikle yeniden başlayan düğümün önceki çalışmadan kalan
+        görevleri geri alınır: heartbeat hemen tazelendiği için reap() bunları
+        hiç kayıp saymaz. Render görevleri tekrar kuyruğa alınır, yazdırma
+        görevleri çift baskı riskine karşı başarısız sayılır.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                'INSERT INTO nodes (node_id, roles, printers, started, heartbeat)'
+                ' VALUES (?, ?, ?, ?, ?) ON CONFLICT (node_id) DO UPDATE SET'
+                ' roles = excluded.roles, printers = excluded.printers,'
+                ' started = excluded.started, heartbeat = excluded.heartbeat',
+                (node_id, ','.join(roles), json.dumps(printers or []), now, now))
+            lost = self._release_tasks(conn, 'node_id = ?', (node_id,),
+                                       'Düğüm yazdırma sırasında yeniden başladı')
+        if lost:
+            logger.warning("Önceki çalışmadan kalan %d yazdırma görevi başarısız sayıldı",
+                           lost)
+
+    def _release_tasks(self, conn, node_filter, params, message):
+        """Düğümlerin aldığı görevleri geri al - başarısız sayılan yazdırma sayısı
+
+        node_filter: düğümleri seçen SQL koşulu (tasks.node_id üzerinde).
+        """
+        conn.execute(
+            "UPDATE tasks SET status = 'pending', node_id = NULL, claimed_at = NULL"
+            f" WHERE kind = 'render' AND status = 'claimed' AND {node_filter}", params)
+        lost = conn.execute(
+            "SELECT task_id, job_id, name FROM tasks WHERE kind = 'print'"
+            f" AND status = 'claimed' AND {node_filter}", params).fetchall()
+        for task in lost:
+            conn.execute(
+                "UPDATE tasks SET status = 'failed', payload = NULL WHERE task_id = ?",
+                (task['task_id'],))
+            self._set_result(conn, dict(task), False, message)
+            self._finish_job_if_done(conn, task['job_id'])
+        return len(lost)
+
+    def heartbeat(self, node_id, printers=None):
+        """Düğümün canlı olduğunu ve yazıcı durumunu bildir"""
+        with self._transaction() as conn:
+            if printers is None:
+                conn.execute('UPDATE nodes SET heartbeat = ? WHERE node_id = ?',
+                             (time.time(), node_id))
+            else:
+                conn.execute(
+                    'UPDATE nodes SET heartbeat = ?, printers = ? WHERE node_id = ?',
+                    (time.time(), json.dumps(printers), node_id))
+
+    def nodes(self, stale_after):
+        """Kayıtlı düğümler ve canlılık durumları"""
+        now = time.time()
+        rows = self._conn().execute(
+            'SELECT node_id, roles, printers, started, heartbeat FROM nodes'
+            ' ORDER BY node_id').fetchall()
+        return [{
+            'node_id': row['node_id'],
+            'roles': row['roles'].split(',') if row['roles'] else [],
+            'printers': json.loads(row['printers'] or '[]'),
+            'alive': now - row['heartbeat'] < stale_after,
+            'last_heartbeat': row['heartbeat']
+        } for row in rows]
+
+    # --- İşler ------------------------------------------------------------
+
+    def submit_files(self, job_id, files, layout, combine=False, print_direct=True,
+                     color=None, paper=None, client='-', node_id=None, pack=False):
+        """Dosya içeriklerini kuyruğa yaz ve render görevlerini oluştur"""
+        files = [(job_id, seq, item['name'], item['type'], item['data'],
+                  json.dumps(item['options']) if item.get('options') else None)
+                 for seq, item in enumerate(files)]
+        with self._transaction() as conn:
+            conn.execute(
+                'INSERT INTO jobs (job_id, status, created, node_id, client, layout,'
+                ' combine, print_direct, color, paper, file_count, pack)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (job_id, 'queued', time.time(), node_id, client, layout,
+                 int(combine), int(print_direct), color, paper, len(files),
+                 int(pack)))
+            conn.executemany(
+                'INSERT INTO files (job_id, seq, name, type, data, options)'
+                ' VALUES (?, ?, ?, ?, ?, ?)', files)
+            if combine:
+                conn.execute(
+                    'INSERT INTO tasks (job_id, kind, seq, name, type, status)'
+                    " VALUES (?, 'render', NULL, ?, 'combined', 'pending')",
+                    (job_id, f'combined_{len(files)}'))
+            else:
+                conn.executemany(
+                    'INSERT INTO tasks (job_id, kind, seq, name, type, status)'
+                    " VALUES (?, 'render', ?, ?, ?, 'pending')",
+                    [(job_id, seq, name, file_type)
+                     for _, seq, name, file_type, _, _ in files])
+
+    def claim(self, node_id, kind, printers=None, scan=50):
+        """Bekleyen bir görevi atomik olarak bu düğüme ata
+
+        printers: düğümün yazıcıları (Printer.to_dict); verilirse yalnızca
+        bunlardan birinin renk/kağıt yeteneğine uyan görevler alınır.
+        """
+        with self._transaction() as conn:
+            rows = conn.execute(
+                'SELECT t.task_id, t.job_id, t.kind, t.seq, t.name, t.type,'
+                ' j.layout, j.combine, j.print_direct, j.color, j.paper, j.pack'
+                ' FROM tasks t JOIN jobs j ON j.job_id = t.job_id'
+                " WHERE t.kind = ? AND t.status = 'pending'"
+                ' ORDER BY j.created, t.seq, t.task_id LIMIT ?',
+                (kind, scan)).fetchall()
+            for row in rows:
+                task = dict(row)
+                if task['color'] is not None:
+                    task['color'] = bool(task['color'])
+                if printers is not None and not any(
+                        printer_supports(printer, task['color'], task['paper'])
+                        for printer in printers):
+                    continue
+                conn.execute(
+                    "UPDATE tasks SET status = 'claimed', node_id = ?, claimed_at = ?,"
+                    ' attempts = attempts + 1 WHERE task_id = ?',
+                    (node_id, time.time(), task['task_id']))
+                conn.execute(
+                    "UPDATE jobs SET status = 'processing' WHERE job_id = ?"
+                    " AND status = 'queued'", (task['job_id'],))
+                return task
+        return None
+
+    def load_inputs(self, task):
+        """Render görevinin giriş dosyalarını döndür"""
+        if task['seq'] is None:
+            rows = self._conn().execute(
+                'SELECT seq, name, type, data, options FROM files'
+                ' WHERE job_id = ? ORDER BY seq',
+                (task['job_id'],)).fetchall()
+        else:
+            rows = self._conn().execute(
+                'SELECT seq, name, type, data, options FROM files'
+                ' WHERE job_id = ? AND seq = ?',
+                (task['job_id'], task['seq'])).fetchall()
+        return [dict(row, options=json.loads(row['options'] or '{}')) for row in rows]
+
+    def load_payload(self, task):
+        """Yazdırma görevinin PDF içeriğini döndür"""
+        row = self._conn().execute(
+            'SELECT payload FROM tasks WHERE task_id = ?', (task['task_id'],)).fetchone()
+        return row['payload'] if row else None
+
+    def complete_render(self, task, pdf_bytes):
+        """Render sonucunu kaydet; yazdırma isteniyorsa yazdırma görevi oluştur"""
+        with self._transaction() as conn:
+            conn.execute("UPDATE tasks SET status = 'done' WHERE task_id = ?",
+                         (task['task_id'],))
+            if task['print_direct']:
+                conn.execute(
+                    'INSERT INTO tasks (job_id, kind, seq, name, type, status, payload)'
+                    " VALUES (?, 'print', ?, ?, ?, 'pending', ?)",
+                    (task['job_id'], task['seq'], task['name'], task['type'], pdf_bytes))
+            else:
+                self._set_result(conn, task, True, 'PDF hazırlandı (yazdırma seçilmedi)',
+                                 pdf_size=len(pdf_bytes))
+            self._finish_job_if_done(conn, task['job_id'])
+
+    def complete_print(self, task, success, message):
+        """Yazdırma sonucunu kaydet"""
+        with self._transaction() as conn:
+            conn.execute(
+                'UPDATE tasks SET status = ?, payload = NULL WHERE task_id = ?',
+                ('done' if success else 'failed', task['task_id']))
+            self._set_result(conn, task, success, message)
+            self._finish_job_if_done(conn, task['job_id'])
+
+    def fail_task(self, task, message):
+        """Görevi başarısız olarak işaretle"""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = 'failed', payload = NULL WHERE task_id = ?",
+                (task['task_id'],))
+            self._set_result(conn, task, False, message)
+            self._finish_job_if_done(conn, task['job_id'])
+
+    @staticmethod
+    def _set_result(conn, task, success, message, **extra):
+        result = dict(extra, filename=task['name'], success=success, message=message)
+        conn.execute('UPDATE tasks SET result = ? WHERE task_id = ?',
+                     (json.dumps(result, ensure_ascii=False), task['task_id']))
+
+    @staticmethod
+    def _finish_job_if_done(conn, job_id):
+        """Bekleyen görevi kalmayan işi kapat ve giriş dosyalarını sil"""
+        remaining = conn.execute(
+            "SELECT COUNT(*) FROM tasks WHERE job_id = ? AND status IN ('pending', 'claimed')",
+            (job_id,)).fetchone()[0]
+        if remaining:
+            return
+        failed = conn.execute(
+            "SELECT COUNT(*) FROM tasks WHERE job_id = ? AND status = 'failed'",
+            (job_id,)).fetchone()[0]
+        conn.execute('UPDATE jobs SET status = ?, finished = ? WHERE job_id = ?',
+                     ('failed' if failed else 'done', time.time(), job_id))
+        conn.execute('DELETE FROM files WHERE job_id = ?', (job_id,))
+
+    def job(self, job_id):
+        """İş durumu ve dosya bazında sonuçlar (iş yoksa None)"""
+        conn = self._conn()
+        row = conn.execute('SELECT * FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+        tasks = conn.execute(
+            'SELECT kind, seq, status, node_id, result FROM tasks'
+            ' WHERE job_id = ? ORDER BY seq, task_id', (job_id,)).fetchall()
+        results = [json.loads(task['result']) for task in tasks if task['result']]
+        ok = len([r for r in results if r['success']])
+        return {
+            'job_id': job_id,
+            'status': row['status'],
+            'finished': row['status'] in ('done', 'failed'),
+            'success': row['status'] == 'done',
+            'message': f"{ok}/{len(results)} görev başarılı" if results else 'İş kuyrukta',
+            'layout': row['layout'],
+            'combined': bool(row['combine']),
+            'file_count': row['file_count'],
+            'created': row['created'],
+            'tasks': [{'kind': task['kind'], 'seq': task['seq'],
+                       'status': task['status'], 'node_id': task['node_id']}
+                      for task in tasks],
+            'results': results
+        }
+
+    def stats(self):
+        """Görev sayıları (tür ve duruma göre)"""
+        rows = self._conn().execute(
+            'SELECT kind, status, COUNT(*) AS n FROM tasks'
+            " WHERE status IN ('pending', 'claimed') GROUP BY kind, status").fetchall()
+        return {f"{row['kind']}_{row['status']}": row['n'] for row in rows}
+
+    def reap(self, stale_after):
+        """Kayıp düğümlerin görevlerini geri al ve eski işleri sil"""
+        now = time.time()
+        with self._transaction() as conn:
+            lost = self._release_tasks(
+                conn, 'node_id IN (SELECT node_id FROM nodes WHERE heartbeat < ?)',
+                (now - stale_after,), 'Düğüm yazdırma sırasında kayboldu')
+            old = [row[0] for row in conn.execute(
+                "SELECT job_id FROM jobs WHERE status IN ('done', 'failed')"
+                ' AND finished < ?', (now - self.retention,))]
+            for job_id in old:
+                conn.execute('DELETE FROM tasks WHERE job_id = ?', (job_id,))
+                conn.execute('DELETE FROM files WHERE job_id = ?', (job_id,))
+                conn.execute('DELETE FROM jobs WHERE job_id = ?', (job_id,))
+        if lost:
+            logger.warning("Kayıp düğümlerden %d yazdırma görevi başarısız sayıldı",
+                           lost)
+
+
+class HttpClusterQueue(ClusterBackend):
+    """Koordinatör düğümün kuyruğuna HTTP üzerinden erişen arka uç
+
+    Koordinatör, SQLite kuyruğunu (CLUSTER_QUEUE_PATH) tutan düğümdür;
+    çağrılar /cluster/api/<metot> uç noktasına JSON olarak gönderilir
+    (baytlar base64). Bağlantı hataları ConnectionError olarak yükselir.
+    """
+
+    # Her sorgu bir HTTP isteği olduğu için daha seyrek sorgulanır
+    wait_poll_interval = 1.0
+
+    def __init__(self, url, token='', timeout=60):
+        self.url = url.rstrip('/')
+        self.token = token
+        self.timeout = timeout
+
+    def _call(self, method, **kwargs):
+        request = urllib.request.Request(
+            f'{self.url}/cluster/api/{method}',
+            data=json.dumps(_encode(kwargs)).encode('utf-8'),
+            headers={'Content-Type': 'application/json',
+                     'X-Cluster-Token': self.token})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return _decode(json.loads(response.read()))['result']
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read()).get('error')
+            except ValueError:
+                message = None
+            raise ConnectionError(
+                f'Koordinatör hatası {e.code} ({method}): {message or e.reason}') from e
+        except urllib.error.URLError as e:
+            raise ConnectionError(f'Koordinatöre ulaşılamadı: {e.reason}') from e
+
+    def register_node(self, node_id, roles, printers=None):
+        return self._call('register_node', node_id=node_id, roles=list(roles),
+                          printers=printers)
+
+    def heartbeat(self, node_id, printers=None):
+        return self._call('heartbeat', node_id=node_id, printers=printers)
+
+    def nodes(self, stale_after):
+        return self._call('nodes', stale_after=stale_after)
+
+    def submit_files(self, job_id, files, layout, combine=False, print_direct=True,
+                     color=None, paper=None, client='-', node_id=None, pack=False):
+        return self._call('submit_files', job_id=job_id, files=files, layout=layout,
+                          combine=combine, print_direct=print_direct, color=color,
+                          paper=paper, client=client, node_id=node_id, pack=pack)
+
+    def claim(self, node_id, kind, printers=None):
+        return self._call('claim', node_id=node_id, kind=kind, printers=printers)
+
+    def load_inputs(self, task):
+        return self._call('load_inputs', task=task)
+
+    def load_payload(self, task):
+        return self._call('load_payload', task=task)
+
+    def complete_render(self, task, pdf_bytes):
+        return self._call('complete_render', task=task, pdf_bytes=pdf_bytes)
+
+    def complete_print(self, task, success, message):
+        return self._call('complete_print', task=task, success=success, message=message)
+
+    def fail_task(self, task, message):
+        return self._call('fail_task', task=task, message=message)
+
+    def job(self, job_id):
+        return self._call('job', job_id=job_id)
+
+    def stats(self):
+        return self._call('stats')
+
+    def reap(self, stale_after):
+        return self._call('reap', stale_after=stale_after)
+
+
+def open_queue(target, token='', retention=86400):
+    """Kuyruk arka ucunu aç - http(s):// adresi koordinatör, diğerleri SQLite yolu"""
+    if target.startswith(('http://', 'https://')):
+        return HttpClusterQueue(target, token)
+    return ClusterQueue(target, retention=retention)
+
+
+def handle_api(queue, method, payload):
+    """Koordinatörde uzak düğümün çağrısını yerel kuyrukta çalıştır
+
+    Bilinmeyen metotta KeyError, hatalı argümanda TypeError yükselir.
+    Dönen değer JSON'a uygundur.
+    """
+    if method not in API_METHODS:
+        raise KeyError(method)
+    return _encode({'result': getattr(queue, method)(**_decode(payload or {}))})
+
+
+def render_files(paths, layout, combine, options=None, pack=False, dpi=None, paper=None):
+    """Varsayılan render fonksiyonu - layout PDF yolunu döndürür
+
+    options: Dosya başına seçenekler ({'layout', 'rotation', 'fit'}) listesi.
+    dpi, paper: Render çözünürlüğü ve kağıt (verilmezse varsayılanlar).
+    """
+    from layout_handler import (DEFAULT_DPI, create_layout_pdf, create_manifest_pdf,
+                                create_multi_file_pdf)
+    options = options or [{} for _ in paths]
+    dpi, paper = dpi or DEFAULT_DPI, paper or 'A4'
+    if combine:
+        if pack or any(options):
+            items = [dict(option, path=path, layout=option.get('layout', layout))
+                     for path, option in zip(paths, options)]
+            return create_manifest_pdf(items, pack=pack, dpi=dpi, paper=paper)
+        return create_multi_file_pdf(paths, layout, dpi=dpi, paper=paper)
+    option = options[0]
+    return create_layout_pdf(paths[0], option.get('layout', layout),
+                             rotation=option.get('rotation'),
+                             fit=option.get('fit', 'fit'), dpi=dpi, paper=paper)
+
+
+class ClusterWorker:
+    """Kuyruktan görev çeken render ve yazdırma thread'leri"""
+
+    def __init__(self, queue, node_id, roles, print_fn=None, printer_pool=None,
+                 render_fn=render_files, render_threads=1, poll_interval=0.5,
+                 heartbeat_interval=5, target_fn=None):
+        self.queue = queue
+        self.node_id = node_id
+        self.roles = [role for role in roles if role in ('render', 'print')]
+        # print_fn(pdf_path, layout, file_type, color, paper) -> (başarı, mesaj)
+        self.print_fn = print_fn
+        self.printer_pool = printer_pool
+        self.render_fn = render_fn
+        # target_fn(color, paper) -> (dpi, kağıt); verilmezse işin kağıdı kullanılır
+        self.target_fn = target_fn
+        self.render_threads = max(1, render_threads)
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self._stop = threading.Event()
+        self._threads = []
+
+    def _printers(self):
+        return self.printer_pool.snapshot() if self.printer_pool else []
+
+    def start(self):
+        """Düğümü kaydet ve thread'leri başlat"""
+        if 'print' in self.roles and (self.print_fn is None or self.printer_pool is None):
+            raise ValueError('print rolü için print_fn ve printer_pool gerekli')
+        self._registered = False
+        self._register()
+        targets = [('heartbeat', self._heartbeat_loop)]
+        if 'render' in self.roles:
+            targets += [(f'render-{i}', self._render_loop)
+                        for i in range(self.render_threads)]
+        if 'print' in self.roles:
+            # Her yazıcı aynı anda meşgul edilebilsin diye yazıcı başına bir thread
+            targets += [(f'print-{i}', self._print_loop)
+                        for i in range(len(self.printer_pool))]
+        for name, target in targets:
+            thread = threading.Thread(target=target, daemon=True,
+                                      name=f'cluster-{name}')
+            self._threads.append(thread)
+            thread.start()
+        logger.info("Küme düğümü başladı: %s roller=%s", self.node_id,
+                    ','.join(self.roles) or '-')
+
+    def stop(self):
+        self._stop.set()
+
+    def run_forever(self):
+        """Ön planda çalış (Ctrl+C ile durur)"""
+        self.start()
+        try:
+            while not self._stop.wait(1):
+                pass
+        except KeyboardInterrupt:
+            self.stop()
+
+    def _register(self):
+        """Düğümü kaydet; koordinatöre ulaşılamazsa heartbeat tekrar dener"""
+        try:
+            self.queue.register_node(self.node_id, self.roles, self._printers())
+            self._registered = True
+        except ConnectionError as e:
+            logger.warning("Küme düğümü kaydedilemedi (tekrar denenecek): %s", e)
+
+    def _heartbeat_loop(self):
+        stale_after = self.heartbeat_interval * STALE_HEARTBEATS
+        while not self._stop.wait(self.heartbeat_interval):
+            try:
+                if self.printer_pool:
+                    self.printer_pool.refresh()
+                if not self._registered:
+                    self._register()
+                    continue
+                self.queue.heartbeat(self.node_id, self._printers())
+                self.queue.reap(stale_after)
+            except Exception as e:
+                logger.warning("Heartbeat hatası: %s", e)
+
+    def _loop(self, kind, handler, printers=None):
+        """Görev al, işle; görev yoksa biraz bekle
+
+        printers: düğümün yazıcılarını döndüren fonksiyon (yazdırma görevleri
+        yalnızca bu yazıcıların yeteneklerine uyuyorsa alınır).
+        """
+        while not self._stop.is_set():
+            try:
+                task = self.queue.claim(self.node_id, kind,
+                                        printers() if printers else None)
+            except (sqlite3.Error, ConnectionError) as e:
+                logger.warning("Görev alınamadı: %s", e)
+                task = None
+            if task is None:
+                self._stop.wait(self.poll_interval)
+                continue
+            from logging_setup import job_context
+            with job_context(task['job_id']):
+                try:
+                    handler(task)
+                except Exception as e:
+                    logger.exception("%s görevi başarısız: %s", kind, e)
+                    try:
+                        self.queue.fail_task(task, f'{kind} hatası: {e}')
+                    except (sqlite3.Error, ConnectionError) as error:
+                        # Görev düğüm yeniden başlayınca geri alınır (register_node)
+                        logger.error("Görev sonucu kaydedilemedi: %s", error)
+
+    def _render_loop(self):
+        self._loop('render', self._render)
+
+    def _print_loop(self):
+        self._loop('print', self._print, self._printers)
+
+    def _render(self, task):
+        workdir = tempfile.mkdtemp(prefix='cluster_render_')
+        try:
+            paths, options = [], []
+            for item in self.queue.load_inputs(task):
+                path = os.path.join(workdir, f"{item['seq']}_{item['name']}")
+                with open(path, 'wb') as f:
+                    f.write(item['data'])
+                paths.append(path)
+                options.append(item['options'])
+            dpi, paper = None, task['paper']
+            if self.target_fn:
+                dpi, paper = self.target_fn(task['color'], paper)
+            output_pdf = self.render_fn(paths, task['layout'], bool(task['combine']),
+                                        options, bool(task['pack']), dpi, paper)
+            if not output_pdf or not os.path.exists(output_pdf):
+                self.queue.fail_task(task, 'PDF oluşturulamadı')
+                return
+            with open(output_pdf, 'rb') as f:
+                self.queue.complete_render(task, f.read())
+            logger.info("Render tamamlandı: %s", task['name'])
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def _print(self, task):
+        workdir = tempfile.mkdtemp(prefix='cluster_print_')
+        try:
+            path = os.path.join(workdir, f"{task['job_id']}_{task['name']}.pdf")
+            with open(path, 'wb') as f:
+                f.write(self.queue.load_payload(task) or b'')
+            file_type = task['type']
+            success, message = self.print_fn(
+                path, task['layout'], file_type, task['color'], task['paper'])
+            self.queue.complete_print(task, success, message)
+            logger.info("Yazdırma sonucu: %s success=%s", task['name'], success)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _worker_command(args):
+    """Sadece çalışan düğüm: web arayüzü olmadan kuyruktan iş çeker"""
+    if args.sink:
+        os.environ['PRINTERS'] = json.dumps(
+            [{'name': args.node_id, 'sink': args.sink}])
+    elif args.printers:
+        os.environ['PRINTERS'] = args.printers
+    # Yazdırma yöntemleri ve yazıcı havuzu ana servisle paylaşılır
+    from app import advanced_print_pdf, printer_pool, render_target, config
+    queue = open_queue(args.queue, args.token, retention=config.JOURNAL_RETENTION)
+    worker = ClusterWorker(
+        queue, args.node_id, args.roles.split(','),
+        print_fn=advanced_print_pdf, printer_pool=printer_pool, target_fn=render_target,
+        render_threads=args.render_threads or config.RENDER_WORKERS,
+        poll_interval=config.CLUSTER_POLL_INTERVAL,
+        heartbeat_interval=config.CLUSTER_HEARTBEAT_INTERVAL)
+    worker.run_forever()
+
+
+def _status_command(args):
+    queue = open_queue(args.queue, args.token)
+    print(json.dumps({
+        'nodes': queue.nodes(stale_after=args.stale_after),
+        'tasks': queue.stats()
+    }, indent=2, ensure_ascii=False))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Yazdırma çiftliği düğüm aracı')
+    sub = parser.add_subparsers(dest='command', required=True)
+    default_queue = os.environ.get('CLUSTER_QUEUE_PATH') or os.environ.get('CLUSTER_COORDINATOR')
+
+    worker = sub.add_parser('worker', help='Kuyruktan görev çeken düğüm başlat')
+    worker.add_argument('--queue', default=default_queue, required=not default_queue,
+                        help='Kuyruk veritabanı (CLUSTER_QUEUE_PATH) veya koordinatör'
+                             ' adresi (http://makine:port)')
+    worker.add_argument('--token', default=os.environ.get('CLUSTER_TOKEN', ''),
+                        help='Koordinatör erişim anahtarı (CLUSTER_TOKEN)')
+    worker.add_argument('--node-id', required=True, help='Benzersiz düğüm adı')
+    worker.add_argument('--roles', default='render,print',
+                        help='Virgülle ayrılmış roller: render, print')
+    worker.add_argument('--printers', help='Yazıcı havuzu JSON (PRINTERS formatı)')
+    worker.add_argument('--sink', help='Yazıcı yerine bu klasöre yaz (test için)')
+    worker.add_argument('--render-threads', type=int, default=0,
+                        help='Render thread sayısı (varsayılan RENDER_WORKERS)')
+    worker.set_defaults(func=_worker_command)
+
+    status = sub.add_parser('status', help='Düğüm ve kuyruk durumunu göster')
+    status.add_argument('--queue', default=default_queue, required=not default_queue)
+    status.add_argument('--token', default=os.environ.get('CLUSTER_TOKEN', ''))
+    status.add_argument('--stale-after', type=float, default=15)
+    status.set_defaults(func=_status_command)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
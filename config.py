@@ -4,6 +4,7 @@ Environment variable'lardan veya varsayılan değerlerden konfigürasyon yükler
 """
 
 import os
+import platform
 from pathlib import Path
 
 
@@ -18,6 +19,11 @@ class Config:
     DEBUG = os.environ.get(
         'FLASK_DEBUG', 'False').lower() in ('true', '1', 'yes')
 
+    # Loglama ayarları (LOG_FORMAT: text veya json)
+    LOG_LEVEL = os.environ.get(
+        'LOG_LEVEL', 'DEBUG' if DEBUG else 'INFO').upper()
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text').lower()
+
     # Upload ayarları
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', str(BASE_DIR / 'uploads'))
     TEMPLATES_FOLDER = os.environ.get(
@@ -25,6 +31,67 @@ class Config:
     MAX_CONTENT_LENGTH = int(os.environ.get(
         'MAX_CONTENT_LENGTH', 100 * 1024 * 1024))  # 100MB
 
+    # Küme modu: paylaşılan kuyruk veritabanı (boş = kapalı); bu düğüm koordinatör olur
+    CLUSTER_QUEUE_PATH = os.environ.get('CLUSTER_QUEUE_PATH', '')
+    # Başka makinedeki koordinatörün adresi (http://makine:port) - kuyruk HTTP ile paylaşılır
+    CLUSTER_COORDINATOR = os.environ.get('CLUSTER_COORDINATOR', '')
+    # Koordinatör API'sinin paylaşılan erişim anahtarı (boş = uzak düğüm kabul edilmez)
+    CLUSTER_TOKEN = os.environ.get('CLUSTER_TOKEN', '')
+    # Bu düğümün adı ve üstlendiği roller (render, print; boş = sadece yükleme kabulü)
+    CLUSTER_NODE_ID = os.environ.get(
+        'CLUSTER_NODE_ID', f"{platform.node() or 'node'}-{os.environ.get('FLASK_PORT', 5000)}")
+    CLUSTER_ROLES = os.environ.get('CLUSTER_ROLES', 'render,print')
+    # Yükleme isteğinin işin bitmesini bekleyeceği süre (sonra iş kimliği döner)
+    CLUSTER_WAIT_SECONDS = float(os.environ.get('CLUSTER_WAIT_SECONDS', 30))
+    CLUSTER_HEARTBEAT_INTERVAL = float(os.environ.get('CLUSTER_HEARTBEAT_INTERVAL', 5))
+    CLUSTER_POLL_INTERVAL = float(os.environ.get('CLUSTER_POLL_INTERVAL', 0.5))
+
+    # Kalıcı iş günlüğü (SQLite, WAL modu)
+    JOURNAL_PATH = os.environ.get(
+        'JOURNAL_PATH', str(BASE_DIR / 'data' / 'jobs.db'))
+    # Bitmiş işlerin günlükte tutulma süresi (saniye)
+    JOURNAL_RETENTION = int(os.environ.get('JOURNAL_RETENTION', 86400))
+    # Blob deposu: sahipsiz blob'ların tutulma süresi (saniye) ve boyut kotası
+    BLOB_MAX_AGE = int(os.environ.get('BLOB_MAX_AGE', 7 * 86400))
+    BLOB_QUOTA_BYTES = int(os.environ.get('BLOB_QUOTA_BYTES', 512 * 1024 * 1024))
+
+    # Belge dönüştürücüleri (txt, svg, ofis): process sayısı, zaman aşımı
+    # (saniye) ve içerik özetli önbellek klasörü
+    CONVERTER_WORKERS = int(os.environ.get('CONVERTER_WORKERS', 2))
+    CONVERTER_TIMEOUT = int(os.environ.get('CONVERTER_TIMEOUT', 120))
+    CONVERTER_CACHE_DIR = os.environ.get(
+        'CONVERTER_CACHE_DIR', os.path.join(UPLOAD_FOLDER, 'converted'))
+
+    # Sıcak klasörler: bırakılan dosyalar otomatik yazdırılır (JSON liste, boş = kapalı)
+    # Örnek: [{"path": "/srv/tarama", "layout": "4", "combine": true}]
+    HOT_FOLDERS = os.environ.get('HOT_FOLDERS', '')
+    HOT_FOLDER_POLL_INTERVAL = float(os.environ.get('HOT_FOLDER_POLL_INTERVAL', 2))
+    # Dosya bu süre boyunca değişmezse yazılması bitmiş sayılır (saniye)
+    HOT_FOLDER_SETTLE_SECONDS = float(os.environ.get('HOT_FOLDER_SETTLE_SECONDS', 3))
+    # Tek işte toplanacak en fazla dosya sayısı
+    HOT_FOLDER_BATCH_SIZE = int(os.environ.get('HOT_FOLDER_BATCH_SIZE', 100))
+
+    # İstek bazlı profilleme (X-Profile başlığı veya ?profile=; kapalıyken kanca kurulmaz)
+    PROFILING_ENABLED = os.environ.get(
+        'PROFILING_ENABLED', 'False').lower() in ('true', '1', 'yes')
+    # Bellekte tutulacak son profil raporu sayısı
+    PROFILING_MAX_ENTRIES = int(os.environ.get('PROFILING_MAX_ENTRIES', 20))
+    # Örnekleme profilinde yığınların okunma aralığı (saniye)
+    PROFILING_SAMPLE_INTERVAL = float(os.environ.get('PROFILING_SAMPLE_INTERVAL', 0.005))
+
+    # Başlangıçta sahipsiz sayılacak dosyanın minimum yaşı (saniye)
+    ORPHAN_MIN_AGE = int(os.environ.get('ORPHAN_MIN_AGE', 300))
+
+    # Arka plan temizleyicisi
+    # Başarılı yazdırmadan sonra dosyanın silinmesi için beklenecek süre (saniye)
+    JANITOR_DELETE_DELAY = float(os.environ.get('JANITOR_DELETE_DELAY', 5))
+    # Periyodik klasör taraması aralığı ve parça boyutu
+    JANITOR_INTERVAL = int(os.environ.get('JANITOR_INTERVAL', 300))
+    JANITOR_BATCH_SIZE = int(os.environ.get('JANITOR_BATCH_SIZE', 200))
+    # Yükleme klasörü yaş ve boyut kotası (0 = sınırsız)
+    UPLOAD_MAX_AGE = int(os.environ.get('UPLOAD_MAX_AGE', 3600))
+    UPLOAD_QUOTA_BYTES = int(os.environ.get('UPLOAD_QUOTA_BYTES', 1024 * 1024 * 1024))
+
     # İzin verilen dosya uzantıları
     ALLOWED_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg', 'bmp', 'gif', 'tiff'}
 
@@ -32,6 +99,90 @@ class Config:
     HOST = os.environ.get('FLASK_HOST', '0.0.0.0')
     PORT = int(os.environ.get('FLASK_PORT', 5000))
 
+    # Üretim sunucusu ayarları (SERVER_ENGINE: werkzeug, waitress veya gunicorn)
+    SERVER_ENGINE = os.environ.get('SERVER_ENGINE', 'werkzeug').lower()
+    # Aynı anda render edilebilecek iş sayısı (tüm worker süreçleri toplamı)
+    RENDER_WORKERS = int(os.environ.get('RENDER_WORKERS', os.cpu_count() or 2))
+    # Worker süreç sayısı (sadece gunicorn; waitress tek süreçtir)
+    SERVER_WORKERS = int(os.environ.get('SERVER_WORKERS', 1))
+    # Eşzamanlı /status/stream (SSE) bağlantı sınırı ve bağlantı ömrü (saniye)
+    STATUS_STREAM_MAX_CLIENTS = int(os.environ.get(
+        'STATUS_STREAM_MAX_CLIENTS', 16))
+    STATUS_STREAM_MAX_AGE = int(os.environ.get('STATUS_STREAM_MAX_AGE', 300))
+    # İstek thread sayısı: render slotları + SSE bağlantıları + hafif istekler
+    SERVER_THREADS = int(os.environ.get(
+        'SERVER_THREADS',
+        max(1, RENDER_WORKERS // SERVER_WORKERS) + STATUS_STREAM_MAX_CLIENTS + 4))
+    SERVER_KEEPALIVE = int(os.environ.get('SERVER_KEEPALIVE', 5))
+    SERVER_CONNECTION_LIMIT = int(os.environ.get(
+        'SERVER_CONNECTION_LIMIT', 100))
+    SERVER_CHANNEL_TIMEOUT = int(os.environ.get('SERVER_CHANNEL_TIMEOUT', 120))
+    # Bu boyutu aşan istek gövdeleri bellek yerine geçici dosyada tamponlanır
+    UPLOAD_MEMORY_BUFFER = int(os.environ.get(
+        'UPLOAD_MEMORY_BUFFER', 1024 * 1024))  # 1MB
+
+    # Bu boyuta kadar olan resimlerin layout PDF'i diske yazılmadan bellekte
+    # üretilir ve yazıcıya stdin üzerinden aktarılır
+    RENDER_IN_MEMORY_MAX_BYTES = int(os.environ.get(
+        'RENDER_IN_MEMORY_MAX_BYTES', 8 * 1024 * 1024))  # 8MB
+
+    # Yazdırma öncesi PDF optimizasyonu (pikepdf gerekir) ve resimlerin
+    # küçültüleceği hedef yazıcı çözünürlüğü (0 = küçültme yok)
+    PDF_OPTIMIZE = os.environ.get(
+        'PDF_OPTIMIZE', 'True').lower() in ('true', '1', 'yes')
+    PDF_TARGET_DPI = int(os.environ.get('PDF_TARGET_DPI', 300))
+
+    # Uyarlanabilir resim kodlama: tam sayfayı kaplayan resimlere ayrılan
+    # bayt bütçesi (hücreler alanları oranında pay alır, 0 = sabit kalite)
+    # ve JPEG kalitesinin altına inmeyeceği algısal taban (PSNR, dB)
+    IMAGE_PAGE_BUDGET = int(os.environ.get(
+        'IMAGE_PAGE_BUDGET', 2 * 1024 * 1024))  # 2MB
+    IMAGE_MIN_PSNR = float(os.environ.get('IMAGE_MIN_PSNR', 36))
+    IMAGE_MAX_QUALITY = int(os.environ.get('IMAGE_MAX_QUALITY', 95))
+
+    # Render çözünürlüğü: 0 = yazıcının keşfedilen çözünürlüğü (bilinmiyorsa
+    # 300 DPI); RENDER_MAX_DPI bellek kullanımını sınırlar
+    RENDER_DPI = int(os.environ.get('RENDER_DPI', 0))
+    RENDER_MAX_DPI = int(os.environ.get('RENDER_MAX_DPI', 600))
+    # Yazıcı yetenekleri: elle/test tanım dosyası (JSON) ve önbellek süresi
+    PRINTER_CAPS_FILE = os.environ.get('PRINTER_CAPS_FILE', '')
+    PRINTER_CAPS_TTL = int(os.environ.get('PRINTER_CAPS_TTL', 3600))
+
+    # Adil zamanlayıcı: her turda bir istemciye verilen render payı (bayt)
+    SCHEDULER_QUANTUM = int(os.environ.get('SCHEDULER_QUANTUM', 1024 * 1024))
+    # Bu boyutun altındaki render görevleri öncelikli çalışır
+    SMALL_JOB_BYTES = int(os.environ.get('SMALL_JOB_BYTES', 2 * 1024 * 1024))
+    # İstemci (IP) başına hız sınırı ve bayt kotası (0 = sınırsız)
+    RATE_LIMIT_JOBS_PER_MINUTE = int(os.environ.get('RATE_LIMIT_JOBS_PER_MINUTE', 0))
+    RATE_LIMIT_BURST = int(os.environ.get('RATE_LIMIT_BURST', 0))
+    RATE_LIMIT_BYTES_PER_HOUR = int(os.environ.get('RATE_LIMIT_BYTES_PER_HOUR', 0))
+
+    # Yerel IP adresinin arka planda yenilenme aralığı (saniye, 0 = kapalı)
+    LOCAL_IP_REFRESH_INTERVAL = int(os.environ.get(
+        'LOCAL_IP_REFRESH_INTERVAL', 300))
+
+    # Yazıcı durum monitörünün yenilenme aralığı (saniye)
+    STATUS_REFRESH_INTERVAL = int(os.environ.get(
+        'STATUS_REFRESH_INTERVAL', 10))
+
+    # Yazdırma arka ucu: 'system' (varsayılan yazıcı) veya 'file'
+    # 'file' modunda belgeler PRINT_SINK_DIR klasörüne kopyalanır (test/benchmark)
+    PRINTER_BACKEND = os.environ.get('PRINTER_BACKEND', 'system').lower()
+    PRINT_SINK_DIR = os.environ.get(
+        'PRINT_SINK_DIR', str(BASE_DIR / 'print_sink'))
+
+    # Yazıcı havuzu - boşsa yazıcılar işletim sisteminden keşfedilir
+    # Örnek: [{"name": "HP-A", "color": false, "paper": ["A4"]}, {"name": "HP-B"}]
+    PRINTERS = os.environ.get('PRINTERS', '')
+    # İşin kağıt boyutu (formda 'paper' gönderilmezse)
+    DEFAULT_PAPER = os.environ.get('DEFAULT_PAPER', 'A4')
+
+    # Layout önizlemesi: küçük resim önbelleği (bayt), küçük resmin uzun kenarı
+    # ve önizleme sayfasının en fazla genişliği (piksel)
+    PREVIEW_CACHE_BYTES = int(os.environ.get('PREVIEW_CACHE_BYTES', 64 * 1024 * 1024))
+    PREVIEW_THUMB_SIZE = int(os.environ.get('PREVIEW_THUMB_SIZE', 1024))
+    PREVIEW_MAX_WIDTH = int(os.environ.get('PREVIEW_MAX_WIDTH', 1200))
+
     # Tarayıcı otomatik açma (üretim ortamında kapalı olmalı)
     AUTO_OPEN_BROWSER = os.environ.get(
         'AUTO_OPEN_BROWSER', 'False').lower() in ('true', '1', 'yes')
@@ -40,6 +191,7 @@ class Config:
 class DevelopmentConfig(Config):
     """Geliştirme ortamı konfigürasyonu."""
     DEBUG = True
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'DEBUG').upper()
     AUTO_OPEN_BROWSER = True
 
 
@@ -47,12 +199,14 @@ class ProductionConfig(Config):
     """Üretim ortamı konfigürasyonu."""
     DEBUG = False
     AUTO_OPEN_BROWSER = False
+    SERVER_ENGINE = os.environ.get('SERVER_ENGINE', 'waitress').lower()
 
 
 class TestingConfig(Config):
     """Test ortamı konfigürasyonu."""
     TESTING = True
     DEBUG = True
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'DEBUG').upper()
 
 
 # Ortam bazlı konfigürasyon seçimi
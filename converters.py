@@ -0,0 +1,390 @@
+"""
+Converters - Metin, SVG ve Ofis Belgelerini Vektörel PDF'e Dönüştürme
+
+create_layout_pdf'in önünde çalışan dönüştürme aşaması. Kullanıcıların
+belgeleri telefonda resme çevirip büyük dosyalar yüklemesi yerine küçük
+kaynak dosyalar sunucuda vektörel (keskin ve küçük) PDF'e dönüştürülür.
+
+Dönüştürücüler:
+    - txt: reportlab ile sayfalara bölünmüş metin
+    - svg: svglib (yoksa cairosvg) - ikisi de yoksa desteklenmez
+    - Ofis belgeleri (docx, odt, rtf, xlsx, pptx ...): LibreOffice
+      (soffice --headless) kuruluysa
+
+Her dönüştürme ayrı bir Python sürecinde çalışır (aynı anda en fazla
+workers kadar); takılan dönüştürücüler zaman aşımında sonlandırılır ve
+sunucu sürecini etkilemez. Sonuçlar içerik özetine (SHA-256) göre
+önbelleğe alınır; aynı belge tekrar yüklendiğinde dönüştürme yapılmaz.
+
+Örnek Kullanım:
+    >>> import converters
+    >>> converters.configure('uploads/converted', workers=2)
+    >>> if converters.is_convertible('notlar.txt'):
+    ...     pdf = converters.convert_to_pdf('notlar.txt', 'notlar.pdf')
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from metrics import observe_stage
+
+# Logger yapılandırması
+logger = logging.getLogger(__name__)
+
+TEXT_EXTENSIONS = ('.txt',)
+SVG_EXTENSIONS = ('.svg',)
+OFFICE_EXTENSIONS = ('.doc', '.docx', '.odt', '.rtf', '.xls', '.xlsx', '.ods',
+                     '.ppt', '.pptx', '.odp')
+# Dönüştürücü çıktısı değişirse önbelleği geçersiz kılmak için artırılır
+CACHE_VERSION = '1'
+
+# Metin sayfası ayarları (punto)
+_TEXT_FONT_SIZE = 10
+_TEXT_LEADING = 13
+_TEXT_MARGIN = 50
+# Türkçe karakterleri içeren yazı tipleri (ilk bulunan kullanılır)
+_FONT_CANDIDATES = (
+    '/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf',
+    '/usr/share/fonts/dejavu/DejaVuSansMono.ttf',
+    'C:\\Windows\\Fonts\\consola.ttf',
+    '/System/Library/Fonts/Menlo.ttc',
+)
+
+
+class ConversionError(Exception):
+    """Belge PDF'e dönüştürülemedi"""
+
+
+def find_soffice():
+    """LibreOffice komutunu bul (SOFFICE_PATH veya PATH)"""
+    configured = os.environ.get('SOFFICE_PATH')
+    if configured:
+        return configured if os.path.exists(configured) else None
+    for name in ('soffice', 'libreoffice'):
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+def _svg_backend():
+    """Kurulu SVG dönüştürücüsünün adı (yoksa None)"""
+    try:
+        import svglib  # noqa: F401
+        return 'svglib'
+    except ImportError:
+        pass
+    try:
+        import cairosvg  # noqa: F401
+        return 'cairosvg'
+    except (ImportError, OSError):
+        # cairosvg, cairo kütüphanesi yoksa OSError verir
+        return None
+
+
+def available_extensions():
+    """Bu makinede dönüştürülebilen uzantılar (noktasız)"""
+    extensions = set(TEXT_EXTENSIONS)
+    if _svg_backend():
+        extensions.update(SVG_EXTENSIONS)
+    if find_soffice():
+        extensions.update(OFFICE_EXTENSIONS)
+    return {ext.lstrip('.') for ext in extensions}
+
+
+def is_convertible(path):
+    """Dosya bir dönüştürücüden geçmeli mi?"""
+    ext = Path(path).suffix.lower()
+    return ext in TEXT_EXTENSIONS + SVG_EXTENSIONS + OFFICE_EXTENSIONS
+
+
+def _text_font():
+    """Metin için yazı tipini kaydet ve adını döndür"""
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    import reportlab
+    candidates = list(_FONT_CANDIDATES) + [
+        os.path.join(os.path.dirname(reportlab.__file__), 'fonts', 'Vera.ttf')]
+    for path in candidates:
+        if os.path.exists(path):
+            try:
+                pdfmetrics.registerFont(TTFont('ConverterText', path))
+                return 'ConverterText'
+            except Exception as e:
+                logger.debug("Yazı tipi yüklenemedi %s: %s", path, e)
+    return 'Courier'
+
+
+def _read_text(input_path):
+    """Metni UTF-8 (yoksa Türkçe Windows kod sayfası) olarak oku"""
+    with open(input_path, 'rb') as f:
+        raw = f.read()
+    for encoding in ('utf-8-sig', 'cp1254'):
+        try:
+            return raw.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return raw.decode('latin-1')
+
+
+def convert_text(input_path, output_pdf):
+    """Düz metni A4 sayfalara yaz (satırlar sayfa genişliğinde kırılır)"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.utils import simpleSplit
+    from reportlab.pdfgen import canvas
+    from reportlab import rl_config
+    # Gömülü font ASCII85 yerine ikili yazılır (~%25 daha küçük)
+    rl_config.useA85 = 0
+    font = _text_font()
+    width, height = A4
+    max_width = width - 2 * _TEXT_MARGIN
+    c = canvas.Canvas(output_pdf, pagesize=A4)
+    c.setTitle(Path(input_path).name)
+    y = height - _TEXT_MARGIN
+    c.setFont(font, _TEXT_FONT_SIZE)
+    for line in _read_text(input_path).expandtabs(4).splitlines() or ['']:
+        # Boş satırlar da bir satır yer kaplar
+        for part in simpleSplit(line, font, _TEXT_FONT_SIZE, max_width) or ['']:
+            if y < _TEXT_MARGIN:
+                c.showPage()
+                c.setFont(font, _TEXT_FONT_SIZE)
+                y = height - _TEXT_MARGIN
+            c.drawString(_TEXT_MARGIN, y, part)
+            y -= _TEXT_LEADING
+    c.save()
+    return output_pdf
+
+
+def convert_svg(input_path, output_pdf):
+    """SVG'yi vektörel PDF'e çevir"""
+    backend = _svg_backend()
+    if backend == 'svglib':
+        from svglib.svglib import svg2rlg
+        from reportlab.graphics import renderPDF
+        drawing = svg2rlg(input_path)
+        if drawing is None:
+            raise ConversionError('SVG okunamadı')
+        renderPDF.drawToFile(drawing, output_pdf)
+    elif backend == 'cairosvg':
+        import cairosvg
+        cairosvg.svg2pdf(url=input_path, write_to=output_pdf)
+    else:
+        raise ConversionError('SVG desteği için svglib veya cairosvg kurulmalı')
+    return output_pdf
+
+
+def convert_office(input_path, output_pdf, timeout=120):
+    """Ofis belgesini LibreOffice ile PDF'e çevir"""
+    soffice = find_soffice()
+    if not soffice:
+        raise ConversionError('Ofis belgeleri için LibreOffice (soffice) kurulmalı')
+    workdir = tempfile.mkdtemp(prefix='convert_')
+    try:
+        # Eşzamanlı dönüştürmeler aynı LibreOffice profilini kilitlemesin
+        profile = Path(workdir, 'profile').as_uri()
+        result = subprocess.run(
+            [soffice, f'-env:UserInstallation={profile}', '--headless',
+             '--convert-to', 'pdf', '--outdir', workdir, input_path],
+            capture_output=True, text=True, timeout=timeout)
+        converted = os.path.join(workdir, Path(input_path).stem + '.pdf')
+        if result.returncode != 0 or not os.path.exists(converted):
+            raise ConversionError(
+                f'LibreOffice dönüştürme hatası: {result.stderr.strip() or result.returncode}')
+        shutil.move(converted, output_pdf)
+        return output_pdf
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run_converter(input_path, output_pdf, timeout=120):
+    """Uzantıya uygun dönüştürücüyü bu süreçte çalıştır"""
+    ext = Path(input_path).suffix.lower()
+    if ext in TEXT_EXTENSIONS:
+        return convert_text(input_path, output_pdf)
+    if ext in SVG_EXTENSIONS:
+        return convert_svg(input_path, output_pdf)
+    if ext in OFFICE_EXTENSIONS:
+        return convert_office(input_path, output_pdf, timeout)
+    raise ConversionError(f'Dönüştürücü yok: {ext}')
+
+
+def _digest(path):
+    """Dosya içeriğinin SHA-256 özeti"""
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class ConverterStage:
+    """Süreç sınırlı ve içerik özetli önbellekli dönüştürme aşaması"""
+
+    def __init__(self, cache_dir=None, workers=2, timeout=120):
+        self.cache_dir = cache_dir
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        # Aynı anda çalışan dönüştürme süreci sınırı
+        self._slots = threading.BoundedSemaphore(self.workers)
+        # Aynı belge aynı anda iki kez dönüştürülmesin
+        self._inflight = {}
+        self._stats = {'conversions': 0, 'cache_hits': 0, 'failures': 0}
+
+    def _cache_path(self, input_path):
+        ext = Path(input_path).suffix.lower()
+        key = hashlib.sha256(
+            f'{_digest(input_path)}:{ext}:{CACHE_VERSION}'.encode()).hexdigest()
+        return os.path.join(self.cache_dir, key[:2], key + '.pdf')
+
+    def convert(self, input_path, output_pdf):
+        """Belgeyi PDF'e dönüştür ve output_pdf'e yaz - yolu döndürür"""
+        ext = Path(input_path).suffix.lower().lstrip('.')
+        if self.cache_dir is None:
+            return self._convert_now(input_path, output_pdf, ext)
+        cache_path = self._cache_path(input_path)
+        for _ in range(2):
+            try:
+                self._fill_cache(input_path, cache_path, ext)
+                return self._link_cached(cache_path, output_pdf)
+            except FileNotFoundError:
+                # evict() dosyayı (veya yarım dönüştürmeyi) kullanılmadan önce sildi
+                logger.debug("Önbellekteki PDF silinmiş, tekrar dönüştürülüyor: %s",
+                             Path(input_path).name)
+        # Önbellek sürekli boşaltılıyorsa doğrudan çıktıya dönüştürülür
+        return self._convert_now(input_path, output_pdf, ext)
+
+    def _fill_cache(self, input_path, cache_path, ext):
+        """Önbellekte yoksa belgeyi dönüştürüp önbelleğe yaz"""
+        while True:
+            with self._lock:
+                event = self._inflight.get(cache_path)
+                if event is None:
+                    if os.path.exists(cache_path):
+                        self._stats['cache_hits'] += 1
+                        return
+                    event = self._inflight[cache_path] = threading.Event()
+                    owner = True
+                else:
+                    owner = False
+            if not owner:
+                # Başka bir thread aynı belgeyi dönüştürüyor
+                event.wait(self.timeout)
+                continue
+            try:
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                partial = cache_path + f'.{os.getpid()}.part'
+                self._convert_now(input_path, partial, ext)
+                os.replace(partial, cache_path)
+            finally:
+                with self._lock:
+                    self._inflight.pop(cache_path, None)
+                event.set()
+            return
+
+    @staticmethod
+    def _link_cached(cache_path, output_pdf):
+        """Önbellekteki dosyayı işe ait çıktıya bağla (silinmişse FileNotFoundError)
+
+        İş dosyaları temizlendiğinde önbellek etkilenmez.
+        """
+        os.utime(cache_path)
+        try:
+            os.link(cache_path, output_pdf)
+        except FileNotFoundError:
+            raise
+        except OSError:
+            shutil.copyfile(cache_path, output_pdf)
+        return output_pdf
+
+    def _convert_now(self, input_path, output_pdf, ext):
+        """Dönüştürmeyi ayrı bir süreçte çalıştır ve bekle"""
+        try:
+            with self._slots, observe_stage('convert', '', ext):
+                try:
+                    result = subprocess.run(
+                        [sys.executable, os.path.abspath(__file__),
+                         input_path, output_pdf, str(self.timeout)],
+                        capture_output=True, text=True, timeout=self.timeout + 30)
+                except subprocess.TimeoutExpired:
+                    raise ConversionError('Dönüştürme zaman aşımına uğradı')
+                if result.returncode != 0 or not os.path.exists(output_pdf):
+                    lines = result.stderr.strip().splitlines()
+                    raise ConversionError(lines[-1] if lines else 'Dönüştürme başarısız')
+        except Exception:
+            with self._lock:
+                self._stats['failures'] += 1
+            if os.path.exists(output_pdf):
+                os.remove(output_pdf)
+            raise
+        with self._lock:
+            self._stats['conversions'] += 1
+        logger.info("Belge PDF'e dönüştürüldü: %s (%d bytes)",
+                    Path(input_path).name, os.path.getsize(output_pdf))
+        return output_pdf
+
+    def evict(self, max_age):
+        """max_age saniyedir kullanılmayan önbellek dosyalarını sil
+
+        Yarım dönüştürmeler (*.part) sürmekte olabilir; yalnızca dönüştürme
+        zaman aşımını geçmiş (çökmüş süreçten kalmış) olanlar silinir.
+        """
+        if self.cache_dir is None or not os.path.isdir(self.cache_dir):
+            return 0
+        now = time.time()
+        cutoff = now - max_age
+        part_cutoff = now - max(max_age, self.timeout + 60)
+        removed = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    limit = part_cutoff if name.endswith('.part') else cutoff
+                    if os.stat(path).st_mtime <= limit:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    continue
+        return removed
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, workers=self.workers)
+
+
+# Varsayılan aşama: configure() çağrılmazsa önbelleksiz çalışır
+_stage = ConverterStage()
+
+
+def configure(cache_dir=None, workers=2, timeout=120):
+    """Varsayılan dönüştürme aşamasını ayarla"""
+    global _stage
+    _stage = ConverterStage(cache_dir, workers, timeout)
+    return _stage
+
+
+def get_stage():
+    return _stage
+
+
+def convert_to_pdf(input_path, output_pdf):
+    """Belgeyi varsayılan aşama ile PDF'e dönüştür"""
+    return _stage.convert(input_path, output_pdf)
+
+
+if __name__ == '__main__':
+    # Dönüştürme süreci: converters.py GİRİŞ ÇIKIŞ [ZAMAN_AŞIMI]
+    try:
+        run_converter(sys.argv[1], sys.argv[2],
+                      int(sys.argv[3]) if len(sys.argv) > 3 else 120)
+    except Exception as e:
+        print(f'{type(e).__name__}: {e}', file=sys.stderr)
+        sys.exit(1)
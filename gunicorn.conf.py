@@ -0,0 +1,32 @@
+"""
+Gunicorn konfigürasyonu (Linux/macOS)
+
+Kullanım:
+    FLASK_ENV=production SERVER_WORKERS=4 gunicorn -c gunicorn.conf.py wsgi:application
+
+Not: Her worker süreci kendi durum monitörünü ve metrik kaydını tutar.
+Uygulama master süreçte yüklenmez: fork'ta thread'ler kopyalanmadığı için
+log, iş günlüğü ve temizlik thread'leri her worker'da fork sonrası başlar.
+İş kurtarma, periyodik temizlik, küme worker'ı ve sıcak klasörler kilidi
+alan tek worker'da çalışır.
+"""
+
+from config import get_config
+
+_config = get_config()
+
+bind = f"{_config.HOST}:{_config.PORT}"
+workers = _config.SERVER_WORKERS
+worker_class = 'gthread'
+threads = _config.SERVER_THREADS
+keepalive = _config.SERVER_KEEPALIVE
+timeout = _config.SERVER_CHANNEL_TIMEOUT
+# Uygulama fork'tan önce yüklenirse worker'lar ölü thread tutamaçları devralır
+preload_app = False
+
+
+def post_worker_init(worker):
+    """Worker fork edilip uygulamayı yükledikten sonra servisleri başlat"""
+    from app import print_startup_banner, prepare_service
+    if prepare_service():
+        print_startup_banner()
@@ -0,0 +1,286 @@
+"""
+Hot Folder - Klasöre Bırakılan Dosyaları Otomatik Yazdırma
+
+Tanımlı klasörlere bırakılan (ör. tarayıcıdan gelen) dosyalar web arayüzüne
+tek tek yüklenmeden, /upload-multiple ile aynı render/yazdırma hattına
+gönderilir. Klasörler Linux'ta inotify ile (inotify_simple kuruluysa)
+izlenir, diğer durumlarda periyodik tarama yapılır.
+
+Yarım yazılmış dosyalar alınmaz: dosyanın boyutu ve değişiklik zamanı
+settle süresi boyunca değişmemiş olmalıdır. Alınan dosyalar önce sürecin
+kendi .processing/<host>-<pid>/ klasörüne taşınır (birden çok süreç aynı
+klasörü izlese de dosyayı yalnızca taşımayı başaran alır), iş bitince
+processed/ veya failed/ alt klasörüne taşınır. Başlangıçta yalnızca bu
+sürecin ve aynı makinede artık çalışmayan süreçlerin klasörleri kurtarılır;
+diğer makinelerdeki süreçlerin klasörlerine dokunulmaz.
+
+Klasör tanımları (HOT_FOLDERS, JSON liste):
+    [{"path": "/srv/tarama/muhasebe", "layout": "4", "combine": true},
+     {"path": "/srv/tarama/foto", "layout": "1", "paper": "A5"}]
+Seçenekler: layout, combine, pack, sort (varsayılan true), color, paper,
+print (varsayılan true).
+
+Örnek Kullanım:
+    >>> from hot_folder import HotFolderWatcher, parse_folders
+    >>> watcher = HotFolderWatcher(parse_folders(config.HOT_FOLDERS),
+    ...                            submit_fn=process_hot_folder_batch)
+    >>> watcher.start()
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+
+from process_owner import pid_alive
+
+# Logger yapılandırması
+logger = logging.getLogger(__name__)
+
+PROCESSING_DIR = '.processing'
+PROCESSED_DIR = 'processed'
+FAILED_DIR = 'failed'
+
+_DEFAULTS = {'layout': '1', 'combine': False, 'pack': False, 'sort': True,
+             'color': None, 'paper': None, 'print': True}
+
+
+def parse_folders(value):
+    """HOT_FOLDERS ayarını klasör tanımlarına çevir (boşsa boş liste)"""
+    if not value:
+        return []
+    folders = []
+    for item in json.loads(value):
+        if isinstance(item, str):
+            item = {'path': item}
+        folder = dict(_DEFAULTS, **item)
+        folder['path'] = os.path.abspath(os.path.expanduser(folder['path']))
+        folder['layout'] = str(folder['layout'])
+        folder['name'] = item.get('name') or os.path.basename(folder['path'])
+        folders.append(folder)
+    return folders
+
+
+def _unique_target(directory, name):
+    """Hedef klasörde çakışmayan dosya yolu"""
+    target = os.path.join(directory, name)
+    if not os.path.exists(target):
+        return target
+    stem, ext = os.path.splitext(name)
+    return os.path.join(directory, f"{stem}_{int(time.time() * 1000)}{ext}")
+
+
+def _make_waiter(path):
+    """Klasör değişikliğini bekleyen fonksiyon - inotify yoksa sadece uyur"""
+    try:
+        from inotify_simple import INotify, flags
+    except ImportError:
+        return None
+    inotify = INotify()
+    inotify.add_watch(path, flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE)
+
+    def wait(timeout):
+        # Olay gelince erken döner; olayların içeriği önemli değil, klasör taranır
+        return bool(inotify.read(timeout=int(timeout * 1000)))
+    return wait
+
+
+class HotFolderWatcher:
+    """Klasör başına bir thread ile dosyaları toplayıp işe dönüştürür"""
+
+    def __init__(self, folders, submit_fn, extensions=None, poll_interval=2.0,
+                 settle_seconds=3.0, batch_size=100):
+        self.folders = folders
+        # submit_fn(folder, paths) -> yanıt verisi (process_batch_job biçiminde)
+        self.submit_fn = submit_fn
+        self.extensions = {ext.lower().lstrip('.') for ext in extensions} \
+            if extensions else None
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.batch_size = max(1, batch_size)
+        self._stop = threading.Event()
+        self._threads = []
+        self._stats = {'files': 0, 'failed': 0, 'jobs': 0}
+        self._lock = threading.Lock()
+        # Sürecin .processing/ altındaki kendi klasörü
+        self.host = socket.gethostname()
+        self.claim_name = f"{self.host}-{os.getpid()}"
+
+    def start(self):
+        """Klasörleri hazırla ve izleme thread'lerini başlat"""
+        for folder in self.folders:
+            for sub in (PROCESSED_DIR, FAILED_DIR):
+                os.makedirs(os.path.join(folder['path'], sub), exist_ok=True)
+            os.makedirs(self._processing_dir(folder), exist_ok=True)
+            self._recover(folder)
+            thread = threading.Thread(target=self._watch, args=(folder,),
+                                      name=f"hot-folder-{folder['name']}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+        logger.info("Sıcak klasörler izleniyor: %s",
+                    ', '.join(folder['path'] for folder in self.folders))
+
+    def stop(self):
+        self._stop.set()
+
+    def _processing_dir(self, folder):
+        return os.path.join(folder['path'], PROCESSING_DIR, self.claim_name)
+
+    def _is_abandoned(self, name):
+        """.processing/<host>-<pid> klasörünün sahibi artık çalışmıyor mu?
+
+        Kendi klasörü aynı pid'li önceki bir çalışmadan kalmıştır. Başka
+        makinedeki süreçlerin durumu bilinemediği için dokunulmaz.
+        """
+        if name == self.claim_name:
+            return True
+        host, _, pid = name.rpartition('-')
+        if host != self.host or not pid.isdigit():
+            return False
+        return not pid_alive(int(pid))
+
+    def _recover(self, folder):
+        """Önceki çalışmada işlenirken kalan dosyaları failed/ klasörüne taşı
+
+        Yazdırılıp yazdırılmadıkları bilinmediği için tekrar kuyruğa alınmaz
+        (çift baskı riski); kullanıcı gerekirse dosyayı tekrar bırakır.
+        Yalnızca bu sürecin ve çalışmayan süreçlerin klasörleri taranır.
+        """
+        processing = os.path.join(folder['path'], PROCESSING_DIR)
+        for name in os.listdir(processing):
+            path = os.path.join(processing, name)
+            if not os.path.isdir(path):
+                # Süreç klasörlerinden önceki sürümden kalan dosya
+                self._recover_file(folder, path)
+                continue
+            if not self._is_abandoned(name):
+                continue
+            for file_name in os.listdir(path):
+                self._recover_file(folder, os.path.join(path, file_name))
+            if name != self.claim_name:
+                try:
+                    os.rmdir(path)
+                except OSError:
+                    pass
+
+    def _recover_file(self, folder, path):
+        self._move(folder, path, FAILED_DIR)
+        logger.warning("Yarım kalan sıcak klasör dosyası failed/ klasörüne taşındı: %s",
+                       os.path.basename(path))
+
+    def _watch(self, folder):
+        """Klasörü inotify veya periyodik tarama ile izle"""
+        wait = None
+        try:
+            wait = _make_waiter(folder['path'])
+        except OSError as e:
+            logger.warning("inotify kullanılamıyor (%s) - periyodik tarama: %s",
+                           folder['path'], e)
+        pending = {}
+        while not self._stop.is_set():
+            try:
+                ready = self.scan(folder, pending)
+                for start in range(0, len(ready), self.batch_size):
+                    self._process(folder, ready[start:start + self.batch_size])
+            except Exception as e:
+                logger.exception("Sıcak klasör hatası %s: %s", folder['path'], e)
+            # Beklenen dosya varsa settle süresi dolunca tekrar bakılır
+            timeout = min(self.poll_interval, self.settle_seconds) if pending \
+                else self.poll_interval
+            if wait is not None:
+                wait(timeout)
+            else:
+                self._stop.wait(timeout)
+
+    def _accepts(self, name):
+        if name.startswith('.') or name.startswith('~'):
+            return False
+        ext = os.path.splitext(name)[1].lower().lstrip('.')
+        return self.extensions is None or ext in self.extensions
+
+    def scan(self, folder, pending):
+        """Yazılması bitmiş dosyaları sahiplen - .processing/ yollarını döndür
+
+        pending: {yol: (boyut, mtime, ilk_görülme)} - taramalar arası durum.
+        """
+        now = time.time()
+        seen = set()
+        ready = []
+        with os.scandir(folder['path']) as entries:
+            for entry in entries:
+                if not entry.is_file(follow_symlinks=False) or not self._accepts(entry.name):
+                    continue
+                stat = entry.stat()
+                seen.add(entry.path)
+                signature = (stat.st_size, stat.st_mtime)
+                previous = pending.get(entry.path)
+                if previous is None or previous[:2] != signature:
+                    pending[entry.path] = signature + (now,)
+                    continue
+                # Boyut ve zaman settle süresince değişmediyse dosya tamamdır
+                if now - previous[2] < self.settle_seconds or \
+                        now - stat.st_mtime < self.settle_seconds:
+                    continue
+                claimed = self._claim(folder, entry.path)
+                del pending[entry.path]
+                if claimed:
+                    ready.append(claimed)
+        for path in list(pending):
+            if path not in seen:
+                del pending[path]
+        if folder.get('sort', True):
+            ready.sort(key=lambda path: os.path.basename(path).lower())
+        return ready
+
+    def _claim(self, folder, path):
+        """Dosyayı sürecin .processing/ klasörüne taşı (başka süreç aldıysa None)"""
+        target = _unique_target(self._processing_dir(folder), os.path.basename(path))
+        try:
+            os.rename(path, target)
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            # Dosya hâlâ kilitliyse (ör. Windows paylaşımı) sonra tekrar denenir
+            logger.debug("Dosya alınamadı %s: %s", path, e)
+            return None
+        return target
+
+    def _move(self, folder, path, sub):
+        """Dosyayı processed/ veya failed/ altına taşı"""
+        try:
+            os.replace(path, _unique_target(os.path.join(folder['path'], sub),
+                                            os.path.basename(path)))
+        except OSError as e:
+            logger.warning("Dosya taşınamadı %s: %s", path, e)
+
+    def _process(self, folder, paths):
+        """Dosyaları işe dönüştür ve sonuca göre taşı"""
+        if not paths:
+            return
+        logger.info("Sıcak klasör işi: %s (%d dosya)", folder['name'], len(paths))
+        try:
+            response = self.submit_fn(folder, paths) or {}
+        except Exception as e:
+            logger.exception("Sıcak klasör işi başarısız: %s", e)
+            response = {'success': False, 'message': str(e)}
+        # Ayrı işlemede dosya başına sonuç, birleştirmede tek sonuç
+        results = {result['filename']: result['success']
+                   for result in response.get('results') or ()}
+        # Küme kuyruğuna alınan iş teslim edilmiştir; sonucu kuyrukta izlenir
+        accepted = response.get('success', False) or response.get('status') == 'queued'
+        failed = 0
+        for path in paths:
+            success = results.get(os.path.basename(path), accepted)
+            failed += not success
+            self._move(folder, path, PROCESSED_DIR if success else FAILED_DIR)
+        with self._lock:
+            self._stats['jobs'] += 1
+            self._stats['files'] += len(paths)
+            self._stats['failed'] += failed
+
+    def stats(self):
+        """İzlenen klasörler ve işlenen dosya sayıları"""
+        with self._lock:
+            return dict(self._stats, folders=[folder['path'] for folder in self.folders])
@@ -0,0 +1,211 @@
+"""
+Image Encoder - Sayfa Bütçesine Göre Uyarlanabilir Resim Kodlama
+
+Sayfaya yerleştirilen her resmin JPEG kalite 95 ile kodlanması, 9'lu
+sayfadaki küçük hücrelerde yazıcının ayırt edebileceğinden çok daha fazla
+bayt taşır. Bu aşama kodlayıcıyı ve kaliteyi resim başına seçer:
+    - Renkli görünmeyen resimler tek kanala (DeviceGray) çevrilir
+    - Az renkli resimler (metin, grafik, ekran görüntüsü) JPEG'den küçükse
+      kayıpsız Flate ile gömülür
+    - Diğerleri, sayfa bütçesinden hücrenin alanı oranında aldığı paya
+      sığan en yüksek JPEG kalitesiyle kodlanır; kalite algısal tabanın
+      (PSNR) altına düşürülmez
+
+Kalite tüm resim yerine resmin dört bölgesinden alınan küçük bir örnek
+karo üzerinde ölçülür; karonun boyutu resmin piksel sayısına oranlanır.
+Sayfa bütçesi 0 ise resimler eskisi gibi sabit kaliteyle JPEG'e kodlanır.
+Pillow ilk kodlamada yüklenir; configure() servis başlangıcını yavaşlatmaz.
+
+Örnek Kullanım:
+    >>> encoder = ImageEncoder(page_budget=2 * 1024 * 1024, min_psnr=36)
+    >>> codec, img, data = encoder.encode(img, share=1 / 9)   # 9'lu sayfada bir hücre
+"""
+
+import io
+import logging
+import math
+import threading
+import zlib
+
+from metrics import observe_stage
+
+# Logger yapılandırması
+logger = logging.getLogger(__name__)
+
+CODECS = ('jpeg', 'flate')
+# Denenecek JPEG kaliteleri (artan sırada)
+QUALITIES = (40, 50, 60, 70, 75, 80, 85, 90, 95)
+# Kalite ölçümünde kullanılan örnek karonun kenarı (piksel)
+TILE_SIZE = 256
+# Kanallar arası farkı bu değeri aşmayan resimler gri tonlu sayılır
+# (taranmış siyah-beyaz belgelerdeki JPEG renk gürültüsü için pay)
+GRAY_TOLERANCE = 12
+# En fazla bu kadar renk içeren resimler için Flate denenir
+FLATE_MAX_COLORS = 256
+
+
+def flatten(img):
+    """Resmi RGB veya L kipine getir - şeffaf alanlar beyaz kağıt rengine"""
+    from PIL import Image
+    if img.mode in ('RGBA', 'LA', 'P'):
+        img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, 'white')
+        background.paste(img, mask=img.getchannel('A'))
+        return background
+    if img.mode not in ('RGB', 'L'):
+        return img.convert('RGB')
+    return img
+
+
+def is_gray(img):
+    """Renkli resim gri tonlu mu? (küçültülmüş kopyada kanallar karşılaştırılır)"""
+    from PIL import ImageChops
+    if img.mode != 'RGB':
+        return img.mode == 'L'
+    small = img.reduce(max(1, max(img.size) // TILE_SIZE))
+    red, green, blue = small.split()
+    return max(ImageChops.difference(red, green).getextrema()[1],
+               ImageChops.difference(green, blue).getextrema()[1]) <= GRAY_TOLERANCE
+
+
+def sample_tile(img, size=TILE_SIZE):
+    """Resmin dört çeyreğinin ortasından alınan parçalardan örnek karo
+
+    Karodan küçük resimlerde resmin kendisi döner (ölçüm birebir olur).
+    """
+    from PIL import Image
+    if img.width * img.height <= size * size:
+        return img
+    half_w, half_h = min(size // 2, img.width), min(size // 2, img.height)
+    tile = Image.new(img.mode, (2 * half_w, 2 * half_h))
+    for index, (fx, fy) in enumerate(((1, 1), (3, 1), (1, 3), (3, 3))):
+        # Parçalar JPEG bloklarına (8 piksel) hizalanır
+        x = max(0, min(img.width * fx // 4 - half_w // 2, img.width - half_w)) // 8 * 8
+        y = max(0, min(img.height * fy // 4 - half_h // 2, img.height - half_h)) // 8 * 8
+        tile.paste(img.crop((x, y, x + half_w, y + half_h)),
+                   (index % 2 * half_w, index // 2 * half_h))
+    return tile
+
+
+def psnr(original, decoded):
+    """İki resim arasındaki tepe sinyal/gürültü oranı (dB)"""
+    from PIL import ImageChops, ImageStat
+    stat = ImageStat.Stat(ImageChops.difference(original, decoded))
+    mse = sum(stat.sum2) / (original.width * original.height * len(stat.sum2))
+    return math.inf if not mse else 10 * math.log10(255 ** 2 / mse)
+
+
+def _jpeg(img, quality):
+    buffer = io.BytesIO()
+    img.save(buffer, 'JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+class ImageEncoder:
+    """Resim başına kodlayıcı ve kalite seçen kodlama aşaması"""
+
+    def __init__(self, page_budget=0, min_psnr=36.0, max_quality=95):
+        # Tam sayfayı kaplayan resimlere ayrılan bayt (0 = sabit kalite)
+        self.page_budget = page_budget
+        self.min_psnr = min_psnr
+        self.max_quality = max_quality
+        self.qualities = [q for q in QUALITIES if q < max_quality] + [max_quality]
+        self._lock = threading.Lock()
+        self._stats = {'jpeg': 0, 'flate': 0, 'gray': 0, 'quality_total': 0}
+
+    def choose(self, img, share=1.0):
+        """Kodlama kararı - (kodlayıcı, resim, kalite)
+
+        share: resmin sayfa alanındaki payı (9'lu sayfada bir hücre ~1/9).
+        Dönen resim gri tonluya çevrilmiş olabilir.
+        """
+        img = flatten(img)
+        if img.mode == 'RGB' and is_gray(img):
+            img = img.convert('L')
+        tile = sample_tile(img)
+        scale = img.width * img.height / (tile.width * tile.height)
+        quality, size = self._choose_quality(tile, self.page_budget * share / scale)
+        codec = 'jpeg'
+        # Flate kayıpsızdır; az renkli resimde JPEG'den küçükse tercih edilir
+        if tile.getcolors(FLATE_MAX_COLORS) is not None and \
+                len(zlib.compress(tile.tobytes())) <= size:
+            codec = 'flate'
+        logger.debug("Resim kodlama: %s %s kalite=%d pay=%.3f", codec, img.mode,
+                     quality, share)
+        return codec, img, quality
+
+    def _choose_quality(self, tile, budget):
+        """Karo bütçesine sığan ve PSNR tabanını sağlayan kalite - (kalite, bayt)"""
+        from PIL import Image
+        qualities = self.qualities
+        encoded = {}
+
+        def encode(index):
+            if index not in encoded:
+                encoded[index] = _jpeg(tile, qualities[index])
+            return encoded[index]
+
+        # Bütçeye sığan en yüksek kalite (ikili arama); hiçbiri sığmazsa en düşük
+        best, low, high = 0, 0, len(qualities) - 1
+        while low <= high:
+            middle = (low + high) // 2
+            if len(encode(middle)) <= budget:
+                best, low = middle, middle + 1
+            else:
+                high = middle - 1
+        # Algısal taban bütçeden önce gelir: kalite taban sağlanana kadar artırılır
+        while best < len(qualities) - 1:
+            with Image.open(io.BytesIO(encode(best))) as decoded:
+                if psnr(tile, decoded.convert(tile.mode)) >= self.min_psnr:
+                    break
+            best += 1
+        return qualities[best], len(encode(best))
+
+    def encode(self, img, share=1.0, layout='', file_type=''):
+        """Resmi kodla - (kodlayıcı, resim, bayt)
+
+        JPEG için bayt kodlanmış veridir; Flate için None döner (ham
+        pikseller PDF'e yazılırken sıkıştırılır).
+        """
+        if not self.page_budget:
+            codec, quality = 'jpeg', self.max_quality
+            img = flatten(img)
+        else:
+            with observe_stage('encode_select', layout, file_type):
+                codec, img, quality = self.choose(img, share)
+        with self._lock:
+            self._stats[codec] += 1
+            self._stats['gray'] += img.mode == 'L'
+            if codec == 'jpeg':
+                self._stats['quality_total'] += quality
+        if codec == 'flate':
+            return codec, img, None
+        with observe_stage('jpeg_encode', layout, file_type):
+            return codec, img, _jpeg(img, quality)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        total = stats.pop('quality_total')
+        stats['avg_jpeg_quality'] = round(total / stats['jpeg'], 1) if stats['jpeg'] else None
+        return dict(stats, page_budget=self.page_budget, min_psnr=self.min_psnr)
+
+
+# Varsayılan kodlayıcı: configure() çağrılmazsa sabit kalite 95 ile çalışır
+_encoder = ImageEncoder()
+
+
+def configure(page_budget=0, min_psnr=36.0, max_quality=95):
+    """Varsayılan kodlayıcıyı ayarla"""
+    global _encoder
+    _encoder = ImageEncoder(page_budget, min_psnr, max_quality)
+    return _encoder
+
+
+def get_encoder():
+    return _encoder
+
+
+def encode(img, share=1.0, layout='', file_type=''):
+    """Resmi varsayılan kodlayıcı ile kodla - (kodlayıcı, resim, bayt)"""
+    return _encoder.encode(img, share, layout, file_type)
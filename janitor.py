@@ -0,0 +1,220 @@
+"""
+Janitor - Arka Plan Dosya Temizleyicisi
+
+Bu modül, yükleme klasöründeki geçici dosyaları istek thread'lerinin
+dışında siler:
+    - Biten işlerin dosyaları discard() ile kuyruğa atılır ve kısa bir
+      gecikmeden sonra (yazıcı kuyruğu dosyayı okurken silinmesin diye)
+      arka planda silinir.
+    - Klasör periyodik olarak os.scandir ile parça parça taranır; yaş
+      sınırını aşan dosyalar silinir, toplam boyut kotayı aşarsa en eski
+      dosyalardan başlanarak yer açılır.
+    - Aktif işlere ait dosyalar (iş kimliği önekiyle) taramada atlanır.
+
+Örnek Kullanım:
+    >>> from janitor import Janitor
+    >>> janitor = Janitor('uploads', max_age=3600, quota_bytes=1 << 30)
+    >>> janitor.discard([input_path, output_pdf], delay=5)
+    >>> janitor.request_sweep(max_age=0)
+"""
+
+import heapq
+import logging
+import math
+import os
+import threading
+import time
+
+# Logger yapılandırması
+logger = logging.getLogger(__name__)
+
+
+class Janitor:
+    """Gecikmeli silme kuyruğu ve artımlı klasör taraması yapan thread"""
+
+    def __init__(self, folder, max_age=3600, quota_bytes=0, interval=300,
+                 batch_size=200, min_age=60, active_jobs=None, on_sweep=None):
+        self.folder = folder
+        self.max_age = max_age
+        self.quota_bytes = quota_bytes
+        self.interval = interval
+        self.batch_size = batch_size
+        # Bu yaştan genç dosyalar hala yükleniyor olabilir, taramada atlanır
+        self.min_age = min_age
+        # Aktif iş kimliklerini döndüren fonksiyon (iş günlüğünden)
+        self._active_jobs = active_jobs or (lambda: set())
+        # Her taramanın sonunda max_age ile çağrılır (ör. blob deposu temizliği)
+        self._on_sweep = on_sweep
+        self._pending = []
+        self._cond = threading.Condition()
+        self._sweep_request = None
+        self._next_sweep = 0.0
+        # False: periyodik tarama yapılmaz (çok süreçte taramayı tek süreç yapar);
+        # gecikmeli silmeler ve istenen taramalar yine çalışır
+        self.periodic = True
+        self._thread = None
+        self._stats = {
+            'deleted': 0,
+            'freed_bytes': 0,
+            'last_sweep': None,
+            'last_sweep_deleted': 0,
+            'last_sweep_duration': 0.0
+        }
+
+    def start(self, initial_sweep_delay=None):
+        """Temizlik thread'ini başlat (tekrar çağrılabilir)"""
+        with self._cond:
+            if self._thread is not None:
+                return
+            if initial_sweep_delay is None:
+                initial_sweep_delay = self.interval
+            self._next_sweep = time.monotonic() + initial_sweep_delay
+            self._thread = threading.Thread(
+                target=self._run, name='janitor', daemon=True)
+            self._thread.start()
+
+    def discard(self, paths, delay=0):
+        """Dosyaları belirtilen gecikmeden sonra silinmek üzere kuyruğa al"""
+        self.start()
+        due = time.monotonic() + delay
+        with self._cond:
+            for path in paths:
+                if path:
+                    heapq.heappush(self._pending, (due, path))
+            self._cond.notify()
+
+    def flush(self, timeout=30):
+        """Kuyruktaki silmeleri gecikmeleri dolunca bu thread'de çalıştır
+
+        Süreç kapanmadan önce (ör. komut satırı aracı) geçici dosyaların
+        arkada kalmaması için kullanılır; timeout sonrasına kalanlar bırakılır.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._cond:
+                if not self._pending or self._pending[0][0] > deadline:
+                    return
+                due, path = heapq.heappop(self._pending)
+            time.sleep(max(0.0, due - time.monotonic()))
+            self._remove(path)
+
+    def request_sweep(self, max_age=None):
+        """Bir sonraki fırsatta tarama yap (max_age=0: aktif olmayan her şey)"""
+        self.start()
+        with self._cond:
+            age = self.max_age if max_age is None else max_age
+            if self._sweep_request is None or age < self._sweep_request:
+                self._sweep_request = age
+            self._cond.notify()
+
+    def stats(self):
+        """Temizlik istatistiklerini döndür"""
+        with self._cond:
+            return dict(self._stats, pending=len(self._pending))
+
+    def _run(self):
+        """Kuyruktaki silmeleri ve periyodik taramaları çalıştır"""
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    due = []
+                    while self._pending and self._pending[0][0] <= now:
+                        due.append(heapq.heappop(self._pending)[1])
+                    sweep_age = self._sweep_request
+                    if sweep_age is None and self.periodic and now >= self._next_sweep:
+                        sweep_age = self.max_age
+                    if due or sweep_age is not None:
+                        self._sweep_request = None
+                        break
+                    wake_at = self._next_sweep if self.periodic else math.inf
+                    if self._pending:
+                        wake_at = min(wake_at, self._pending[0][0])
+                    self._cond.wait(None if wake_at == math.inf else max(0.0, wake_at - now))
+            for path in due:
+                self._remove(path)
+            if sweep_age is not None:
+                try:
+                    self.sweep(sweep_age)
+                except Exception as e:
+                    logger.exception("Klasör taraması hatası: %s", e)
+                self._next_sweep = time.monotonic() + self.interval
+
+    def _remove(self, path, size=None):
+        """Dosyayı sil, başarılıysa True döndür"""
+        try:
+            if size is None:
+                size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            logger.warning("Silinemedi %s: %s", os.path.basename(path), e)
+            return False
+        logger.debug("Silindi: %s", os.path.basename(path))
+        with self._cond:
+            self._stats['deleted'] += 1
+            self._stats['freed_bytes'] += size
+        return True
+
+    def sweep(self, max_age=None):
+        """Klasörü parça parça tara; yaş ve boyut kotasını uygula"""
+        max_age = self.max_age if max_age is None else max_age
+        if not os.path.isdir(self.folder):
+            return 0
+        started = time.monotonic()
+        now = time.time()
+        active = self._active_jobs()
+        kept = []
+        total = 0
+        deleted = 0
+        scanned = 0
+        with os.scandir(self.folder) as it:
+            for entry in it:
+                scanned += 1
+                if scanned % self.batch_size == 0:
+                    # Diğer thread'lere ve diske nefes aldır
+                    time.sleep(0.01)
+                if entry.name.startswith('.'):
+                    continue
+                if entry.name.split('_', 1)[0] in active:
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue
+                age = now - st.st_mtime
+                if age < self.min_age:
+                    total += st.st_size
+                    continue
+                if age >= max_age:
+                    if self._remove(entry.path, st.st_size):
+                        deleted += 1
+                    continue
+                total += st.st_size
+                kept.append((st.st_mtime, st.st_size, entry.path))
+
+        # Kota aşıldıysa en eski dosyalardan başlayarak yer aç
+        if self.quota_bytes and total > self.quota_bytes:
+            kept.sort()
+            for _, size, path in kept:
+                if total <= self.quota_bytes:
+                    break
+                if self._remove(path, size):
+                    deleted += 1
+                total -= size
+
+        if self._on_sweep is not None:
+            deleted += self._on_sweep(max_age, active) or 0
+
+        duration = time.monotonic() - started
+        with self._cond:
+            self._stats['last_sweep'] = now
+            self._stats['last_sweep_deleted'] = deleted
+            self._stats['last_sweep_duration'] = round(duration, 3)
+        if deleted:
+            logger.info("Klasör taraması: %d/%d dosya silindi (%.2fs)",
+                        deleted, scanned, duration)
+        return deleted
@@ -0,0 +1,227 @@
+"""
+Job Journal - Kalıcı, Sadece Eklenen İş Günlüğü
+
+Bu modül, yazdırma işlerinin durum geçişlerini SQLite (WAL modu) üzerinde
+sadece eklenen (append-only) bir olay tablosuna kaydeder. Servis bir iş
+ortasında yeniden başlarsa, tamamlanmamış işler bu günlükten bulunup
+yeniden kuyruğa alınabilir.
+
+Yazma maliyetini düşük tutmak için record() çağrısı sadece bir kuyruğa
+ekleme yapar; ayrı bir yazıcı thread'i olayları toplu olarak tek bir
+transaction içinde kaydeder (group commit). Yazdırmaya geçiş gibi çift
+baskıyı önleyen geçişler record_sync() ile diske yazılmadan dönmez.
+
+Durumlar:
+    - received: Dosyalar kaydedildi (iş tanımı data içinde)
+    - rendering: Layout PDF oluşturuluyor
+    - printing: Belge yazdırma arka ucuna gönderiliyor
+    - file_done: Çoklu işte bir dosya tamamlandı
+    - done / failed: İş bitti (terminal durumlar)
+
+Örnek Kullanım:
+    >>> from job_journal import JobJournal
+    >>> journal = JobJournal('jobs.db')
+    >>> journal.record(job_id, 'received', kind='single', files=[...])
+    >>> journal.incomplete_jobs()
+"""
+
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+# Logger yapılandırması
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATES = ('done', 'failed')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    ts REAL NOT NULL,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS events_job_id ON events (job_id, seq);
+CREATE INDEX IF NOT EXISTS events_terminal ON events (state, ts)
+    WHERE state IN ('done', 'failed');
+"""
+
+
+class JobJournal:
+    """SQLite tabanlı, toplu yazma yapan iş günlüğü"""
+
+    def __init__(self, path, batch_size=256, retention=86400):
+        self.path = path
+        self._batch_size = batch_size
+        self._retention = retention
+        self._queue = queue.SimpleQueue()
+        self._writer = None
+        self._lock = threading.Lock()
+        self._conn = None
+        self._last_compact = 0.0
+
+    def _connect(self):
+        """Yeni bir SQLite bağlantısı aç ve şemayı hazırla"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        # WAL + NORMAL: her commit'te fsync yok, çökme durumunda tutarlı
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def _ensure_started(self):
+        """Bağlantıyı ve yazıcı thread'ini ilk kullanımda başlat"""
+        if self._writer is not None:
+            return
+        with self._lock:
+            if self._writer is not None:
+                return
+            self._conn = self._connect()
+            self._writer = threading.Thread(
+                target=self._write_loop, name='job-journal-writer', daemon=True)
+            self._writer.start()
+
+    def record(self, job_id, state, **data):
+        """Durum geçişini kaydet (bloklamaz)"""
+        self._ensure_started()
+        payload = json.dumps(data, ensure_ascii=False) if data else None
+        self._queue.put((job_id, state, time.time(), payload))
+
+    def _write_loop(self):
+        """Kuyruktaki olayları toplu olarak yaz"""
+        while True:
+            item = self._queue.get()
+            batch = []
+            waiters = []
+            while item is not None:
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                if len(batch) >= self._batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    item = None
+            if batch:
+                try:
+                    with self._conn:
+                        self._conn.executemany(
+                            'INSERT INTO events (job_id, state, ts, data) VALUES (?, ?, ?, ?)',
+                            batch)
+                except sqlite3.Error as e:
+                    logger.error("İş günlüğüne yazılamadı (%d olay): %s",
+                                 len(batch), e)
+            for waiter in waiters:
+                waiter.set()
+            self._maybe_compact()
+
+    def record_sync(self, job_id, state, timeout=5, **data):
+        """Durum geçişini diske yazılana kadar bekleyerek kaydet - başarılıysa True
+
+        Önce kuyruktaki olaylar yazılır (sıra korunur), sonra olay ayrı bir
+        bağlantıda synchronous=FULL ile eklenir; süreç veya makine çökse de
+        geçiş kaybolmaz.
+        """
+        self._ensure_started()
+        if not self.flush(timeout):
+            logger.error("İş günlüğü kuyruğu %ss içinde yazılamadı", timeout)
+        payload = json.dumps(data, ensure_ascii=False) if data else None
+        try:
+            conn = self._connect()
+            try:
+                conn.execute('PRAGMA synchronous=FULL')
+                with conn:
+                    conn.execute(
+                        'INSERT INTO events (job_id, state, ts, data) VALUES (?, ?, ?, ?)',
+                        (job_id, state, time.time(), payload))
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.error("İş günlüğüne yazılamadı (%s %s): %s", job_id, state, e)
+            return False
+        return True
+
+    def flush(self, timeout=5):
+        """Kuyruktaki tüm olayların yazılmasını bekle"""
+        if self._writer is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def _maybe_compact(self):
+        """Saklama süresini aşan bitmiş işlerin olaylarını sil"""
+        now = time.time()
+        if now - self._last_compact < 3600:
+            return
+        self._last_compact = now
+        try:
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM events WHERE job_id IN ("
+                    " SELECT job_id FROM events"
+                    " WHERE state IN ('done', 'failed') AND ts < ?)",
+                    (now - self._retention,))
+        except sqlite3.Error as e:
+            logger.warning("İş günlüğü sıkıştırılamadı: %s", e)
+
+    def _read_connection(self):
+        """Okuma için ayrı bağlantı (WAL sayesinde yazıcıyı bloklamaz)"""
+        self._ensure_started()
+        return self._connect()
+
+    def incomplete_jobs(self):
+        """Terminal duruma ulaşmamış işleri döndür
+
+        Her iş için: job_id, state (son durum), data (received verisi),
+        done_files (tamamlanan dosyalar), printing_files (yazdırılırken
+        kesilen dosyalar; paralel işlerde birden fazla olabilir).
+        """
+        self.flush()
+        conn = self._read_connection()
+        try:
+            rows = conn.execute(
+                "SELECT job_id, state, data FROM events WHERE job_id IN ("
+                " SELECT job_id FROM events GROUP BY job_id"
+                " HAVING SUM(state IN ('done', 'failed')) = 0)"
+                " ORDER BY job_id, seq").fetchall()
+        finally:
+            conn.close()
+        jobs = {}
+        for job_id, state, data in rows:
+            data = json.loads(data) if data else {}
+            job = jobs.setdefault(job_id, {
+                'job_id': job_id, 'state': None, 'data': {},
+                'done_files': [], 'printing_files': []})
+            job['state'] = state
+            if state == 'received':
+                job['data'] = data
+            elif state == 'file_done':
+                job['done_files'].append(data.get('file'))
+                if data.get('file') in job['printing_files']:
+                    job['printing_files'].remove(data.get('file'))
+            elif state == 'printing':
+                job['printing_files'].append(data.get('file'))
+        return list(jobs.values())
+
+    def history(self, job_id):
+        """Bir işin tüm durum geçişlerini döndür"""
+        self.flush()
+        conn = self._read_connection()
+        try:
+            rows = conn.execute(
+                'SELECT state, ts, data FROM events WHERE job_id = ? ORDER BY seq',
+                (job_id,)).fetchall()
+        finally:
+            conn.close()
+        return [{'state': state, 'ts': ts, 'data': json.loads(data) if data else {}}
+                for state, ts, data in rows]
@@ -11,26 +11,208 @@ Layout Seçenekleri:
     - 6: 6 kopya (2x3)
     - 9: 9 kopya (3x3)
 
+Çoklu dosyalarda her dosyanın kendi layout'u, döndürmesi ve sığdırma
+modu olabilir (create_manifest_pdf). Farklı boyuttaki resimler raflara
+(shelf) yerleştirilerek sayfa sayısı azaltılır.
+
+Ara resimler diske yazılmaz; render_layout_buffer küçük işlerin PDF'ini
+tamamen bellekte üretir.
+
 Örnek Kullanım:
     >>> from layout_handler import create_layout_pdf
     >>> output = create_layout_pdf("image.jpg", "4")
     >>> print(f"PDF oluşturuldu: {output}")
 """
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw, ImageFont, ImageOps
 from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import A4, letter
+from reportlab.lib.pagesizes import A4, A5, legal, letter
 from reportlab.lib.units import inch, mm
+from reportlab.lib.utils import ImageReader
+from reportlab import rl_config
+import io
 import os
 import time
+import uuid
 import tempfile
 from pathlib import Path
 import platform
 import logging
+from metrics import observe_stage
+import image_encoder
+import converters
 
 # Logger yapılandırması
 logger = logging.getLogger(__name__)
 
+# PDF akışları ikili yazılır; ASCII85 kodlaması resim ve fontları ~%25
+# büyütür ve yalnızca 7-bit kanallar için gereklidir
+rl_config.useA85 = 0
+
+# Layout -> (sütun, satır)
+LAYOUT_GRIDS = {'1': (1, 1), '2': (2, 1), '4': (2, 2), '6': (2, 3), '9': (3, 3)}
+# Dosya başına seçenekler (saat yönünde döndürme, sığdır/doldur)
+ROTATIONS = (0, 90, 180, 270)
+FIT_MODES = ('fit', 'fill')
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff')
+# Yazıcı yeteneği bilinmiyorsa resimlerin örnekleneceği çözünürlük
+DEFAULT_DPI = 300
+# Kağıt adı -> sayfa boyutu (punto)
+PAGE_SIZES = {'A4': A4, 'A5': A5, 'LETTER': letter, 'LEGAL': legal}
+# Manifest sayfalarında kenar boşluğu ve resimler arası boşluk (punto)
+PAGE_MARGIN = 5 * mm
+CELL_GAP = 5 * mm
+
+
+# EXIF Orientation etiketi -> düzeltme işlemi
+_EXIF_TRANSPOSE = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+# Saat yönünde döndürme -> PIL işlemi
+_ROTATE = {
+    90: Image.Transpose.ROTATE_270,
+    180: Image.Transpose.ROTATE_180,
+    270: Image.Transpose.ROTATE_90,
+}
+
+
+class _JpegImage(ImageReader):
+    """Bellekteki JPEG - PDF'e yeniden kodlanmadan (DCTDecode) gömülür"""
+
+    def __init__(self, data):
+        super().__init__(io.BytesIO(data))
+        self._jpeg = data
+        self._dataA = None
+
+    def getRGBData(self):
+        # Canvas bu veriyi yalnızca resmin kimliği (özet) için kullanır;
+        # pikselleri açmak yerine JPEG baytları yeterlidir
+        return self._jpeg
+
+
+def encode_image(img, share=1.0, layout='', file_type=''):
+    """Resmi bellekte kodla - canvas.drawImage'e verilebilir nesne döndürür
+
+    Kodlayıcı (JPEG/Flate, gri ton) ve JPEG kalitesi image_encoder ile
+    resmin sayfadaki payına (share) göre seçilir.
+    """
+    codec, img, data = image_encoder.encode(img, share, layout, file_type)
+    if codec == 'flate':
+        # reportlab ham pikselleri Flate ile sıkıştırarak gömer
+        return ImageReader(img)
+    return _JpegImage(data)
+
+
+def page_size(paper):
+    """Kağıdın sayfa boyutu (punto) - bilinmeyen kağıt A4 sayılır"""
+    return PAGE_SIZES.get(str(paper or 'A4').upper(), A4)
+
+
+def page_share(draw_size, paper='A4'):
+    """Çizim alanının sayfa alanındaki payı (kodlama bütçesi için)"""
+    page = page_size(paper)
+    return draw_size[0] * draw_size[1] / (page[0] * page[1])
+
+
+def layout_grid(layout):
+    """Layout için (sütun, satır) - bilinmeyen layout tek hücredir"""
+    return LAYOUT_GRIDS.get(str(layout), (1, 1))
+
+
+def exif_orientation(img):
+    """EXIF Orientation değeri (yoksa 1)"""
+    try:
+        return img.getexif().get(0x0112, 1)
+    except Exception:
+        return 1
+
+
+def oriented_size(img, orientation):
+    """EXIF yönü uygulandıktan sonraki (genişlik, yükseklik)"""
+    width, height = img.size
+    return (height, width) if orientation in (5, 6, 7, 8) else (width, height)
+
+
+def auto_rotation(size, box):
+    """Resim hücreye döndürülerek daha büyük basılıyorsa 90, değilse 0"""
+    upright = min(box[0] / size[0], box[1] / size[1])
+    turned = min(box[0] / size[1], box[1] / size[0])
+    return 90 if turned > upright * 1.001 else 0
+
+
+def fit_size(size, box):
+    """Oranı koruyarak kutuya sığan en büyük boyut"""
+    ratio = min(box[0] / size[0], box[1] / size[1])
+    return max(1, int(size[0] * ratio)), max(1, int(size[1] * ratio))
+
+
+def source_limited(size, source):
+    """Hedef piksel boyutunu kaynağın piksel boyutuyla sınırla (oran korunur)
+
+    Küçük resimler büyütülmez; PDF resmi çizim boyutuna kendisi ölçekler.
+    """
+    ratio = min(1, source[0] / size[0], source[1] / size[1])
+    return max(1, round(size[0] * ratio)), max(1, round(size[1] * ratio))
+
+
+def prepare_image(img, size, orientation=1, rotation=0, fit='fit',
+                  resample=Image.Resampling.LANCZOS):
+    """Resmi son boyutuna küçült, ardından EXIF yönünü ve döndürmeyi uygula
+
+    size döndürülmüş son görüntünün boyutudur. Küçültme döndürmeden önce
+    yapılır; döndürme küçük resim üzerinde yapıldığı için maliyeti düşüktür.
+    """
+    swap = (orientation in (5, 6, 7, 8)) != (rotation in (90, 270))
+    raw_size = (size[1], size[0]) if swap else size
+    if fit == 'fill':
+        img = ImageOps.fit(img, raw_size, resample)
+    else:
+        img = img.resize(raw_size, resample)
+    if orientation in _EXIF_TRANSPOSE:
+        img = img.transpose(_EXIF_TRANSPOSE[orientation])
+    if rotation in _ROTATE:
+        img = img.transpose(_ROTATE[rotation])
+    return img
+
+
+def grid_cell(size, layout='1', paper='A4', dpi=DEFAULT_DPI, upscale=False):
+    """Izgara layout'unda resmin (döndürme, piksel boyutu, çizim boyutu) değerleri
+
+    size EXIF yönü uygulanmış resim boyutudur. Resim hücrenin %90'ına
+    sığdırılır ve hücreyi daha çok dolduruyorsa 90 derece döndürülür.
+    Piksel boyutu hedef çözünürlükte, çizim boyutu puntodur. PDF hattı ve
+    önizleme (preview) aynı geometriyi bu fonksiyondan alır.
+    Piksel boyutu resmin kendi boyutunu aşmaz (upscale=False); PDF küçük
+    resmi çizim boyutuna büyütür. Raster önizleme upscale=True kullanır.
+    """
+    page = page_size(paper)
+    cols, rows = layout_grid(layout)
+    page_width, page_height = round(page[0] * dpi / 72), round(page[1] * dpi / 72)
+    box = (int(page_width / cols * 0.9), int(page_height / rows * 0.9))
+    rotation = auto_rotation(size, box)
+    if rotation:
+        size = (size[1], size[0])
+    fitted = fit_size(size, box)
+    pixels = fitted if upscale else source_limited(fitted, size)
+    return rotation, pixels, (fitted[0] * 72 / dpi, fitted[1] * 72 / dpi)
+
+
+def grid_position(slot, layout, paper, draw_size):
+    """Izgaradaki sıradaki hücrede ortalanmış resmin sol alt köşesi (punto, PDF ekseni)"""
+    page = page_size(paper)
+    cols, rows = layout_grid(layout)
+    cell_width, cell_height = page[0] / cols, page[1] / rows
+    row, col = divmod(slot % (cols * rows), cols)
+    x = col * cell_width + (cell_width - draw_size[0]) / 2
+    y = page[1] - (row + 1) * cell_height + (cell_height - draw_size[1]) / 2
+    return x, y
+
 
 def get_image_size(image_path):
     """Resim boyutlarını al"""
@@ -38,11 +220,12 @@ def get_image_size(image_path):
         with Image.open(image_path) as img:
             return img.size
     except Exception as e:
-        print(f"Resim boyutu alınamadı: {e}")
+        logger.warning("Resim boyutu alınamadı: %s", e)
         return (800, 600)  # Varsayılan boyut
 
 
-def create_layout_pdf(input_file, layout='1'):
+def create_layout_pdf(input_file, layout='1', output_pdf=None, rotation=None, fit='fit',
+                      dpi=DEFAULT_DPI, paper='A4'):
     """
     Girdi dosyasını belirtilen layout'a göre PDF'e dönüştür
     Layout seçenekleri:
@@ -52,219 +235,339 @@ def create_layout_pdf(input_file, layout='1'):
     6: 6 kopya (2x3)
     9: 9 kopya (3x3)
     Not: PDF dosyaları için işlem yapılamaz, sadece resim dosyaları desteklenir.
+    Metin, SVG ve ofis belgeleri converters ile PDF'e dönüştürülür.
+    output_pdf verilmezse çıktı giriş dosyasının yanına yazılır.
+    Resimler hücreyi en çok dolduran yöne otomatik döndürülür. rotation
+    (saat yönünde derece) veya fit='fill' verilirse kopyalar
+    create_manifest_pdf ile yerleştirilir.
+    dpi ve paper hedef yazıcının çözünürlüğü ve kağıdıdır; resimler bu
+    çözünürlüğe örneklenir.
     """
-    print(f"🎨 Layout PDF oluşturuluyor: {input_file} -> Layout: {layout}")
+    logger.debug("Layout PDF oluşturuluyor: %s -> Layout: %s", input_file, layout)
     file_ext = Path(input_file).suffix.lower()
-    output_dir = os.path.dirname(input_file)
-    base_name = Path(input_file).stem
-    output_pdf = os.path.join(output_dir, f"{base_name}_layout_{layout}.pdf")
+    if output_pdf is None:
+        output_dir = os.path.dirname(input_file)
+        base_name = Path(input_file).stem
+        output_pdf = os.path.join(output_dir, f"{base_name}_layout_{layout}.pdf")
+    if converters.is_convertible(input_file):
+        # Metin/SVG/ofis belgeleri vektörel PDF'e dönüştürülür (layout uygulanmaz);
+        # dönüştürme hatası çağırana iletilir
+        return converters.convert_to_pdf(input_file, output_pdf)
     try:
         if file_ext == '.pdf':
-            print("⚠️ PDF dosyaları desteklenmiyor. Sadece resim dosyaları işlenebilir.")
+            logger.info("PDF dosyalarına layout uygulanmaz, dosya olduğu gibi kullanılıyor")
             return input_file
-        elif file_ext in ['.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff']:
-            return process_image_layout(input_file, output_pdf, layout)
+        elif file_ext in IMAGE_EXTENSIONS:
+            if rotation is not None or fit != 'fit':
+                cols, rows = layout_grid(layout)
+                item = {'path': input_file, 'layout': layout,
+                        'rotation': rotation, 'fit': fit}
+                return create_manifest_pdf([item] * (cols * rows), output_pdf,
+                                           dpi=dpi, paper=paper) or input_file
+            return process_image_layout(input_file, output_pdf, layout, dpi, paper)
         else:
             # Desteklenmeyen format için basit kopyalama
-            print(f"⚠️ Desteklenmeyen dosya formatı: {file_ext}")
+            logger.warning("Desteklenmeyen dosya formatı: %s", file_ext)
             return input_file  # Hata durumunda orijinal dosyayı döndür
     except Exception as e:
-        print(f"❌ Layout PDF oluşturma hatası: {e}")
+        logger.error("Layout PDF oluşturma hatası: %s", e)
         return input_file  # Hata durumunda orijinal dosyayı döndür
 
 
-def process_image_layout(input_image, output_pdf, layout):
+def render_layout_buffer(input_file, layout='1', rotation=None, fit='fit',
+                         dpi=DEFAULT_DPI, paper='A4'):
+    """
+    Resmin layout PDF'ini diske yazmadan üret
+    PDF baytlarını memoryview olarak döndürür; resim değilse veya render
+    başarısızsa None döner (çağıran dosya tabanlı yola geçer).
+    """
+    if Path(input_file).suffix.lower() not in IMAGE_EXTENSIONS:
+        return None
+    buffer = io.BytesIO()
+    if create_layout_pdf(input_file, layout, buffer, rotation, fit,
+                         dpi, paper) is not buffer:
+        return None
+    return buffer.getbuffer()
+
+
+def process_image_layout(input_image, output_pdf, layout, dpi=DEFAULT_DPI, paper='A4'):
     """Resim dosyası için layout işlemi"""
+    file_type = Path(input_image).suffix.lower().lstrip('.')
     try:
         # Resmi aç
         with Image.open(input_image) as img:
-            # RGBA'ya dönüştür (şeffaflık desteği için)
-            if img.mode not in ['RGB', 'RGBA']:
-                img = img.convert('RGB')
-            layout_num = int(layout)
-            # A4 boyutları (300 DPI)
-            a4_width, a4_height = 2480, 3508  # 300 DPI A4
+            with observe_stage('decode', layout, file_type):
+                img.load()
+                # RGBA'ya dönüştür (şeffaflık desteği için)
+                if img.mode not in ['RGB', 'RGBA']:
+                    img = img.convert('RGB')
+            cols, rows = layout_grid(layout)
             # PDF oluştur
-            c = canvas.Canvas(output_pdf, pagesize=A4)
-            temp_image_path = None
-            try:
-                if layout_num == 1:
-                    # Tek resim - sayfaya sığdır
-                    img_width, img_height = img.size
-                    # Oranı koru
-                    ratio = min(a4_width/img_width, a4_height/img_height) * 0.9
-                    new_width = int(img_width * ratio)
-                    new_height = int(img_height * ratio)
-                    # Resimi yeniden boyutlandır
-                    resized_img = img.resize(
-                        (new_width, new_height), Image.Resampling.LANCZOS)
-                    # Geçici dosya oluştur
-                    temp_image_path = tempfile.mktemp(suffix='.jpg')
-                    resized_img.save(temp_image_path, 'JPEG', quality=95)
-                    # PDF'e ekle (ortalanmış)
-                    x = (A4[0] - new_width * 72/300) / 2
-                    y = (A4[1] - new_height * 72/300) / 2
-                    c.drawImage(temp_image_path, x, y,
-                                width=new_width * 72/300,
-                                height=new_height * 72/300)
-                else:
-                    # Çoklu layout
-                    if layout_num == 2:
-                        cols, rows = 2, 1
-                    elif layout_num == 4:
-                        cols, rows = 2, 2
-                    elif layout_num == 6:
-                        cols, rows = 2, 3
-                    elif layout_num == 9:
-                        cols, rows = 3, 3
-                    else:
-                        cols, rows = 1, 1
-                    # Her hücre boyutu
-                    cell_width = A4[0] / cols
-                    cell_height = A4[1] / rows
-                    # Resimi küçült
-                    small_width = int(a4_width / cols * 0.9)
-                    small_height = int(a4_height / rows * 0.9)
-                    # Oranı koru
-                    img_ratio = img.size[0] / img.size[1]
-                    cell_ratio = small_width / small_height
-                    if img_ratio > cell_ratio:
-                        # Genişlik sınırlayıcı
-                        final_width = small_width
-                        final_height = int(small_width / img_ratio)
-                    else:
-                        # Yükseklik sınırlayıcı
-                        final_height = small_height
-                        final_width = int(small_height * img_ratio)
-                    small_img = img.resize(
-                        (final_width, final_height), Image.Resampling.LANCZOS)
-                    # Geçici dosya oluştur
-                    temp_image_path = tempfile.mktemp(suffix='.jpg')
-                    small_img.save(temp_image_path, 'JPEG', quality=95)
-                    # Her hücreye resmi yerleştir
-                    for row in range(rows):
-                        for col in range(cols):
-                            x = col * cell_width + \
-                                (cell_width - final_width * 72/300) / 2
-                            y = A4[1] - (row + 1) * cell_height + \
-                                (cell_height - final_height * 72/300) / 2
-                            c.drawImage(temp_image_path, x, y,
-                                        width=final_width * 72/300,
-                                        height=final_height * 72/300)
+            c = canvas.Canvas(output_pdf, pagesize=page_size(paper))
+            orientation = exif_orientation(img)
+            # Hücre geometrisi (gerekirse döndürerek, oranı koruyarak)
+            rotation, pixels, draw_size = grid_cell(
+                oriented_size(img, orientation), layout, paper, dpi)
+            # Resimi yeniden boyutlandır, sonra döndür
+            with observe_stage('resize', layout, file_type):
+                small_img = prepare_image(img, pixels, orientation, rotation)
+            # Bellekte bir kez kodlanır, her hücrede aynı resim kullanılır
+            image = encode_image(small_img, page_share(draw_size, paper), layout, file_type)
+            # Her hücreye resmi yerleştir (tek sayfada ortalanmış)
+            for slot in range(cols * rows):
+                x, y = grid_position(slot, layout, paper, draw_size)
+                c.drawImage(image, x, y, width=draw_size[0], height=draw_size[1])
+            with observe_stage('pdf_encode', layout, file_type):
                 c.save()
-                # Geçici dosyayı temizle
-                if temp_image_path and os.path.exists(temp_image_path):
-                    os.remove(temp_image_path)
-                print(f"✅ Resim Layout tamamlandı: {output_pdf}")
-                return output_pdf
-            except Exception as inner_e:
-                # Geçici dosyayı temizle
-                if temp_image_path and os.path.exists(temp_image_path):
-                    os.remove(temp_image_path)
-                raise inner_e
+            logger.debug("Resim layout tamamlandı: %s", output_pdf)
+            return output_pdf
     except Exception as e:
-        print(f"❌ Resim layout hatası: {e}")
+        logger.error("Resim layout hatası: %s", e)
         return input_image
 
 
-def create_multi_file_pdf(file_list, layout='1'):
+def create_multi_file_pdf(file_list, layout='1', output_dir=None, dpi=DEFAULT_DPI,
+                          paper='A4', output_pdf=None):
     """
     Birden fazla resim dosyasını tek PDF'te birleştir
     Not: Sadece resim dosyaları desteklenir, PDF dosyaları atlanır.
+    output_pdf verilmezse çıktı output_dir'e (o da verilmezse ilk dosyanın
+    klasörüne) benzersiz bir adla yazılır.
     """
     if not file_list:
         return None
-    print(f"📚 Çoklu dosya PDF oluşturuluyor: {len(file_list)} dosya")
+    logger.debug("Çoklu dosya PDF oluşturuluyor: %d dosya", len(file_list))
     # Sadece resim dosyalarını filtrele
-    image_extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff']
     image_files = [f for f in file_list if Path(
-        f).suffix.lower() in image_extensions]
+        f).suffix.lower() in IMAGE_EXTENSIONS]
     if not image_files:
-        print("❌ İşlenebilir resim dosyası bulunamadı")
+        logger.warning("İşlenebilir resim dosyası bulunamadı")
         return None
     # Çıktı dosyası
-    output_dir = os.path.dirname(
-        file_list[0]) if file_list else tempfile.gettempdir()
-    timestamp = int(time.time())
-    output_pdf = os.path.join(
-        output_dir, f"combined_layout_{layout}_{timestamp}.pdf")
+    if output_pdf is None:
+        if output_dir is None:
+            output_dir = os.path.dirname(
+                file_list[0]) if file_list else tempfile.gettempdir()
+        timestamp = int(time.time())
+        # Aynı saniyede gelen eşzamanlı işler birbirinin çıktısını ezmesin
+        unique = uuid.uuid4().hex[:8]
+        output_pdf = os.path.join(
+            output_dir, f"combined_layout_{layout}_{timestamp}_{unique}.pdf")
     try:
         # Reportlab ile PDF oluştur
-        c = canvas.Canvas(output_pdf, pagesize=A4)
-        layout_num = int(layout)
+        c = canvas.Canvas(output_pdf, pagesize=page_size(paper))
         # Layout hesaplamaları
-        if layout_num == 2:
-            cols, rows = 2, 1
-        elif layout_num == 4:
-            cols, rows = 2, 2
-        elif layout_num == 6:
-            cols, rows = 2, 3
-        elif layout_num == 9:
-            cols, rows = 3, 3
-        else:
-            cols, rows = 1, 1
+        cols, rows = layout_grid(layout)
         current_position = 0
         total_positions = cols * rows
         for file_path in image_files:
-            print(f"  📄 İşleniyor: {os.path.basename(file_path)}")
+            logger.debug("İşleniyor: %s", os.path.basename(file_path))
+            file_type = Path(file_path).suffix.lower().lstrip('.')
             try:
                 with Image.open(file_path) as img:
-                    if img.mode not in ['RGB', 'RGBA']:
-                        img = img.convert('RGB')
+                    with observe_stage('decode', layout, file_type):
+                        img.load()
+                        if img.mode not in ['RGB', 'RGBA']:
+                            img = img.convert('RGB')
                     # Yeni sayfa gerekli mi?
                     if current_position >= total_positions:
                         c.showPage()
                         current_position = 0
-                    # Pozisyon hesapla
-                    row = current_position // cols
-                    col = current_position % cols
-                    # Hücre boyutları
-                    cell_width = A4[0] / cols
-                    cell_height = A4[1] / rows
-                    # Resim boyutlarını hesapla
-                    img_width, img_height = img.size
-                    target_width = int(2480 / cols * 0.9)  # 300 DPI
-                    target_height = int(3508 / rows * 0.9)
-                    # Oranı koru
-                    img_ratio = img_width / img_height
-                    cell_ratio = target_width / target_height
-                    if img_ratio > cell_ratio:
-                        final_width = target_width
-                        final_height = int(target_width / img_ratio)
-                    else:
-                        final_height = target_height
-                        final_width = int(target_height * img_ratio)
-                    # Resimi yeniden boyutlandır
-                    resized_img = img.resize(
-                        (final_width, final_height), Image.Resampling.LANCZOS)
-                    # Geçici dosya oluştur
-                    temp_image_path = tempfile.mktemp(suffix='.jpg')
-                    resized_img.save(temp_image_path, 'JPEG', quality=95)
-                    # Pozisyon hesapla
-                    x = col * cell_width + \
-                        (cell_width - final_width * 72/300) / 2
-                    y = A4[1] - (row + 1) * cell_height + \
-                        (cell_height - final_height * 72/300) / 2
-                    # Resimi PDF'e ekle
-                    c.drawImage(temp_image_path, x, y,
-                                width=final_width * 72/300,
-                                height=final_height * 72/300)
-                    # Geçici dosyayı temizle
-                    if os.path.exists(temp_image_path):
-                        os.remove(temp_image_path)
+                    # Hücre geometrisi (hedef çözünürlükte, gerekirse döndürerek)
+                    orientation = exif_orientation(img)
+                    rotation, pixels, draw_size = grid_cell(
+                        oriented_size(img, orientation), layout, paper, dpi)
+                    # Resimi yeniden boyutlandır, sonra döndür
+                    with observe_stage('resize', layout, file_type):
+                        resized_img = prepare_image(img, pixels, orientation, rotation)
+                    # Bellekte kodla (JPEG/Flate, kalite sayfa bütçesine göre)
+                    image = encode_image(resized_img, page_share(draw_size, paper),
+                                         layout, file_type)
+                    # Resimi hücresine ortalanmış olarak ekle
+                    x, y = grid_position(current_position, layout, paper, draw_size)
+                    c.drawImage(image, x, y, width=draw_size[0], height=draw_size[1])
                     current_position += 1
             except Exception as img_error:
-                print(f"⚠️ Resim işlenemedi {file_path}: {img_error}")
+                logger.warning("Resim işlenemedi %s: %s", file_path, img_error)
                 continue
         # Son sayfayı kaydet
-        c.save()
-        print(f"✅ Çoklu dosya PDF tamamlandı: {output_pdf}")
+        with observe_stage('pdf_encode', layout, 'combined'):
+            c.save()
+        logger.debug("Çoklu dosya PDF tamamlandı: %s", output_pdf)
+        return output_pdf
+    except Exception as e:
+        logger.error("Çoklu dosya PDF hatası: %s", e)
+        return None
+
+
+def pack_shelves(boxes, page_size, gap=0, sort=False):
+    """Kutuları (genişlik, yükseklik) raf yöntemiyle sayfalara yerleştir
+
+    Sayfa başına [(kutu_indeksi, x, y)] listesi döner; y sayfanın üstünden
+    ölçülür. sort=False ise sıra korunur ve kutular son rafa eklenir
+    (next-fit). sort=True ise kutular yüksekliğe göre büyükten küçüğe
+    sıralanıp sığdıkları ilk sayfanın ilk rafına konur (FFDH); sayfa
+    sayısı en aza iner ama sıra korunmaz.
+    """
+    page_width, page_height = page_size[0] + gap, page_size[1] + gap
+    eps = 1e-6
+    pages = []
+    order = sorted(range(len(boxes)), key=lambda i: -boxes[i][1]) \
+        if sort else range(len(boxes))
+    for index in order:
+        width = min(boxes[index][0], page_size[0]) + gap
+        height = min(boxes[index][1], page_size[1]) + gap
+        placed = False
+        for page in (pages if sort else pages[-1:]):
+            shelves = page['shelves'] if sort else page['shelves'][-1:]
+            for shelf in shelves:
+                # Son raf, sayfada yer varsa uzun kutu için büyüyebilir
+                grow = max(0, height - shelf['height'])
+                if shelf['used'] + width > page_width + eps:
+                    continue
+                if grow and (shelf is not page['shelves'][-1]
+                             or page['used'] + grow > page_height + eps):
+                    continue
+                shelf['items'].append((index, shelf['used']))
+                shelf['used'] += width
+                shelf['height'] += grow
+                page['used'] += grow
+                placed = True
+                break
+            if not placed and page['used'] + height <= page_height + eps:
+                # Sayfada yeni raf aç
+                page['shelves'].append({'top': page['used'], 'height': height,
+                                        'used': width, 'items': [(index, 0)]})
+                page['used'] += height
+                placed = True
+            if placed:
+                break
+        if not placed:
+            pages.append({'used': height, 'shelves': [
+                {'top': 0, 'height': height, 'used': width, 'items': [(index, 0)]}]})
+    result = []
+    for page in pages:
+        placements = []
+        for shelf in page['shelves']:
+            # Raf yatayda ortalanır, kutular raf içinde dikeyde ortalanır
+            offset = (page_width - shelf['used']) / 2
+            for index, x in shelf['items']:
+                height = min(boxes[index][1], page_size[1])
+                y = shelf['top'] + (shelf['height'] - gap - height) / 2
+                placements.append((index, offset + x, y))
+        result.append(placements)
+    return result
+
+
+def item_box(size, layout, rotation, fit, area):
+    """Manifest öğesinin sayfadaki kutusu (punto) ve döndürmesi
+
+    rotation None ise hücreyi en çok dolduran yön seçilir. PDF hattı ve
+    önizleme (preview) aynı geometriyi bu fonksiyondan alır.
+    """
+    cols, rows = layout_grid(layout)
+    cell = ((area[0] - (cols - 1) * CELL_GAP) / cols,
+            (area[1] - (rows - 1) * CELL_GAP) / rows)
+    if rotation is None:
+        rotation = auto_rotation(size, cell)
+    if fit == 'fill':
+        return cell, rotation
+    width, height = size if rotation in (0, 180) else (size[1], size[0])
+    ratio = min(cell[0] / width, cell[1] / height)
+    return (width * ratio, height * ratio), rotation
+
+
+def create_manifest_pdf(items, output_pdf=None, output_dir=None, pack=False,
+                        dpi=DEFAULT_DPI, paper='A4'):
+    """
+    Dosya başına seçeneklerle resimleri tek PDF'te birleştir
+    items: {'path', 'layout', 'rotation', 'fit'} sözlükleri (layout hücre
+    boyutunu belirler: '4' -> sayfanın dörtte biri). rotation verilmeyen
+    resimler hücreyi en çok dolduran yöne döndürülür.
+    pack=True ise sıra korunmaz, resimler en az sayfaya yerleştirilir.
+    Not: Sadece resim dosyaları desteklenir, diğerleri atlanır.
+    """
+    items = [item for item in items
+             if Path(item['path']).suffix.lower() in IMAGE_EXTENSIONS]
+    if not items:
+        logger.warning("İşlenebilir resim dosyası bulunamadı")
+        return None
+    if output_pdf is None:
+        if output_dir is None:
+            output_dir = os.path.dirname(items[0]['path'])
+        output_pdf = os.path.join(
+            output_dir, f"manifest_{int(time.time())}_{uuid.uuid4().hex[:8]}.pdf")
+    page = page_size(paper)
+    area = (page[0] - 2 * PAGE_MARGIN, page[1] - 2 * PAGE_MARGIN)
+    boxes, rotations = [], []
+    for item in items:
+        box, rotation = (0, 0), 0
+        try:
+            with Image.open(item['path']) as img:
+                size = oriented_size(img, exif_orientation(img))
+                box, rotation = item_box(size, item.get('layout', '1'),
+                                          item.get('rotation'),
+                                          item.get('fit', 'fit'), area)
+        except Exception as e:
+            logger.warning("Resim okunamadı %s: %s", item['path'], e)
+        boxes.append(box)
+        rotations.append(rotation)
+    pages = pack_shelves(boxes, area, CELL_GAP, sort=pack)
+    logger.debug("Manifest PDF: %d resim, %d sayfa", len(items), len(pages))
+    # Aynı resim aynı kutuya birden çok kez konursa tek kez kodlanır
+    encoded = {}
+    try:
+        c = canvas.Canvas(output_pdf, pagesize=page)
+        for page_number, placements in enumerate(pages):
+            if page_number:
+                c.showPage()
+            for index, x, y in placements:
+                item, (width, height) = items[index], boxes[index]
+                if not width:
+                    continue
+                rotation, fit = rotations[index], item.get('fit', 'fit')
+                layout = str(item.get('layout', '1'))
+                key = (item['path'], rotation, fit, round(width, 2), round(height, 2))
+                if key not in encoded:
+                    encoded[key] = _encode_cell(item['path'], rotation, fit,
+                                                width, height, layout, dpi,
+                                                width * height / (page[0] * page[1]))
+                c.drawImage(encoded[key], PAGE_MARGIN + x,
+                            page[1] - PAGE_MARGIN - y - height,
+                            width=width, height=height)
+        with observe_stage('pdf_encode', 'manifest', 'combined'):
+            c.save()
+        logger.debug("Manifest PDF tamamlandı: %s", output_pdf)
         return output_pdf
     except Exception as e:
-        print(f"❌ Çoklu dosya PDF hatası: {e}")
+        logger.error("Manifest PDF hatası: %s", e)
         return None
 
 
+def _encode_cell(path, rotation, fit, width, height, layout, dpi=DEFAULT_DPI, share=1.0):
+    """Resmi kutuya göre boyutlandır, döndür ve bellekte kodla
+
+    share: kutunun sayfa alanındaki payı (kodlama bütçesi için).
+    """
+    file_type = Path(path).suffix.lower().lstrip('.')
+    # Kutu boyutu hedef çözünürlükte piksele çevrilir
+    size = (max(1, int(width * dpi / 72)), max(1, int(height * dpi / 72)))
+    with Image.open(path) as img:
+        with observe_stage('decode', layout, file_type):
+            img.load()
+            orientation = exif_orientation(img)
+            if img.mode not in ['RGB', 'RGBA']:
+                img = img.convert('RGB')
+        # Küçük resim kutu boyutuna büyütülmez (drawImage ölçekler)
+        source = oriented_size(img, orientation)
+        if rotation in (90, 270):
+            source = (source[1], source[0])
+        size = source_limited(size, source)
+        with observe_stage('resize', layout, file_type):
+            img = prepare_image(img, size, orientation, rotation, fit)
+        return encode_image(img, share, layout, file_type)
+
+
 if __name__ == "__main__":
     # Test
     test_image = "test.jpg"
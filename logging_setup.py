@@ -0,0 +1,126 @@
+"""
+Logging Setup - Yapılandırılmış ve Kuyruklu Loglama
+
+Bu modül, uygulama genelindeki loglama hattını kurar:
+    - Log kayıtları istek thread'inde biçimlendirilmez; QueueHandler ile
+      kuyruğa atılır ve ayrı bir QueueListener thread'i tarafından yazılır.
+    - Her kayda iş kimliği (job_id) eklenir; aynı yazdırma işine ait
+      satırlar eşzamanlı isteklerde bile ayırt edilebilir.
+    - Çıktı formatı 'text' (key=value) veya 'json' olabilir.
+
+Örnek Kullanım:
+    >>> from logging_setup import setup_logging, job_context
+    >>> setup_logging('INFO', 'json')
+    >>> with job_context() as job_id:
+    ...     logger.info("Dosya kaydedildi: %s", path)
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import uuid
+from contextlib import contextmanager
+
+# Aktif iş kimliği - thread ve context bazında izole edilir
+job_id_var = contextvars.ContextVar('job_id', default='-')
+
+_listener = None
+
+
+def new_job_id():
+    """Kısa, benzersiz bir iş kimliği üret"""
+    return uuid.uuid4().hex[:12]
+
+
+def current_job_id():
+    """Aktif iş kimliğini döndür"""
+    return job_id_var.get()
+
+
+@contextmanager
+def job_context(job_id=None):
+    """Blok süresince log kayıtlarına iş kimliği ekle (dekoratör olarak da kullanılabilir)"""
+    job_id = job_id or new_job_id()
+    token = job_id_var.set(job_id)
+    try:
+        yield job_id
+    finally:
+        job_id_var.reset(token)
+
+
+class _JobQueueHandler(logging.handlers.QueueHandler):
+    """Kaydı biçimlendirmeden kuyruğa atan handler
+
+    Standart QueueHandler mesajı çağıran thread'de biçimlendirir; burada
+    sadece iş kimliği eklenir, biçimlendirme listener thread'inde yapılır.
+    """
+
+    def prepare(self, record):
+        record.job_id = job_id_var.get()
+        return record
+
+
+class KeyValueFormatter(logging.Formatter):
+    """İnsan tarafından okunabilir key=value formatı"""
+
+    def __init__(self):
+        super().__init__(
+            '%(asctime)s level=%(levelname)s logger=%(name)s job=%(job_id)s %(message)s')
+
+    def format(self, record):
+        if not hasattr(record, 'job_id'):
+            record.job_id = job_id_var.get()
+        return super().format(record)
+
+
+class JsonFormatter(logging.Formatter):
+    """Satır başına bir JSON nesnesi üreten format"""
+
+    def format(self, record):
+        entry = {
+            'ts': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'job_id': getattr(record, 'job_id', job_id_var.get()),
+            'message': record.getMessage(),
+            'thread': record.threadName
+        }
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def setup_logging(level='INFO', fmt='text'):
+    """Kök logger'ı kuyruklu handler ile yapılandır (tekrar çağrılabilir)"""
+    global _listener
+    root = logging.getLogger()
+    root.setLevel(level)
+    if _listener is not None:
+        return _listener
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(
+        JsonFormatter() if fmt == 'json' else KeyValueFormatter())
+
+    log_queue = queue.SimpleQueue()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_JobQueueHandler(log_queue))
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging():
+    """Kuyruktaki kayıtları yaz ve listener'ı durdur"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,258 @@
+"""
+Metrics - Prometheus Uyumlu Metrik Kaydı
+
+Bu modül, yazdırma hattının her aşaması için sayaç (counter), anlık değer
+(gauge) ve gecikme histogramlarını tutar ve Prometheus metin formatında
+(/metrics) dışa aktarır. Harici bir bağımlılık gerektirmez.
+
+Aşamalar (stage):
+    - upload_receive: Yüklenen dosyanın diske kaydı
+    - decode: Resmin açılıp piksellerinin çözülmesi
+    - resize: Hedef hücre boyutuna yeniden boyutlandırma
+    - encode_select: Kodlayıcı ve JPEG kalitesinin örnek karoda seçilmesi
+    - jpeg_encode: Yeniden boyutlandırılan resmin JPEG olarak kodlanması
+    - pdf_encode: PDF'in yazılması (canvas.save)
+    - pdf_optimize: PDF'in yazdırma öncesi küçültülmesi (pikepdf)
+    - preview: Layout önizlemesinin çizilip kodlanması (düşük çözünürlük)
+    - spool_submit: Belgenin yazdırma arka ucuna teslimi
+    - spool_complete: İsteğin alınmasından arka ucun dönüşüne kadar toplam süre
+
+Örnek Kullanım:
+    >>> import metrics
+    >>> with metrics.observe_stage('resize', layout='4', file_type='jpg'):
+    ...     small = img.resize(size)
+    >>> metrics.REGISTRY.render()
+"""
+
+import threading
+import time
+import bisect
+from contextlib import contextmanager
+
+# Varsayılan gecikme kovaları (saniye)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(labelnames, values, extra=None):
+    """Etiketleri Prometheus formatına çevir"""
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = []
+    for name, value in pairs:
+        value = str(value).replace('\\', '\\\\').replace(
+            '"', '\\"').replace('\n', '\\n')
+        escaped.append(f'{name}="{value}"')
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value):
+    """Sayıyı Prometheus formatına çevir"""
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Etiketli metriklerin ortak tabanı"""
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}',
+                 f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key, value):
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}']
+
+
+class Counter(_Metric):
+    """Sadece artan sayaç"""
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """Artıp azalabilen anlık değer"""
+    kind = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    """Kümülatif kovalı gecikme histogramı"""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # İsteğe bağlı gözlemci: observer(değer, etiketler) (ör. istek profili)
+        self.observer = None
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [kova sayıları..., toplam, adet]
+                state = [0] * (len(self.buckets) + 1) + [0.0, 0]
+                self._values[key] = state
+            state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+        if self.observer is not None:
+            self.observer(value, labels)
+
+    def _render_sample(self, key, state):
+        lines = []
+        cumulative = 0
+        bounds = self.buckets + (float('inf'),)
+        for bound, count in zip(bounds, state[:len(bounds)]):
+            cumulative += count
+            labels = _format_labels(self.labelnames, key,
+                                    ('le', _format_value(bound)))
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f'{self.name}_sum{labels} {_format_value(state[-2])}')
+        lines.append(f'{self.name}_count{labels} {state[-1]}')
+        return lines
+
+
+class MetricsRegistry:
+    """Metriklerin tutulduğu kayıt"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        """Tüm metrikleri Prometheus metin formatında döndür"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+# Uygulama genelindeki varsayılan kayıt
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'print_stage_duration_seconds',
+    'Yazdırma hattı aşamalarının süresi (saniye)',
+    ('stage', 'layout', 'file_type'))
+STAGE_ERRORS = REGISTRY.counter(
+    'print_stage_errors_total',
+    'Hata ile biten aşama sayısı',
+    ('stage', 'layout', 'file_type'))
+PRINT_JOBS = REGISTRY.counter(
+    'print_jobs_total',
+    'Yazdırma arka ucuna gönderilen işler (result: success/failure)',
+    ('backend', 'printer', 'layout', 'file_type', 'result'))
+SPOOLED_BYTES = REGISTRY.counter(
+    'print_spooled_bytes_total',
+    'Yazdırma arka ucuna gönderilen bayt miktarı',
+    ('backend', 'layout', 'file_type'))
+UPLOADED_BYTES = REGISTRY.counter(
+    'print_uploaded_bytes_total',
+    'Yüklenen dosyaların toplam boyutu',
+    ('file_type',))
+QUEUE_DEPTH = REGISTRY.gauge(
+    'print_queue_depth',
+    'İşlenmekte olan (render veya yazdırma bekleyen) istek sayısı')
+UPLOAD_SKIPPED_BYTES = REGISTRY.counter(
+    'print_upload_skipped_bytes_total',
+    'Sunucuda zaten bulunduğu için gövdesi gönderilmeyen dosya baytları')
+BLOB_DEDUPLICATED = REGISTRY.counter(
+    'print_blob_deduplicated_total',
+    'İçeriği depoda zaten bulunan (diske tekrar yazılmayan) yüklemeler')
+PDF_OPTIMIZE_BYTES = REGISTRY.counter(
+    'print_pdf_optimize_bytes_total',
+    'Yazdırma öncesi optimizasyondan geçen PDF baytları (phase: before/after)',
+    ('phase', 'file_type'))
+RATE_LIMITED = REGISTRY.counter(
+    'print_rate_limited_total',
+    'İstemci hız veya bayt kotası nedeniyle reddedilen istekler (429)')
+
+
+@contextmanager
+def observe_stage(stage, layout='', file_type=''):
+    """Bir aşamanın süresini ölç ve histograma kaydet"""
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.inc(stage=stage, layout=layout, file_type=file_type)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start,
+                              stage=stage, layout=layout, file_type=file_type)
+
+
+def record_print_result(backend, success, size, layout='', file_type='',
+                        printer=''):
+    """Bir yazdırma denemesinin sonucunu kaydet"""
+    result = 'success' if success else 'failure'
+    PRINT_JOBS.inc(backend=backend, printer=printer, layout=layout,
+                   file_type=file_type, result=result)
+    if success:
+        SPOOLED_BYTES.inc(size, backend=backend,
+                          layout=layout, file_type=file_type)
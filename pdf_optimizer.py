@@ -0,0 +1,217 @@
+"""
+PDF Optimizer - Yazdırma Öncesi PDF Küçültme
+
+Yazıcıya gönderilen PDF'ler (üretilen veya yüklenen) spooler ve USB
+bağlantısı üzerinden daha az bayt taşınsın diye yeniden yazılır:
+    - Sayfa içerikleri ve sıkıştırılmamış akışlar Flate ile sıkıştırılır
+    - Nesneler nesne akışlarına, xref tablosu xref akışına toplanır
+    - Aynı içerikli resim ve form XObject'leri tek nesnede birleştirilir
+    - Sayfa küçük resimleri (thumbnail), XMP metadata ve kullanılmayan
+      kaynaklar atılır
+    - Sayfada hedef yazıcı DPI'ından yüksek çözünürlükte çizilen resimler
+      hedef DPI'a küçültülür
+
+pikepdf (qpdf) isteğe bağlıdır; kurulu değilse belge olduğu gibi gönderilir.
+
+Örnek Kullanım:
+    >>> from pdf_optimizer import optimize_pdf
+    >>> optimized, before, after = optimize_pdf('job.pdf', target_dpi=300)
+"""
+
+import hashlib
+import io
+import logging
+import math
+import os
+import zlib
+
+# Logger yapılandırması
+logger = logging.getLogger(__name__)
+
+# Çözünürlüğü hedefi bu oranda aşan resimler küçültülür (küçük farklar
+# için yeniden kodlamaya değmez)
+_DPI_TOLERANCE = 1.25
+_JPEG_QUALITY = 90
+
+
+def available():
+    """pikepdf kurulu mu?"""
+    try:
+        import pikepdf  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _size(document):
+    """Belge boyutu (dosya yolu veya bayt dizisi)"""
+    if isinstance(document, str):
+        return os.path.getsize(document)
+    return len(document)
+
+
+def _multiply(m1, m2):
+    """İki PDF dönüşüm matrisinin çarpımı (m1 x m2)"""
+    a1, b1, c1, d1, e1, f1 = m1
+    a2, b2, c2, d2, e2, f2 = m2
+    return (a1 * a2 + b1 * c2, a1 * b2 + b1 * d2,
+            c1 * a2 + d1 * c2, c1 * b2 + d1 * d2,
+            e1 * a2 + f1 * c2 + e2, e1 * b2 + f1 * d2 + f2)
+
+
+def _image_placements(pdf):
+    """Her resmin sayfalarda çizildiği en büyük boyut - {objgen: (resim, gen, yük)}"""
+    import pikepdf
+    placements = {}
+    for page in pdf.pages:
+        xobjects = page.obj.get('/Resources', {}).get('/XObject', {})
+        if not xobjects:
+            continue
+        ctm, stack = (1, 0, 0, 1, 0, 0), []
+        try:
+            instructions = pikepdf.parse_content_stream(page)
+        except pikepdf.PdfError as e:
+            logger.debug("Sayfa içeriği okunamadı: %s", e)
+            continue
+        for operands, operator in instructions:
+            op = str(operator)
+            if op == 'q':
+                stack.append(ctm)
+            elif op == 'Q' and stack:
+                ctm = stack.pop()
+            elif op == 'cm' and len(operands) == 6:
+                ctm = _multiply([float(value) for value in operands], ctm)
+            elif op == 'Do' and operands:
+                image = xobjects.get(str(operands[0]))
+                if image is None or image.get('/Subtype') != '/Image':
+                    continue
+                width = math.hypot(ctm[0], ctm[1])
+                height = math.hypot(ctm[2], ctm[3])
+                _, old_width, old_height = placements.get(image.objgen, (None, 0, 0))
+                placements[image.objgen] = (
+                    image, max(old_width, width), max(old_height, height))
+    return placements
+
+
+def _downsample_images(pdf, target_dpi):
+    """Hedef DPI'dan yüksek çözünürlükte çizilen resimleri küçült - sayısını döndür"""
+    import pikepdf
+    from PIL import Image
+    count = 0
+    for image, width_pt, height_pt in _image_placements(pdf).values():
+        if not width_pt or not height_pt:
+            continue
+        # Maske, palet ve 1-bit resimler olduğu gibi bırakılır
+        if ('/SMask' in image or '/Mask' in image or image.get('/ImageMask')
+                or image.get('/BitsPerComponent', 8) != 8):
+            continue
+        pixels = (int(image.Width), int(image.Height))
+        dpi = min(pixels[0] / (width_pt / 72), pixels[1] / (height_pt / 72))
+        if dpi <= target_dpi * _DPI_TOLERANCE:
+            continue
+        try:
+            img = pikepdf.PdfImage(image).as_pil_image()
+        except Exception as e:
+            logger.debug("Resim çözülemedi: %s", e)
+            continue
+        if img.mode not in ('RGB', 'L'):
+            continue
+        scale = target_dpi / dpi
+        size = (max(1, round(pixels[0] * scale)), max(1, round(pixels[1] * scale)))
+        img = img.resize(size, Image.Resampling.LANCZOS)
+        if image.get('/Filter') == '/DCTDecode':
+            buffer = io.BytesIO()
+            img.save(buffer, 'JPEG', quality=_JPEG_QUALITY)
+            image.write(buffer.getvalue(), filter=pikepdf.Name.DCTDecode)
+        else:
+            image.write(zlib.compress(img.tobytes()), filter=pikepdf.Name.FlateDecode)
+        image.Width, image.Height = size
+        image.ColorSpace = pikepdf.Name.DeviceRGB if img.mode == 'RGB' else pikepdf.Name.DeviceGray
+        for key in ('/DecodeParms', '/Decode'):
+            if key in image:
+                del image[key]
+        count += 1
+    return count
+
+
+def _stream_key(stream):
+    """Aynı içerikli akışları tanımak için özet (sözlük + ham veri)"""
+    import pikepdf
+    sha = hashlib.sha256(stream.read_raw_bytes())
+    for key in sorted(stream.keys()):
+        if key == '/Length':
+            continue
+        value = stream[key]
+        # Dolaylı nesneler (ör. ICC profili, maske) kimlikleriyle karşılaştırılır
+        if isinstance(value, pikepdf.Object) and value.is_indirect:
+            value = value.objgen
+        sha.update(f"{key}={value!r};".encode())
+    return sha.hexdigest()
+
+
+def _merge_duplicates(pdf):
+    """Sayfalardaki aynı içerikli XObject'leri tek nesneye bağla - sayısını döndür"""
+    canonical = {}
+    merged = 0
+    for page in pdf.pages:
+        xobjects = page.obj.get('/Resources', {}).get('/XObject', {})
+        for name in list(xobjects.keys()):
+            xobject = xobjects[name]
+            if not xobject.is_indirect:
+                continue
+            key = _stream_key(xobject)
+            first = canonical.setdefault(key, xobject)
+            if first.objgen != xobject.objgen:
+                xobjects[name] = first
+                merged += 1
+    return merged
+
+
+def _strip_extras(pdf):
+    """Yazdırmada kullanılmayan küçük resimleri ve XMP metadata'yı at"""
+    if '/Metadata' in pdf.Root:
+        del pdf.Root.Metadata
+    for page in pdf.pages:
+        for key in ('/Thumb', '/PieceInfo'):
+            if key in page.obj:
+                del page.obj[key]
+
+
+def optimize_pdf(document, target_dpi=300, output_path=None):
+    """
+    PDF'i yazdırma için küçült
+
+    document: PDF dosya yolu veya bayt dizisi.
+    target_dpi: Resimlerin küçültüleceği çözünürlük (0 = küçültme yok).
+    output_path: Verilirse sonuç bu dosyaya, verilmezse belleğe yazılır.
+    (yeni belge, önceki boyut, sonraki boyut) döndürür; pikepdf yoksa veya
+    belge küçülmediyse yeni belge None'dır.
+    """
+    before = _size(document)
+    try:
+        import pikepdf
+    except ImportError:
+        return None, before, before
+    source = document if isinstance(document, str) else io.BytesIO(document)
+    output = output_path or io.BytesIO()
+    try:
+        with pikepdf.open(source) as pdf:
+            _strip_extras(pdf)
+            downsampled = _downsample_images(pdf, target_dpi) if target_dpi else 0
+            merged = _merge_duplicates(pdf)
+            pdf.remove_unreferenced_resources()
+            pdf.save(output, compress_streams=True,
+                     object_stream_mode=pikepdf.ObjectStreamMode.generate)
+    except Exception as e:
+        logger.warning("PDF optimize edilemedi: %s", e)
+        if output_path and os.path.exists(output_path):
+            os.remove(output_path)
+        return None, before, before
+    after = _size(output_path) if output_path else output.getbuffer().nbytes
+    if after >= before:
+        if output_path:
+            os.remove(output_path)
+        return None, before, before
+    logger.debug("PDF optimize edildi: %d -> %d bayt (%d resim küçültüldü, "
+                 "%d kopya birleştirildi)", before, after, downsampled, merged)
+    return (output_path or output.getbuffer()), before, after
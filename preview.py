@@ -0,0 +1,200 @@
+"""
+Preview - Düşük Çözünürlüklü Layout Önizlemesi
+
+Kullanıcının 6 veya 9'lu yerleşimin nasıl görüneceğini görmek için
+yazdırmasına gerek kalmasın diye sayfa, PDF hattıyla aynı geometriyle
+(layout_handler.grid_cell / grid_position) ama ekran çözünürlüğünde
+PNG/WebP olarak çizilir. 300 DPI hattı hiç çalışmaz.
+
+Döndürme, sığdırma (fill) veya en az sayfaya yerleştirme (pack) seçilirse
+sayfa create_manifest_pdf ile aynı raf yerleşimiyle (item_box,
+pack_shelves) çizilir.
+
+Kaynak resimler bir kez küçültülüp (EXIF yönü uygulanmış, şeffaflığı
+beyaza düzleştirilmiş) bayt sınırlı bir LRU önbellekte blob özetiyle
+tutulur; layout değiştirmek yalnızca küçük resmin yeniden ölçeklenmesidir.
+
+Örnek Kullanım:
+    >>> cache = ThumbnailCache(max_bytes=64 * 1024 * 1024)
+    >>> thumb = cache.get(digest, path)
+    >>> image, pages = render_preview([thumb], layout='6', paper='A4', width=480)
+    >>> data, mimetype = encode_preview(image, 'webp')
+"""
+
+import io
+import logging
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageOps, features
+
+from layout_handler import (CELL_GAP, PAGE_MARGIN, exif_orientation, grid_cell,
+                            grid_position, item_box, layout_grid, oriented_size,
+                            pack_shelves, page_size, prepare_image)
+
+# Logger yapılandırması
+logger = logging.getLogger(__name__)
+
+DEFAULT_WIDTH = 480
+MIN_WIDTH = 64
+FORMATS = {'png': 'image/png', 'webp': 'image/webp'}
+
+
+class Thumbnail:
+    """Önbellekteki küçük resim ve asıl resmin (EXIF yönlü) boyutu"""
+
+    def __init__(self, image, size):
+        self.image = image
+        # Geometri asıl boyuttan hesaplanır (PDF hattıyla birebir aynı oran)
+        self.size = size
+        self.nbytes = len(image.getbands()) * image.width * image.height
+
+
+def make_thumbnail(path, max_side=1024):
+    """Resmi en uzun kenarı max_side olacak şekilde küçült"""
+    with Image.open(path) as img:
+        orientation = exif_orientation(img)
+        size = oriented_size(img, orientation)
+        # JPEG'ler çözülürken küçültülür (DCT ölçekleme) - büyük resimlerde hızlı
+        img.draft('RGB', (max_side, max_side))
+        img = ImageOps.exif_transpose(img)
+        if img.mode in ('RGBA', 'LA', 'P'):
+            img = img.convert('RGBA')
+            background = Image.new('RGB', img.size, 'white')
+            background.paste(img, mask=img.getchannel('A'))
+            img = background
+        elif img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+        img.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+        img.load()
+    return Thumbnail(img, size)
+
+
+class ThumbnailCache:
+    """Blob özetine göre küçük resimlerin bayt sınırlı LRU önbelleği"""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_side=1024):
+        self.max_bytes = max_bytes
+        self.max_side = max_side
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0}
+
+    def peek(self, key):
+        """Önbellekteki küçük resim (yoksa None) - kullanım sırasını günceller"""
+        with self._lock:
+            thumb = self._entries.get(key)
+            if thumb is not None:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+            return thumb
+
+    def get(self, key, path):
+        """Küçük resmi önbellekten döndür, yoksa path'ten üretip ekle"""
+        thumb = self.peek(key)
+        if thumb is not None:
+            return thumb
+        thumb = make_thumbnail(path, self.max_side)
+        with self._lock:
+            self._stats['misses'] += 1
+            if key not in self._entries:
+                self._entries[key] = thumb
+                self._bytes += thumb.nbytes
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+        return thumb
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), bytes=self._bytes)
+
+
+def page_count(count, layout='1', combine=False):
+    """Önizlenen işin sayfa sayısı"""
+    if not combine:
+        return 1
+    cols, rows = layout_grid(layout)
+    return max(1, -(-count // (cols * rows)))
+
+
+def render_preview(thumbs, layout='1', paper='A4', width=DEFAULT_WIDTH,
+                   combine=False, page=0, rotation=None, fit='fit', pack=False):
+    """
+    Sayfayı düşük çözünürlükte çiz - (resim, sayfa sayısı) döndürür
+
+    combine=False: ilk resmin layout kopyaları (process_image_layout).
+    combine=True: resimler sırayla hücrelere, page. sayfa (create_multi_file_pdf).
+    rotation, fit veya (birleştirmede) pack verilirse manifest yerleşimi
+    kullanılır (create_layout_pdf / create_manifest_pdf ile aynı).
+    """
+    if rotation is not None or fit != 'fit' or (combine and pack):
+        if not combine:
+            cols, rows = layout_grid(layout)
+            thumbs = thumbs[:1] * (cols * rows)
+        return _render_manifest(thumbs, layout, paper, width, page, rotation, fit,
+                                combine and pack)
+    page_pt = page_size(paper)
+    # Sayfa genişliği width piksel olacak çözünürlük
+    dpi = width * 72 / page_pt[0]
+    scale = dpi / 72
+    canvas = Image.new('RGB', (width, round(page_pt[1] * scale)), 'white')
+    cols, rows = layout_grid(layout)
+    per_page = cols * rows
+    pages = page_count(len(thumbs), layout, combine)
+    page = min(max(0, page), pages - 1)
+    if combine:
+        slots = list(enumerate(thumbs[page * per_page:(page + 1) * per_page]))
+    else:
+        slots = [(slot, thumbs[0]) for slot in range(per_page)] if thumbs else []
+    cells = {}
+    for slot, thumb in slots:
+        key = id(thumb)
+        if key not in cells:
+            rotation, pixels, draw_size = grid_cell(thumb.size, layout, paper, dpi,
+                                                    upscale=True)
+            # Ekran önizlemesinde LANCZOS yerine hızlı filtre yeterlidir
+            cells[key] = (prepare_image(thumb.image, pixels, 1, rotation,
+                                        resample=Image.Resampling.BILINEAR), draw_size)
+        cell, draw_size = cells[key]
+        x, y = grid_position(slot, layout, paper, draw_size)
+        # PDF ekseni (sol alt) -> resim ekseni (sol üst)
+        canvas.paste(cell, (round(x * scale),
+                            round((page_pt[1] - y - draw_size[1]) * scale)))
+    return canvas, pages
+
+
+def _render_manifest(thumbs, layout, paper, width, page, rotation, fit, pack):
+    """Manifest (raf) yerleşimli sayfayı çiz - (resim, sayfa sayısı) döndürür"""
+    page_pt = page_size(paper)
+    scale = width / page_pt[0]
+    canvas = Image.new('RGB', (width, round(page_pt[1] * scale)), 'white')
+    area = (page_pt[0] - 2 * PAGE_MARGIN, page_pt[1] - 2 * PAGE_MARGIN)
+    placed = [item_box(thumb.size, layout, rotation, fit, area) for thumb in thumbs]
+    pages = pack_shelves([box for box, _ in placed], area, CELL_GAP, sort=pack)
+    page = min(max(0, page), len(pages) - 1)
+    cells = {}
+    for index, x, y in pages[page] if pages else ():
+        (box_width, box_height), turn = placed[index]
+        key = id(thumbs[index])
+        if key not in cells:
+            pixels = (max(1, round(box_width * scale)), max(1, round(box_height * scale)))
+            cells[key] = prepare_image(thumbs[index].image, pixels, 1, turn, fit,
+                                       resample=Image.Resampling.BILINEAR)
+        # pack_shelves y'yi sayfanın üstünden ölçer (resim ekseniyle aynı)
+        canvas.paste(cells[key], (round((PAGE_MARGIN + x) * scale),
+                                  round((PAGE_MARGIN + y) * scale)))
+    return canvas, max(1, len(pages))
+
+
+def encode_preview(image, fmt='webp'):
+    """Önizlemeyi kodla - (bayt, mimetype); WebP desteği yoksa PNG"""
+    if fmt == 'webp' and not features.check('webp'):
+        fmt = 'png'
+    buffer = io.BytesIO()
+    if fmt == 'webp':
+        image.save(buffer, 'WEBP', quality=80, method=0)
+    else:
+        image.save(buffer, 'PNG', compress_level=1)
+    return buffer.getvalue(), FORMATS[fmt]
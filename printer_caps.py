@@ -0,0 +1,291 @@
+"""
+Printer Capabilities - Yazıcı Çözünürlüğü, Kağıt Boyutu ve Renk Keşfi
+
+Render hattının resimleri yazıcının gerçek çözünürlüğünde örneklemesi ve
+sayfayı yazıcının kağıdına göre kurması için yazıcı yetenekleri okunur.
+Desteklenen kağıtlar ve renk yeteneği yazıcı havuzunun keşfinde de
+kullanılır.
+Böylece 180 DPI taslak yazıcıya gereksiz büyük resim gönderilmez, 600 DPI
+yazıcı da düşük çözünürlüklü resmi kendi tarafında büyütmek zorunda kalmaz.
+
+Kaynaklar (ilk bulunan kullanılır):
+    - PRINTER_CAPS_FILE (JSON, test ve elle tanım için):
+      {"HP-A": {"dpi": 600, "paper": "A4", "papers": ["A4", "A5"], "color": true},
+       "*": {"dpi": 300}}
+    - Linux/macOS: lpoptions -p <yazıcı> -l (PPD/IPP seçenekleri:
+      Resolution, PageSize, ColorModel) ve print-color-mode-supported
+    - Windows: DEVMODE (PrintQuality/YResolution, PaperSize) ve
+      DeviceCapabilities (desteklenen çözünürlükler, renk)
+Sonuçlar yazıcı başına ttl süresince önbellekte tutulur.
+
+Örnek Kullanım:
+    >>> import printer_caps
+    >>> printer_caps.configure('caps.json', ttl=3600)
+    >>> caps = printer_caps.get_caps('HP-A')
+    >>> caps.dpi, caps.paper
+    (600, 'A4')
+"""
+
+import json
+import logging
+import platform
+import re
+import subprocess
+import threading
+import time
+
+# Logger yapılandırması
+logger = logging.getLogger(__name__)
+
+_RESOLUTION_RE = re.compile(r'(\d+)(?:x(\d+))?dpi', re.IGNORECASE)
+# PPD/IPP kağıt adları -> uygulamadaki kağıt adı
+_PAPER_NAMES = (
+    (re.compile(r'^(iso[_-])?a4\b|^a4$', re.IGNORECASE), 'A4'),
+    (re.compile(r'^(iso[_-])?a5\b|^a5$', re.IGNORECASE), 'A5'),
+    (re.compile(r'^(na[_-])?letter\b', re.IGNORECASE), 'LETTER'),
+    (re.compile(r'^(na[_-])?legal\b', re.IGNORECASE), 'LEGAL'),
+)
+# Windows DEVMODE PaperSize sabitleri
+_DMPAPER = {1: 'LETTER', 5: 'LEGAL', 9: 'A4', 11: 'A5'}
+_DC_ENUMRESOLUTIONS = 13
+_DC_COLORDEVICE = 32
+# PPD ColorModel / IPP print-color-mode değerlerinden renkli olanlar
+_COLOR_MODES = ('rgb', 'cmy', 'color', 'auto')
+
+
+class PrinterCaps:
+    """Yazıcının varsayılan ve desteklenen çözünürlük/kağıt bilgisi"""
+
+    def __init__(self, dpi=None, paper=None, resolutions=(), papers=(),
+                 source='default', color=None):
+        # None: bilinmiyor (render varsayılanı kullanılır)
+        self.dpi = dpi
+        self.paper = paper
+        self.resolutions = sorted(set(resolutions))
+        self.papers = sorted(set(papers))
+        self.source = source
+        # None: bilinmiyor, False: sadece siyah-beyaz
+        self.color = color
+
+    def supports_paper(self, paper):
+        """Kağıt destekleniyor mu? (liste bilinmiyorsa her kağıt uygun)"""
+        return not self.papers or (paper or '').upper() in self.papers
+
+    def to_dict(self):
+        return {
+            'dpi': self.dpi,
+            'paper': self.paper,
+            'resolutions': self.resolutions,
+            'papers': self.papers,
+            'color': self.color,
+            'source': self.source
+        }
+
+
+def normalize_paper(name):
+    """PPD/IPP kağıt adını uygulamadaki ada çevir (bilinmiyorsa None)"""
+    for pattern, paper in _PAPER_NAMES:
+        if pattern.search(name or ''):
+            return paper
+    return None
+
+
+def _parse_resolution(value):
+    """'600dpi' / '1200x600dpi' -> DPI (iki eksenden küçüğü)"""
+    match = _RESOLUTION_RE.search(value or '')
+    if not match:
+        return None
+    x = int(match.group(1))
+    y = int(match.group(2) or x)
+    return min(x, y)
+
+
+def is_color_mode(value):
+    """PPD ColorModel / IPP print-color-mode değeri renkli mi?"""
+    return (value or '').lower().startswith(_COLOR_MODES)
+
+
+def parse_lpoptions(output):
+    """lpoptions -l çıktısından yetenekleri oku
+
+    Satır biçimi: 'Resolution/Çözünürlük: 300dpi *600dpi' (* = varsayılan)
+    """
+    caps = PrinterCaps(source='cups')
+    resolutions, papers = [], []
+    for line in output.splitlines():
+        key, _, values = line.partition(':')
+        key = key.split('/', 1)[0].strip().lower()
+        for value in values.split():
+            default = value.startswith('*')
+            value = value.lstrip('*')
+            if key in ('resolution', 'printer-resolution'):
+                dpi = _parse_resolution(value)
+                if dpi:
+                    resolutions.append(dpi)
+                    if default:
+                        caps.dpi = dpi
+            elif key in ('pagesize', 'media', 'pageregion'):
+                paper = normalize_paper(value)
+                if paper:
+                    papers.append(paper)
+                    if default and key != 'pageregion':
+                        caps.paper = paper
+            elif key in ('colormodel', 'print-color-mode'):
+                caps.color = bool(caps.color) or is_color_mode(value)
+    caps.resolutions = sorted(set(resolutions))
+    caps.papers = sorted(set(papers))
+    if caps.dpi is None and caps.resolutions:
+        caps.dpi = caps.resolutions[-1]
+    return caps
+
+
+def _probe_cups(name):
+    """CUPS yazıcısının PPD/IPP seçeneklerini oku"""
+    command = ['lpoptions', '-l'] + (['-p', name] if name else [])
+    result = subprocess.run(command, capture_output=True, text=True, timeout=10)
+    if result.returncode != 0:
+        return None
+    caps = parse_lpoptions(result.stdout)
+    if caps.dpi is None or caps.paper is None or caps.color is None:
+        # Sürücüsüz (IPP Everywhere) kuyruklar varsayılanları -l dışında verir
+        result = subprocess.run(command[:1] + command[2:], capture_output=True,
+                                text=True, timeout=10)
+        for option in result.stdout.split():
+            key, _, value = option.partition('=')
+            if key == 'printer-resolution-default' and caps.dpi is None:
+                caps.dpi = _parse_resolution(value)
+            elif key in ('media-default', 'media') and caps.paper is None:
+                caps.paper = normalize_paper(value)
+            elif key == 'print-color-mode-supported' and caps.color is None:
+                caps.color = any(is_color_mode(mode) for mode in value.split(','))
+    return caps
+
+
+def _probe_windows(name):
+    """Windows yazıcısının DEVMODE ve desteklenen çözünürlüklerini oku"""
+    import win32print
+    name = name or win32print.GetDefaultPrinter()
+    handle = win32print.OpenPrinter(name)
+    try:
+        info = win32print.GetPrinter(handle, 2)
+    finally:
+        win32print.ClosePrinter(handle)
+    caps = PrinterCaps(source='devmode')
+    devmode = info.get('pDevMode')
+    if devmode is not None:
+        # PrintQuality pozitifse DPI, negatifse taslak/yüksek kalite sabitidir
+        quality = getattr(devmode, 'PrintQuality', 0)
+        y_resolution = getattr(devmode, 'YResolution', 0)
+        if quality > 0:
+            caps.dpi = min(quality, y_resolution) if y_resolution > 0 else quality
+        caps.paper = _DMPAPER.get(getattr(devmode, 'PaperSize', 0))
+    try:
+        resolutions = win32print.DeviceCapabilities(
+            name, info.get('pPortName', ''), _DC_ENUMRESOLUTIONS)
+        caps.resolutions = sorted({min(r['xdpi'], r['ydpi']) if isinstance(r, dict)
+                                   else min(r) for r in resolutions or ()})
+    except Exception as e:
+        logger.debug("Çözünürlük listesi alınamadı %s: %s", name, e)
+    try:
+        caps.color = bool(win32print.DeviceCapabilities(
+            name, info.get('pPortName', ''), _DC_COLORDEVICE))
+    except Exception as e:
+        logger.debug("Renk yeteneği alınamadı %s: %s", name, e)
+    return caps
+
+
+def probe_printer(name):
+    """İşletim sisteminden yetenekleri oku (okunamazsa None)"""
+    try:
+        if platform.system() == 'Windows':
+            return _probe_windows(name)
+        return _probe_cups(name)
+    except ImportError:
+        logger.debug("win32print modülü bulunamadı - yetenek keşfi atlandı")
+    except FileNotFoundError:
+        logger.debug("lpoptions bulunamadı - yetenek keşfi atlandı")
+    except Exception as e:
+        logger.warning("Yazıcı yetenekleri okunamadı %s: %s", name or 'default', e)
+    return None
+
+
+class CapabilityCache:
+    """Yazıcı başına süreli yetenek önbelleği"""
+
+    def __init__(self, caps_file='', ttl=3600, probe=None):
+        self.caps_file = caps_file
+        self.ttl = ttl
+        self._probe = probe or probe_printer
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._file_caps = None
+
+    def _from_file(self, name):
+        """PRINTER_CAPS_FILE içindeki tanım (yazıcı adı, yoksa '*')"""
+        if not self.caps_file:
+            return None
+        if self._file_caps is None:
+            try:
+                with open(self.caps_file, encoding='utf-8') as f:
+                    self._file_caps = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("Yetenek dosyası okunamadı %s: %s", self.caps_file, e)
+                self._file_caps = {}
+        item = self._file_caps.get(name or 'default', self._file_caps.get('*'))
+        if item is None:
+            return None
+        return PrinterCaps(item.get('dpi'), (item.get('paper') or '').upper() or None,
+                           item.get('resolutions', ()),
+                           [p.upper() for p in item.get('papers', ())], 'file',
+                           item.get('color'))
+
+    def get(self, name, probe=True):
+        """Yazıcının yetenekleri (bilinmiyorsa boş PrinterCaps)
+
+        probe=False ise sadece yetenek dosyasına bakılır (ör. dosya arka ucu).
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and now - entry[0] < self.ttl:
+                return entry[1]
+        caps = self._from_file(name) or (probe and self._probe(name)) or PrinterCaps()
+        with self._lock:
+            self._entries[name] = (now, caps)
+        logger.debug("Yazıcı yetenekleri %s: dpi=%s kağıt=%s (%s)",
+                     name or 'default', caps.dpi, caps.paper, caps.source)
+        return caps
+
+    def invalidate(self, name=None):
+        """Önbelleği (veya tek yazıcıyı) temizle"""
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+                self._file_caps = None
+            else:
+                self._entries.pop(name, None)
+
+    def snapshot(self):
+        """Önbellekteki yazıcı yetenekleri"""
+        with self._lock:
+            return {name or 'default': caps.to_dict()
+                    for name, (_, caps) in self._entries.items()}
+
+
+_cache = CapabilityCache()
+
+
+def configure(caps_file='', ttl=3600):
+    """Varsayılan yetenek önbelleğini ayarla"""
+    global _cache
+    _cache = CapabilityCache(caps_file, ttl)
+    return _cache
+
+
+def get_cache():
+    return _cache
+
+
+def get_caps(name, probe=True):
+    """Yazıcının yeteneklerini varsayılan önbellekten döndür"""
+    return _cache.get(name, probe)
@@ -0,0 +1,310 @@
+"""
+Printer Pool - Çoklu Yazıcı Yönlendirme ve Yük Dengeleme
+
+Bu modül, sisteme bağlı yazıcıları bir havuzda toplar ve her işi
+yeteneklerine (renkli/siyah-beyaz, kağıt boyutu) uyan, kuyruğu en kısa
+yazıcıya yönlendirir. Aynı özellikteki yazıcılar arasında işler dağıtılır.
+
+Yazıcılar şu kaynaklardan okunur:
+    - PRINTERS ortam değişkeni (JSON liste, elle tanım):
+      [{"name": "HP-A", "color": false, "paper": ["A4"]},
+       {"name": "sinkB", "sink": "/tmp/sinkB"}]
+    - Keşif (Windows: win32print.EnumPrinters, Linux/macOS: lpstat/lpoptions):
+      yalnızca sistemin varsayılan yazıcısı ve onunla aynı sürücü/modeldeki
+      kuyruklar alınır. Sanal yazıcılar (PDF, XPS, faks, OneNote) ve dosya
+      portları havuza girmez, işler kağıda basmayan hedeflere dağıtılmaz.
+Keşifle uygun yazıcı bulunamazsa sistemin varsayılan yazıcısı kullanılır.
+
+Örnek Kullanım:
+    >>> from printer_pool import PrinterPool
+    >>> pool = PrinterPool.from_config(config)
+    >>> with pool.acquire(color=True, paper='A4') as printer:
+    ...     spool(output_pdf, printer)
+"""
+
+import json
+import logging
+import platform
+import shlex
+import subprocess
+import threading
+from contextlib import contextmanager
+
+import printer_caps
+
+# Logger yapılandırması
+logger = logging.getLogger(__name__)
+
+# Kağıda basmayan (sanal) yazıcıları tanıyan ad, port ve CUPS URI önekleri
+VIRTUAL_NAMES = ('microsoft print to pdf', 'microsoft xps document writer', 'fax',
+                 'onenote', 'send to', 'cups-pdf')
+VIRTUAL_PORTS = ('file:', 'portprompt:', 'nul:', 'xps', 'shrfax:', 'pdf', 'onenote')
+VIRTUAL_URIS = ('cups-pdf:', 'file:', 'pdf:', 'fax:', 'faxmodem:')
+
+
+class NoPrinterAvailable(Exception):
+    """İstenen yeteneklere uyan yazıcı yok"""
+
+
+class Printer:
+    """Havuzdaki tek bir yazıcı ve anlık yük bilgisi"""
+
+    def __init__(self, name=None, color=None, paper=None, sink=None, model=None):
+        # name=None: sistemin varsayılan yazıcısı
+        self.name = name
+        # Sürücü / marka-model (keşifte aynı cihazları gruplamak için)
+        self.model = model
+        # None: bilinmiyor (her işe uygun sayılır)
+        self.color = color
+        self.paper = {p.upper() for p in paper} if paper else None
+        # Dosya arka ucu için çıktı klasörü
+        self.sink = sink
+        self.online = True
+        self.active = 0
+        self.os_queue = 0
+        self.jobs_total = 0
+        self.failures = 0
+
+    @property
+    def label(self):
+        return self.name or 'default'
+
+    @property
+    def load(self):
+        """Bu serviste işlenen + işletim sistemi kuyruğundaki iş sayısı"""
+        return self.active + self.os_queue
+
+    def supports(self, color=None, paper=None):
+        """Yazıcı istenen yeteneklere uyuyor mu?"""
+        if color and self.color is False:
+            return False
+        if paper and self.paper is not None and paper.upper() not in self.paper:
+            return False
+        return True
+
+    def to_dict(self):
+        return {
+            'name': self.label,
+            'model': self.model,
+            'color': self.color,
+            'paper': sorted(self.paper) if self.paper else None,
+            'online': self.online,
+            'active_jobs': self.active,
+            'queued_jobs': self.os_queue,
+            'jobs_total': self.jobs_total,
+            'failures': self.failures
+        }
+
+
+def is_virtual(name, port=''):
+    """Yazıcı kağıda basmayan sanal bir hedef mi? (PDF/XPS/faks, dosya portu)"""
+    name, port = (name or '').lower(), (port or '').lower()
+    return any(hint in name for hint in VIRTUAL_NAMES) or \
+        port.startswith(VIRTUAL_PORTS) or port.startswith(VIRTUAL_URIS)
+
+
+def _discover_windows():
+    """Windows'ta yazıcıları listele - (yazıcılar, varsayılan yazıcı adı)"""
+    import win32print
+    flags = win32print.PRINTER_ENUM_LOCAL | win32print.PRINTER_ENUM_CONNECTIONS
+    printers = []
+    for info in win32print.EnumPrinters(flags, None, 2):
+        if is_virtual(info['pPrinterName'], info.get('pPortName')):
+            continue
+        printer = Printer(info['pPrinterName'], model=info.get('pDriverName'))
+        devmode = info.get('pDevMode')
+        if devmode is not None:
+            # DMCOLOR_MONOCHROME = 1, DMCOLOR_COLOR = 2
+            printer.color = getattr(devmode, 'Color', 2) == 2
+        printers.append(printer)
+    return printers, win32print.GetDefaultPrinter()
+
+
+def _lpstat(*args):
+    result = subprocess.run(['lpstat', *args], capture_output=True,
+                            text=True, timeout=10)
+    return result.stdout if result.returncode == 0 else ''
+
+
+def _cups_model(name):
+    """CUPS kuyruğunun marka-modeli (lpoptions printer-make-and-model)"""
+    result = subprocess.run(['lpoptions', '-p', name], capture_output=True,
+                            text=True, timeout=10)
+    for option in shlex.split(result.stdout):
+        key, _, value = option.partition('=')
+        if key == 'printer-make-and-model':
+            return value
+    return None
+
+
+def _discover_cups():
+    """CUPS (Linux/macOS) hedeflerini listele - (yazıcılar, varsayılan yazıcı adı)"""
+    # "device for HP-A: ipp://10.0.0.5/ipp/print"
+    devices = {}
+    for line in _lpstat('-v').splitlines():
+        head, _, uri = line.partition(': ')
+        if head.startswith('device for '):
+            devices[head[len('device for '):]] = uri.strip()
+    printers = [Printer(name, model=_cups_model(name))
+                for name in _lpstat('-e').split()
+                if not is_virtual(name, devices.get(name))]
+    # "system default destination: HP-A"
+    default = _lpstat('-d').rpartition(': ')[2].strip() or None
+    return printers, default
+
+
+def same_device(printers, default):
+    """Varsayılan yazıcı ve onunla aynı sürücü/modeldeki kuyruklar
+
+    Varsayılan yazıcı sanalsa veya bulunamazsa boş liste döner.
+    """
+    by_name = {printer.name: printer for printer in printers}
+    if default not in by_name:
+        return []
+    model = by_name[default].model
+    if not model:
+        return [by_name[default]]
+    return [printer for printer in printers if printer.model == model]
+
+
+def apply_caps(printer):
+    """Bilinmeyen kağıt ve renk yeteneğini printer_caps keşfinden doldur"""
+    caps = printer_caps.get_caps(printer.name)
+    if printer.paper is None and caps.papers:
+        printer.paper = set(caps.papers)
+    if printer.color is None:
+        printer.color = caps.color
+    return printer
+
+
+def discover_printers():
+    """Varsayılan yazıcıyla özdeş yazıcıları bul (bulunamazsa boş liste)"""
+    try:
+        if platform.system() == 'Windows':
+            printers, default = _discover_windows()
+        else:
+            printers, default = _discover_cups()
+        printers = [apply_caps(printer) for printer in same_device(printers, default)]
+        if not printers:
+            logger.info("Varsayılan yazıcı sanal veya bulunamadı - "
+                        "sistemin varsayılan yazıcısı kullanılıyor")
+        return printers
+    except ImportError:
+        logger.debug("win32print modülü bulunamadı - yazıcı keşfi atlandı")
+    except Exception as e:
+        logger.warning("Yazıcı keşfi başarısız: %s", e)
+    return []
+
+
+def _queue_depth(printer):
+    """İşletim sistemi kuyruğundaki iş sayısını ve çevrim içi durumunu döndür"""
+    if platform.system() == 'Windows':
+        import win32print
+        handle = win32print.OpenPrinter(printer.name)
+        try:
+            info = win32print.GetPrinter(handle, 2)
+        finally:
+            win32print.ClosePrinter(handle)
+        return info['cJobs'], info['Status'] == 0
+    result = subprocess.run(['lpstat', '-o', printer.name], capture_output=True,
+                            text=True, timeout=10)
+    jobs = [line for line in result.stdout.splitlines() if line.strip()]
+    return len(jobs), result.returncode == 0
+
+
+class PrinterPool:
+    """Yazıcı havuzu - yetenek ve kuyruk derinliğine göre seçim yapar"""
+
+    def __init__(self, printers=None, discover=None):
+        self._lock = threading.Lock()
+        self._printers = list(printers) if printers else None
+        # Yazıcı listesi verilmediyse ilk kullanımda bu fonksiyonla keşfedilir
+        self._discover = discover or discover_printers
+
+    @classmethod
+    def from_config(cls, config):
+        """PRINTERS ayarından veya keşiften havuz oluştur"""
+        printers = None
+        if config.PRINTERS:
+            printers = [Printer(item.get('name'), item.get('color'),
+                                item.get('paper'), item.get('sink'))
+                        for item in json.loads(config.PRINTERS)]
+        elif config.PRINTER_BACKEND == 'file':
+            printers = [Printer('file', sink=config.PRINT_SINK_DIR)]
+        return cls(printers)
+
+    def printers(self):
+        """Havuzdaki yazıcılar (ilk çağrıda keşif yapılır)"""
+        if self._printers is None:
+            printers = self._discover() or [Printer()]
+            with self._lock:
+                if self._printers is None:
+                    self._printers = printers
+                    logger.info("Yazıcı havuzu: %s",
+                                ', '.join(p.label for p in printers))
+        return self._printers
+
+    def __len__(self):
+        return len(self.printers())
+
+    def select(self, color=None, paper=None, preferred=None):
+        """Uyumlu yazıcılar arasından en az yüklü olanı seç
+
+        preferred: Verilirse uyumlu yazıcılardan bu listedekiler tercih edilir
+        (hiçbiri uyumlu değilse diğerleri).
+        """
+        candidates = [p for p in self.printers() if p.supports(color, paper)]
+        if not candidates:
+            raise NoPrinterAvailable(
+                f"Uygun yazıcı yok (renk={color}, kağıt={paper})")
+        if preferred is not None:
+            candidates = [p for p in candidates if p in preferred] or candidates
+        online = [p for p in candidates if p.online]
+
+        def cost(printer):
+            # Siyah-beyaz işler için renkli yazıcılar ikinci tercih
+            color_penalty = 1 if color is False and printer.color else 0
+            return (color_penalty, printer.load, printer.jobs_total)
+
+        return min(online or candidates, key=cost)
+
+    @contextmanager
+    def acquire(self, color=None, paper=None, accept=None):
+        """Yazıcıyı seç ve iş süresince yükünü artır
+
+        accept(yazıcı) -> bool: Tercih edilecek yazıcılar (ör. belgenin render
+        edildiği çözünürlük ve kağıdı kullananlar).
+        """
+        printers = self.printers()
+        # Yetenek sorgusu yavaş olabilir; kilit dışında hesaplanır
+        preferred = [p for p in printers if accept(p)] if accept else None
+        with self._lock:
+            printer = self.select(color, paper, preferred)
+            printer.active += 1
+            printer.jobs_total += 1
+        try:
+            yield printer
+        finally:
+            with self._lock:
+                printer.active -= 1
+
+    def record_failure(self, printer):
+        """Başarısız gönderimi say"""
+        with self._lock:
+            printer.failures += 1
+
+    def refresh(self):
+        """İşletim sistemi kuyruk derinliklerini ve çevrim içi durumunu güncelle"""
+        for printer in self.printers():
+            if printer.name is None or printer.sink is not None:
+                continue
+            try:
+                printer.os_queue, printer.online = _queue_depth(printer)
+            except Exception as e:
+                logger.debug("Kuyruk bilgisi alınamadı %s: %s", printer.label, e)
+
+    def snapshot(self):
+        """Yazıcı başına durum listesi"""
+        printers = self.printers()
+        with self._lock:
+            return [p.to_dict() for p in printers]
@@ -0,0 +1,109 @@
+"""
+Printer Status - Önbellekli Yazıcı Durum Servisi
+
+Bu modül, yazıcı ve sistem durumunu arka plandaki bir thread ile kendi
+zamanlamasında yeniler ve son anlık görüntüyü (snapshot) önbellekte tutar.
+/status isteği yazıcıyı sorgulamaz, sadece önbellekteki görüntüyü okur.
+Durum değiştiğinde bekleyen istemciler (Server-Sent Events) uyandırılır.
+
+Örnek Kullanım:
+    >>> from printer_status import PrinterStatusMonitor
+    >>> monitor = PrinterStatusMonitor(collect_status, interval=10)
+    >>> monitor.start()
+    >>> monitor.snapshot()
+"""
+
+import threading
+import time
+import json
+import logging
+
+# Logger yapılandırması
+logger = logging.getLogger(__name__)
+
+
+class PrinterStatusMonitor:
+    """Yazıcı durumunu periyodik olarak toplayan ve önbellekleyen monitör"""
+
+    def __init__(self, collect_fn, interval=10):
+        self._collect_fn = collect_fn
+        self._interval = interval
+        self._snapshot = {}
+        self._version = 0
+        self._condition = threading.Condition()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        """Monitör thread'ini başlat (birden fazla çağrı güvenlidir)"""
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            # İlk görüntü senkron alınır ki ilk istek boş dönmesin
+            self._refresh()
+            self._thread = threading.Thread(
+                target=self._run, name='printer-status-monitor', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """Arka plan döngüsü"""
+        while True:
+            self._wakeup.wait(self._interval)
+            self._wakeup.clear()
+            self._refresh()
+
+    def _refresh(self):
+        """Durumu topla, değiştiyse sürümü artır ve bekleyenleri uyandır"""
+        try:
+            info = self._collect_fn()
+        except Exception as e:
+            logger.warning("Yazıcı durumu toplanamadı: %s", e)
+            info = {'error': str(e)}
+        with self._condition:
+            if info != self._snapshot:
+                self._snapshot = info
+                self._version += 1
+                self._condition.notify_all()
+
+    def refresh_now(self):
+        """Bir sonraki yenilemeyi beklemeden hemen yenile"""
+        self._wakeup.set()
+
+    def snapshot(self):
+        """Önbellekteki son durumu döndür - O(1)"""
+        if self._thread is None:
+            self.start()
+        return self._snapshot
+
+    def version(self):
+        """Son durumun sürüm numarası"""
+        return self._version
+
+    def wait_for_change(self, version, timeout=None):
+        """Sürüm `version`'dan farklı olana kadar bekle; (sürüm, durum) döndür"""
+        if self._thread is None:
+            self.start()
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._version != version, timeout=timeout)
+            return self._version, self._snapshot
+
+    def stream(self, keepalive=25, max_age=None):
+        """Server-Sent Events formatında durum değişikliklerini üret
+
+        max_age saniye sonra akış sonlanır; tarayıcının EventSource'u otomatik
+        yeniden bağlanır. Böylece bağlantılar sunucu thread'lerini süresiz tutmaz.
+        """
+        deadline = time.monotonic() + max_age if max_age else None
+        version, snapshot = self.wait_for_change(-1, timeout=0)
+        yield f"retry: {keepalive * 1000}\ndata: {json.dumps(snapshot)}\n\n"
+        while deadline is None or time.monotonic() < deadline:
+            new_version, snapshot = self.wait_for_change(
+                version, timeout=keepalive)
+            if new_version == version:
+                # Bağlantıyı canlı tutmak için yorum satırı gönder
+                yield ": keepalive\n\n"
+                continue
+            version = new_version
+            yield f"data: {json.dumps(snapshot)}\n\n"
@@ -0,0 +1,89 @@
+"""
+Process Owner - Süreç Kimliği ve Canlılık Kontrolü
+
+Birden çok süreç (gunicorn worker'ları, CLI, sıcak klasör izleyicileri)
+aynı iş günlüğünü ve klasörleri paylaşır. Kurtarma yalnızca sahibi artık
+çalışmayan işlere dokunmalıdır; bu modül sahip kimliğini üretir ve sahibin
+hâlâ çalışıp çalışmadığını söyler.
+
+Sahip kimliği "<host>:<pid>:<başlangıç>" biçimindedir. Linux'ta başlangıç
+değeri açılış kimliği (boot id) ve sürecin başlangıç zamanıdır; makine
+yeniden açıldığında veya pid başka bir sürece verildiğinde eski sahip ölü
+sayılır. Diğer platformlarda yalnızca pid kontrol edilir.
+
+Örnek Kullanım:
+    >>> from process_owner import current_owner, owner_alive
+    >>> journal.record(job_id, 'received', owner=current_owner(), ...)
+    >>> owner_alive(job['data'].get('owner'))
+"""
+
+import os
+import socket
+
+_BOOT_ID_PATH = '/proc/sys/kernel/random/boot_id'
+
+
+def pid_alive(pid):
+    """Bu makinedeki süreç hâlâ çalışıyor mu? (emin olunamazsa True)"""
+    if os.name == 'nt':
+        # Windows'ta os.kill(pid, 0) CTRL_C_EVENT gönderir; durum API'den okunur
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # QUERY_LIMITED_INFORMATION
+        if not handle:
+            return kernel32.GetLastError() == 5  # erişim reddi: süreç var
+        try:
+            code = ctypes.c_ulong()
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+            return code.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def start_token(pid):
+    """Sürecin başlangıç işareti (Linux: boot id + başlangıç tiki, diğer: '')"""
+    try:
+        with open(_BOOT_ID_PATH) as f:
+            boot_id = f.read().strip()[:8]
+        with open(f'/proc/{pid}/stat') as f:
+            # comm alanı boşluk içerebilir; starttime ')' sonrası 20. alandır
+            started = f.read().rsplit(')', 1)[1].split()[19]
+    except (OSError, IndexError):
+        return ''
+    return f'{boot_id}.{started}'
+
+
+def current_owner():
+    """Bu sürecin sahip kimliği"""
+    pid = os.getpid()
+    return f'{socket.gethostname()}:{pid}:{start_token(pid)}'
+
+
+def owner_alive(owner):
+    """Sahip süreç hâlâ çalışıyor mu?
+
+    Kimliği olmayan (eski sürüm) kayıtlar ölü sayılır. Başka makinedeki
+    sahiplerin durumu bilinemediği için canlı sayılır.
+    """
+    if not owner:
+        return False
+    parts = owner.rsplit(':', 2)
+    if len(parts) != 3 or not parts[1].isdigit():
+        return False
+    host, pid, token = parts[0], int(parts[1]), parts[2]
+    if host != socket.gethostname():
+        return True
+    if pid == os.getpid():
+        return owner == current_owner()
+    if not pid_alive(pid):
+        return False
+    # pid başka bir sürece verilmişse başlangıç işareti farklıdır
+    current = start_token(pid)
+    return not token or not current or current == token
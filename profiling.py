@@ -0,0 +1,269 @@
+"""
+Profiling - İstek Bazlı İsteğe Bağlı Profilleme
+
+Yavaş bir yüklemenin süresinin nereye gittiğini (blob kaydı, LANCZOS
+küçültme, JPEG kodlama, canvas.save, yazdırma yedek yöntemleri) görmek
+için tek bir isteği profiller. PROFILING_ENABLED açıkken X-Profile
+başlığı veya ?profile= parametresi taşıyan istekler için:
+    - cProfile çıktısı (istek thread'i ve işin render/yazdırma thread'leri
+      birleştirilmiş) veya örnekleme profili (katlanmış yığınlar)
+    - İşin aşama süreleri (metrics.STAGE_SECONDS gözlemleri)
+toplanır ve son PROFILING_MAX_ENTRIES rapor bellekte tutulur.
+
+Profilleme kapalıyken hiçbir kanca kurulmaz; aktif oturum olmayan
+görevlerin maliyeti tek bir ContextVar okumasıdır.
+
+Not: Python 3.12+ aynı anda tek cProfile çalıştırabilir; başka bir
+profil çalışıyorsa o parça için örnekleme profiline geçilir.
+
+Örnek Kullanım:
+    >>> session, token, handle = profiling.start_session('POST', '/upload')
+    >>> ...  # istek işlenir; render görevleri run_profiled ile sarılır
+    >>> report = profiling.finish_session(session, token, handle, status=200)
+"""
+
+import contextvars
+import cProfile
+import io
+import marshal
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+
+from logging_setup import current_job_id
+
+MODES = ('cprofile', 'sample')
+# Raporda gösterilecek en yavaş fonksiyon ve yığın sayısı
+TOP_FUNCTIONS = 40
+TOP_STACKS = 200
+
+# begin() tutamaçları: thread zaten profilleniyor / örnekleniyor
+_NESTED = object()
+_SAMPLED = object()
+
+_session_var = contextvars.ContextVar('profile_session', default=None)
+
+
+class ProfileSession:
+    """Tek isteğin profil verisi (thread'ler arasında paylaşılır)"""
+
+    def __init__(self, method, path, mode='cprofile', sample_interval=0.005):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.mode = mode
+        self.sample_interval = sample_interval
+        self.created = time.time()
+        self.started = time.perf_counter()
+        self.stages = []
+        self.job_ids = set()
+        self._lock = threading.Lock()
+        self._stats = None
+        self._samples = Counter()
+        # Oturuma katılmış thread'ler ve bunlardan örneklenenler
+        self._profiled = set()
+        self._threads = {}
+        self._active = True
+        self._sampler = None
+
+    def begin(self):
+        """Bu thread'i oturuma kat - end() ile verilecek tutamacı döndürür
+
+        Thread zaten profilleniyorsa (ör. istek thread'inde sırayla çalışan
+        görev) iç içe profil başlatılmaz.
+        """
+        ident = threading.get_ident()
+        with self._lock:
+            if ident in self._profiled:
+                return _NESTED
+        if self.mode == 'cprofile':
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Python 3.12+: başka bir profil aktif - bu parça örneklenir
+                profiler = None
+            if profiler is not None:
+                with self._lock:
+                    self._profiled.add(ident)
+                return profiler
+        with self._lock:
+            self._profiled.add(ident)
+            self._threads[ident] = True
+            if self._sampler is None:
+                self._sampler = threading.Thread(
+                    target=self._sample_loop, name=f'profile-{self.id}', daemon=True)
+                self._sampler.start()
+        return _SAMPLED
+
+    def end(self, handle):
+        """begin() ile katılan thread'in verisini oturuma ekle"""
+        if handle is _NESTED:
+            return
+        ident = threading.get_ident()
+        if handle is _SAMPLED:
+            with self._lock:
+                self._threads.pop(ident, None)
+                self._profiled.discard(ident)
+            return
+        handle.disable()
+        with self._lock:
+            self._profiled.discard(ident)
+            if self._stats is None:
+                self._stats = pstats.Stats(handle)
+            else:
+                self._stats.add(handle)
+
+    def _sample_loop(self):
+        """Örneklenen thread'lerin yığınlarını düzenli aralıkla say"""
+        while self._active:
+            frames = sys._current_frames()
+            with self._lock:
+                idents = list(self._threads)
+            for ident in idents:
+                frame = frames.get(ident)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}"
+                                 f":{frame.f_lineno})")
+                    frame = frame.f_back
+                if stack:
+                    self._samples[';'.join(reversed(stack))] += 1
+            time.sleep(self.sample_interval)
+
+    def record_stage(self, seconds, labels):
+        """Aşama süresini bitiş anıyla birlikte kaydet"""
+        job_id = current_job_id()
+        with self._lock:
+            self.stages.append({
+                'stage': labels.get('stage', ''),
+                'seconds': round(seconds, 6),
+                'end_offset': round(time.perf_counter() - self.started, 6),
+                'layout': labels.get('layout', ''),
+                'file_type': labels.get('file_type', ''),
+                'thread': threading.current_thread().name,
+                'job_id': job_id
+            })
+            if job_id != '-':
+                self.job_ids.add(job_id)
+
+    def finish(self, status=None):
+        """Örneklemeyi durdur ve raporu oluştur"""
+        self._active = False
+        if self._sampler is not None:
+            self._sampler.join(timeout=1)
+        duration = time.perf_counter() - self.started
+        totals = {}
+        with self._lock:
+            for stage in self.stages:
+                total = totals.setdefault(stage['stage'], {'count': 0, 'seconds': 0.0})
+                total['count'] += 1
+                total['seconds'] = round(total['seconds'] + stage['seconds'], 6)
+            report = {
+                'id': self.id,
+                'method': self.method,
+                'path': self.path,
+                'status': status,
+                'mode': self.mode,
+                'created': self.created,
+                'duration': round(duration, 6),
+                'job_ids': sorted(self.job_ids),
+                'stages': list(self.stages),
+                'stage_totals': totals,
+                'functions': None,
+                'samples': None,
+                'pstats': None
+            }
+            if self._stats is not None:
+                buffer = io.StringIO()
+                self._stats.stream = buffer
+                self._stats.sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+                report['functions'] = buffer.getvalue()
+                # snakeviz vb. araçlarla açılabilen ham pstats verisi
+                report['pstats'] = marshal.dumps(self._stats.stats)
+            if self._samples:
+                report['samples'] = [f"{stack} {count}" for stack, count
+                                     in self._samples.most_common(TOP_STACKS)]
+        return report
+
+
+def current_session():
+    """Aktif profil oturumu (yoksa None)"""
+    return _session_var.get()
+
+
+def start_session(method, path, mode='cprofile', sample_interval=0.005):
+    """Bu bağlamda profil oturumu başlat - (oturum, token, tutamaç) döndürür"""
+    session = ProfileSession(method, path, mode, sample_interval)
+    token = _session_var.set(session)
+    return session, token, session.begin()
+
+
+def detach_session(session, token, handle):
+    """Bu thread'i oturumdan çıkar; oturum diğer thread'ler için açık kalır
+
+    Akış yanıtlarında iş istek döndükten sonra arka planda sürer; oturum
+    daha sonra session.finish() ile kapatılır.
+    """
+    session.end(handle)
+    _session_var.reset(token)
+
+
+def finish_session(session, token, handle, status=None):
+    """Oturumu kapat ve raporu döndür"""
+    detach_session(session, token, handle)
+    return session.finish(status)
+
+
+def run_profiled(fn, *args, **kwargs):
+    """fn'i aktif oturum varsa bu thread'de profilleyerek çalıştır
+
+    Render zamanlayıcısı ve toplu yazdırma thread'leri bağlamı kopyaladığı
+    için oturum bu thread'lere de taşınır.
+    """
+    session = _session_var.get()
+    if session is None:
+        return fn(*args, **kwargs)
+    handle = session.begin()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        session.end(handle)
+
+
+def record_stage(value, labels):
+    """metrics.STAGE_SECONDS gözlemcisi - aktif oturuma aşama süresi ekler"""
+    session = _session_var.get()
+    if session is not None:
+        session.record_stage(value, labels)
+
+
+class ProfileStore:
+    """Son profil raporları (sınırlı sayıda, en eski atılır)"""
+
+    def __init__(self, max_entries=20):
+        self._reports = deque(maxlen=max(1, max_entries))
+        self._lock = threading.Lock()
+
+    def add(self, report):
+        with self._lock:
+            self._reports.append(report)
+
+    def get(self, profile_id):
+        with self._lock:
+            for report in self._reports:
+                if report['id'] == profile_id:
+                    return report
+        return None
+
+    def summaries(self):
+        """Raporların kısa listesi (en yeni önce)"""
+        keys = ('id', 'method', 'path', 'status', 'mode', 'created', 'duration',
+                'job_ids', 'stage_totals')
+        with self._lock:
+            return [{key: report[key] for key in keys}
+                    for report in reversed(self._reports)]
@@ -0,0 +1,231 @@
+"""
+Scheduler - Adil İş Sıralama ve İstemci Bazlı Hız Sınırlama
+
+Bu modül iki parçadan oluşur:
+    - FairScheduler: Render görevlerini sabit sayıda worker thread'inde
+      çalıştırır. Görevler istemci (IP) bazında ayrı kuyruklarda tutulur
+      ve Deficit Round Robin ile sırayla alınır; büyük bir toplu iş
+      gönderen istemci her turda sadece kendi payı (quantum, bayt) kadar
+      görev çalıştırabilir. Küçük işler (priority=0) önce çalışır.
+    - RateLimiter: İstemci başına token bucket ile dakikalık iş sayısı
+      ve saatlik bayt kotası uygular.
+
+Örnek Kullanım:
+    >>> from scheduler import FairScheduler, RateLimiter
+    >>> scheduler = FairScheduler(workers=4, quantum=1 << 20)
+    >>> future = scheduler.submit('10.0.0.5', size, create_layout_pdf, path, '4')
+    >>> output_pdf = future.result()
+    >>> limiter = RateLimiter(jobs_per_minute=30, bytes_per_hour=500 << 20)
+    >>> allowed, retry_after = limiter.check('10.0.0.5', size)
+"""
+
+import contextvars
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+# Logger yapılandırması
+logger = logging.getLogger(__name__)
+
+# Görev öncelikleri (küçük sayı önce çalışır)
+PRIORITY_SMALL = 0
+PRIORITY_NORMAL = 1
+
+
+class FairScheduler:
+    """İstemciler arasında adil (DRR) sıralama yapan worker havuzu"""
+
+    def __init__(self, workers, quantum=1024 * 1024, name='render'):
+        self.workers = max(1, workers)
+        # Her turda bir istemciye verilen pay (görev maliyeti birimiyle, bayt)
+        self.quantum = max(1, quantum)
+        self.name = name
+        self._cond = threading.Condition()
+        self._queues = {}
+        self._deficit = {}
+        self._active = deque()
+        self._seq = itertools.count()
+        self._threads = []
+        self._running = 0
+
+    def _ensure_started(self):
+        """Worker thread'lerini ilk görevde başlat"""
+        if self._threads:
+            return
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker, daemon=True,
+                                      name=f'{self.name}-{index}')
+            self._threads.append(thread)
+            thread.start()
+
+    def submit(self, client, cost, fn, *args, priority=PRIORITY_NORMAL, **kwargs):
+        """Görevi istemcinin kuyruğuna ekle ve Future döndür
+
+        Görev, çağıranın contextvars bağlamının bir kopyasıyla çalışır
+        (iş kimliği loglarda korunur).
+        """
+        future = Future()
+        task = (priority, next(self._seq), max(1, cost), future,
+                contextvars.copy_context(), fn, args, kwargs)
+        with self._cond:
+            self._ensure_started()
+            queue = self._queues.get(client)
+            if queue is None:
+                queue = self._queues[client] = []
+                self._deficit[client] = 0
+                self._active.append(client)
+            heapq.heappush(queue, task)
+            self._cond.notify()
+        return future
+
+    def _pop(self, client):
+        """İstemcinin sıradaki görevini al, kuyruğu boşaldıysa istemciyi çıkar"""
+        queue = self._queues[client]
+        task = heapq.heappop(queue)
+        if not queue:
+            del self._queues[client]
+            del self._deficit[client]
+            self._active.remove(client)
+        return task
+
+    def _next_task(self):
+        """Sıradaki görevi seç (kilit altında çağrılır)"""
+        # Küçük işler: sırası gelen ilk istemciden al, istemciyi sona taşı
+        for client in self._active:
+            if self._queues[client][0][0] == PRIORITY_SMALL:
+                task = self._pop(client)
+                if client in self._queues:
+                    self._active.remove(client)
+                    self._active.append(client)
+                return task
+        # Deficit Round Robin: pay yetiyorsa çalıştır, yetmiyorsa pay ekleyip sıradakine geç
+        while True:
+            client = self._active[0]
+            cost = self._queues[client][0][2]
+            if self._deficit[client] >= cost:
+                self._deficit[client] -= cost
+                return self._pop(client)
+            self._deficit[client] += self.quantum
+            self._active.rotate(-1)
+
+    def _worker(self):
+        """Görevleri sırayla çalıştır"""
+        while True:
+            with self._cond:
+                while not self._active:
+                    self._cond.wait()
+                _, _, _, future, context, fn, args, kwargs = self._next_task()
+                self._running += 1
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        result = context.run(fn, *args, **kwargs)
+                    except BaseException as e:
+                        future.set_exception(e)
+                    else:
+                        future.set_result(result)
+            finally:
+                with self._cond:
+                    self._running -= 1
+
+    def stats(self):
+        """Kuyruk durumu: bekleyen görevler istemci bazında"""
+        with self._cond:
+            clients = {client: len(queue) for client, queue in self._queues.items()}
+            return {
+                'workers': self.workers,
+                'running': self._running,
+                'queued': sum(clients.values()),
+                'clients': clients
+            }
+
+
+class _Bucket:
+    """Basit token bucket"""
+
+    __slots__ = ('capacity', 'rate', 'tokens', 'updated')
+
+    def __init__(self, capacity, rate, now):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated = now
+
+    def refill(self, now):
+        self.tokens = min(self.capacity,
+                          self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        """amount kadar token için beklenecek süre (saniye)"""
+        if amount > self.capacity:
+            return None
+        return max(0.0, (amount - self.tokens) / self.rate)
+
+
+class RateLimiter:
+    """İstemci başına iş sayısı ve bayt kotası (0 = sınırsız)"""
+
+    def __init__(self, jobs_per_minute=0, burst=None, bytes_per_hour=0):
+        self.jobs_per_minute = jobs_per_minute
+        self.burst = burst or jobs_per_minute
+        self.bytes_per_hour = bytes_per_hour
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._checks = 0
+
+    @property
+    def enabled(self):
+        return bool(self.jobs_per_minute or self.bytes_per_hour)
+
+    def _buckets(self, client, now):
+        buckets = self._clients.get(client)
+        if buckets is None:
+            buckets = self._clients[client] = (
+                _Bucket(self.burst, self.jobs_per_minute / 60.0, now)
+                if self.jobs_per_minute else None,
+                _Bucket(self.bytes_per_hour, self.bytes_per_hour / 3600.0, now)
+                if self.bytes_per_hour else None)
+        return buckets
+
+    def _prune(self, now):
+        """Uzun süredir dolu olan (boşta) istemcileri unut"""
+        for client, buckets in list(self._clients.items()):
+            for bucket in buckets:
+                if bucket is not None:
+                    bucket.refill(now)
+            if all(b is None or b.tokens >= b.capacity for b in buckets):
+                del self._clients[client]
+
+    def check(self, client, size):
+        """İsteğe izin ver veya reddet - (izin, retry_after saniye) döndürür"""
+        if not self.enabled:
+            return True, 0
+        now = time.monotonic()
+        with self._lock:
+            self._checks += 1
+            if self._checks % 1000 == 0:
+                self._prune(now)
+            jobs, data = self._buckets(client, now)
+            waits = []
+            for bucket, amount in ((jobs, 1), (data, size)):
+                if bucket is None:
+                    continue
+                bucket.refill(now)
+                wait = bucket.wait_time(amount)
+                if wait is None:
+                    # Tek istek kotanın tamamından büyük
+                    return False, 3600
+                waits.append(wait)
+            retry_after = max(waits) if waits else 0
+            if retry_after > 0:
+                return False, int(retry_after) + 1
+            if jobs is not None:
+                jobs.tokens -= 1
+            if data is not None:
+                data.tokens -= size
+            return True, 0
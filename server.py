@@ -0,0 +1,45 @@
+"""
+Server - Üretim WSGI Sunucusu
+
+Waitress ile çok thread'li üretim sunucusunu başlatır. Flask uygulaması
+parametre olarak verilir; böylece app.py ve wsgi.py aynı fonksiyonu kullanır.
+
+Örnek Kullanım:
+    >>> from server import serve_waitress
+    >>> serve_waitress(app, config)
+"""
+
+import logging
+
+# Logger yapılandırması
+logger = logging.getLogger(__name__)
+
+
+def serve_waitress(application, config):
+    """Waitress ile üretim sunucusunu başlat"""
+    try:
+        from waitress import serve
+    except ImportError:
+        logger.error("waitress modülü bulunamadı! Çözüm: pip install waitress")
+        raise
+
+    if config.SERVER_ENGINE == 'gunicorn':
+        logger.warning(
+            "gunicorn doğrudan başlatılmalı: gunicorn -c gunicorn.conf.py wsgi:application"
+            " - waitress ile devam ediliyor")
+
+    logger.info("🚀 Waitress başlatılıyor: %s:%s (thread=%d, render=%d)",
+                config.HOST, config.PORT, config.SERVER_THREADS,
+                config.RENDER_WORKERS)
+    serve(
+        application,
+        host=config.HOST,
+        port=config.PORT,
+        threads=config.SERVER_THREADS,
+        connection_limit=config.SERVER_CONNECTION_LIMIT,
+        channel_timeout=config.SERVER_CHANNEL_TIMEOUT,
+        # Büyük yüklemeler bellekte değil geçici dosyada tamponlanır
+        inbuf_overflow=config.UPLOAD_MEMORY_BUFFER,
+        max_request_body_size=config.MAX_CONTENT_LENGTH,
+        ident='web-print-service'
+    )
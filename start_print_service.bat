@@ -30,9 +30,10 @@ echo Kapatmak icin bu pencereyi kapatin veya Ctrl+C
 echo ================================================
 echo.
 
-pythonw app.py
+REM Üretim sunucusu (waitress) ile başlat
+pythonw wsgi.py
 
 REM Eğer pythonw yoksa normal python kullan
 if errorlevel 1 (
-    python app.py
+    python wsgi.py
 )
@@ -0,0 +1,32 @@
+"""
+Test yapılandırması
+
+Servis modülleri ayarları import sırasında okuduğu için ortam değişkenleri
+burada, testler app'i yüklemeden önce geçici klasörlere yönlendirilir.
+Yazdırma dosya arka ucuna yapılır; gerçek yazıcıya bir şey gönderilmez.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_TEST_DIR = tempfile.mkdtemp(prefix='wps_tests_')
+os.environ.update({
+    'UPLOAD_FOLDER': os.path.join(_TEST_DIR, 'uploads'),
+    'JOURNAL_PATH': os.path.join(_TEST_DIR, 'journal.db'),
+    'PRINTER_BACKEND': 'file',
+    'PRINT_SINK_DIR': os.path.join(_TEST_DIR, 'sink'),
+    'PRINTERS': '',
+    'HOT_FOLDERS': '',
+    'CLUSTER_QUEUE_PATH': '',
+    'CLUSTER_COORDINATOR': '',
+    'LOG_LEVEL': 'WARNING',
+})
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_TEST_DIR, ignore_errors=True)
@@ -0,0 +1,115 @@
+"""blob_store.BlobStore acquire/evict testleri"""
+
+import hashlib
+import io
+import os
+import threading
+
+import pytest
+
+from blob_store import BlobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BlobStore(str(tmp_path / 'blobs'))
+
+
+def _put(store, data, owner='job-1', uploader=None, ext='.png'):
+    return store.put_stream(io.BytesIO(data), ext, owner, uploader=uploader)
+
+
+def test_put_deduplicates_same_content(store):
+    digest, path, created = _put(store, b'abc', owner='job-1')
+    assert digest == hashlib.sha256(b'abc').hexdigest()
+    assert created and os.path.exists(path)
+    again, same_path, created = _put(store, b'abc', owner='job-2')
+    assert again == digest and same_path == path and not created
+    assert not [name for name in os.listdir(store.root) if name.endswith('.part')]
+
+
+def test_acquire_returns_path_and_adds_owner(store):
+    digest, path, _ = _put(store, b'data', owner='job-1')
+    store.release(digest, 'job-1')
+    assert store.acquire(digest, 'job-2') == path
+    # Yeni sahip varken blob silinmez
+    assert store.evict(max_age=0) == 0
+    store.release(digest, 'job-2')
+    assert store.evict(max_age=0) == 1
+    assert not os.path.exists(path)
+
+
+def test_acquire_unknown_or_invalid_digest(store):
+    assert store.acquire('0' * 64, 'job-1') is None
+    assert store.acquire('not-a-digest', 'job-1') is None
+
+
+def test_acquire_is_scoped_to_uploader(store):
+    digest, path, _ = _put(store, b'private', uploader='alice')
+    assert store.acquire(digest, 'job-2', uploader='bob') is None
+    assert store.acquire(digest, 'job-3', uploader='alice') == path
+    # Aynı içeriği yükleyen ikinci istemci de erişim kazanır
+    _put(store, b'private', owner='job-4', uploader='bob')
+    assert store.acquire(digest, 'job-5', uploader='bob') == path
+
+
+def test_acquire_after_file_removed_from_disk(store):
+    digest, path, _ = _put(store, b'gone')
+    os.remove(path)
+    assert store.acquire(digest, 'job-2') is None
+    assert store.lookup(digest) is None
+
+
+def test_evict_keeps_owned_and_recent_blobs(store):
+    owned, owned_path, _ = _put(store, b'owned', owner='job-1')
+    free, free_path, _ = _put(store, b'free', owner='job-2')
+    store.release(free, 'job-2')
+    assert store.evict(max_age=3600) == 0
+    assert store.evict(max_age=0) == 1
+    assert os.path.exists(owned_path) and not os.path.exists(free_path)
+
+
+def test_evict_enforces_quota_lru(store):
+    digests = []
+    for index in range(3):
+        digest, _, _ = _put(store, bytes([index]) * 100, owner=f'job-{index}')
+        store.release(digest, f'job-{index}')
+        digests.append(digest)
+    # En son kullanılan en sona kalır
+    store.acquire(digests[0], 'job-x')
+    store.release(digests[0], 'job-x')
+    assert store.evict(quota_bytes=150) == 2
+    assert store.lookup(digests[0]) is not None
+    assert store.lookup(digests[1]) is None and store.lookup(digests[2]) is None
+
+
+def test_evict_drops_stale_refs_of_inactive_owners(store):
+    active, _, _ = _put(store, b'active', owner='job-active')
+    crashed, _, _ = _put(store, b'crashed', owner='job-crashed')
+    removed = store.evict(max_age=0, active_owners={'job-active'}, min_ref_age=0)
+    assert removed == 1
+    assert store.lookup(active) is not None and store.lookup(crashed) is None
+
+
+def test_concurrent_acquire_and_evict_never_return_missing_file(store):
+    digest, _, _ = _put(store, b'race')
+    store.release(digest, 'job-1')
+    stop = threading.Event()
+
+    def evict_loop():
+        while not stop.is_set():
+            store.evict(max_age=0)
+
+    thread = threading.Thread(target=evict_loop)
+    thread.start()
+    try:
+        for index in range(200):
+            path = store.acquire(digest, f'job-{index}')
+            if path is None:
+                # Blob silindiyse tekrar yüklenir
+                _, path, _ = _put(store, b'race', owner=f'job-{index}')
+            assert os.path.exists(path)
+            store.release(digest, f'job-{index}')
+    finally:
+        stop.set()
+        thread.join()
@@ -0,0 +1,126 @@
+"""cluster.ClusterQueue claim/reap testleri"""
+
+import threading
+import time
+
+import pytest
+
+from cluster import ClusterQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return ClusterQueue(str(tmp_path / 'cluster.db'))
+
+
+def _files(count):
+    return [{'name': f'{index}.png', 'type': 'png', 'data': b'png-%d' % index,
+             'options': {}} for index in range(count)]
+
+
+def _submit(queue, job_id='job-1', count=2, **options):
+    queue.submit_files(job_id, _files(count), '1', **options)
+
+
+def test_claim_assigns_each_task_once(queue):
+    _submit(queue, count=3)
+    queue.register_node('n1', ['render'])
+    tasks = [queue.claim('n1', 'render') for _ in range(3)]
+    assert sorted(task['seq'] for task in tasks) == [0, 1, 2]
+    assert queue.claim('n1', 'render') is None
+    assert queue.stats() == {'render_claimed': 3}
+
+
+def test_concurrent_claims_do_not_share_tasks(queue):
+    _submit(queue, count=20)
+    claimed = []
+    lock = threading.Lock()
+
+    def worker(node_id):
+        queue.register_node(node_id, ['render'])
+        while True:
+            task = queue.claim(node_id, 'render')
+            if task is None:
+                return
+            with lock:
+                claimed.append(task['task_id'])
+
+    threads = [threading.Thread(target=worker, args=(f'n{i}',)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(claimed) == len(set(claimed)) == 20
+
+
+def test_claim_respects_printer_capabilities(queue):
+    _submit(queue, 'color-job', count=1, color=True, paper='A3')
+    mono = [{'name': 'sb', 'color': False, 'paper': None}]
+    a4_color = [{'name': 'renkli', 'color': True, 'paper': ['A4']}]
+    a3_color = [{'name': 'renkli-a3', 'color': True, 'paper': ['A3']}]
+    assert queue.claim('n1', 'render', printers=mono) is None
+    assert queue.claim('n1', 'render', printers=a4_color) is None
+    task = queue.claim('n1', 'render', printers=a3_color)
+    assert task['job_id'] == 'color-job' and task['color'] is True
+
+
+def test_render_to_print_to_done(queue):
+    _submit(queue, count=1)
+    render = queue.claim('n1', 'render')
+    assert queue.load_inputs(render)[0]['data'] == b'png-0'
+    queue.complete_render(render, b'%PDF')
+    job = queue.job('job-1')
+    assert job['status'] == 'processing' and not job['finished']
+    printing = queue.claim('n1', 'print')
+    assert queue.load_payload(printing) == b'%PDF'
+    queue.complete_print(printing, True, 'ok')
+    job = queue.job('job-1')
+    assert job['finished'] and job['success']
+
+
+def test_reap_requeues_render_and_fails_print_of_lost_node(queue):
+    _submit(queue, count=2)
+    queue.register_node('lost', ['render', 'print'])
+    first = queue.claim('lost', 'render')
+    queue.complete_render(first, b'%PDF')
+    queue.claim('lost', 'print')
+    queue.claim('lost', 'render')
+    # Heartbeat kesildi
+    time.sleep(0.05)
+    queue.reap(stale_after=0.01)
+    assert queue.stats() == {'render_pending': 1}
+    job = queue.job('job-1')
+    assert [r['success'] for r in job['results']] == [False]
+    # Geri alınan render görevi başka düğüme verilir
+    queue.register_node('alive', ['render'])
+    assert queue.claim('alive', 'render')['seq'] == 1
+
+
+def test_reap_leaves_live_nodes_alone(queue):
+    _submit(queue, count=1)
+    queue.register_node('n1', ['render'])
+    queue.claim('n1', 'render')
+    queue.reap(stale_after=60)
+    assert queue.stats() == {'render_claimed': 1}
+
+
+def test_reap_deletes_finished_jobs_after_retention(tmp_path):
+    queue = ClusterQueue(str(tmp_path / 'cluster.db'), retention=0)
+    _submit(queue, count=1, print_direct=False)
+    queue.complete_render(queue.claim('n1', 'render'), b'%PDF')
+    assert queue.job('job-1')['finished']
+    time.sleep(0.01)
+    queue.reap(stale_after=60)
+    assert queue.job('job-1') is None
+
+
+def test_register_releases_tasks_of_restarted_node(queue):
+    _submit(queue, count=2)
+    queue.register_node('n1', ['render', 'print'])
+    queue.complete_render(queue.claim('n1', 'render'), b'%PDF')
+    queue.claim('n1', 'print')
+    queue.claim('n1', 'render')
+    # Aynı kimlikle yeniden başlayan düğüm
+    queue.register_node('n1', ['render', 'print'])
+    assert queue.stats() == {'render_pending': 1}
+    assert [r['success'] for r in queue.job('job-1')['results']] == [False]
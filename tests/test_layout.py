@@ -0,0 +1,67 @@
+"""layout_handler.pack_shelves raf yerleşimi testleri"""
+
+import pytest
+
+from layout_handler import pack_shelves
+
+PAGE = (100, 100)
+
+
+def _indices(pages):
+    return [[index for index, _, _ in page] for page in pages]
+
+
+def test_keeps_order_and_fills_shelves():
+    boxes = [(40, 30), (40, 30), (40, 30), (40, 30)]
+    pages = pack_shelves(boxes, PAGE)
+    assert _indices(pages) == [[0, 1, 2, 3]]
+    # İki kutu yan yana sığar, üçüncüsü yeni rafa geçer
+    (_, x0, y0), (_, x1, y1), (_, x2, y2), _ = pages[0]
+    assert y0 == y1 == 0 and x1 > x0
+    assert y2 == 30 and x2 == x0
+
+
+def test_boxes_stay_inside_page():
+    boxes = [(30, 20), (50, 45), (25, 60), (70, 10), (45, 45)]
+    for sort in (False, True):
+        for page in pack_shelves(boxes, PAGE, gap=2, sort=sort):
+            for index, x, y in page:
+                width, height = boxes[index]
+                assert 0 <= x and x + width <= PAGE[0] + 2 + 1e-6
+                assert 0 <= y and y + height <= PAGE[1] + 2 + 1e-6
+
+
+def test_boxes_on_a_page_do_not_overlap():
+    boxes = [(30, 20), (50, 45), (25, 60), (70, 10), (45, 45), (20, 20)]
+    for sort in (False, True):
+        for page in pack_shelves(boxes, PAGE, gap=1, sort=sort):
+            rects = [(x, y, x + boxes[i][0], y + boxes[i][1]) for i, x, y in page]
+            for a in range(len(rects)):
+                for b in range(a + 1, len(rects)):
+                    ax0, ay0, ax1, ay1 = rects[a]
+                    bx0, by0, bx1, by1 = rects[b]
+                    assert ax1 <= bx0 + 1e-6 or bx1 <= ax0 + 1e-6 \
+                        or ay1 <= by0 + 1e-6 or by1 <= ay0 + 1e-6
+
+
+def test_next_fit_opens_new_page_when_full():
+    pages = pack_shelves([(100, 60), (100, 60)], PAGE)
+    assert _indices(pages) == [[0], [1]]
+
+
+def test_sort_needs_no_more_pages_than_order():
+    boxes = [(60, 50), (40, 20), (60, 50), (40, 20), (40, 20), (40, 20)]
+    ordered = pack_shelves(boxes, PAGE)
+    packed = pack_shelves(boxes, PAGE, sort=True)
+    assert len(packed) <= len(ordered)
+    assert sorted(i for page in _indices(packed) for i in page) == list(range(len(boxes)))
+
+
+def test_oversized_box_is_clamped_to_page():
+    pages = pack_shelves([(150, 150), (10, 10)], PAGE)
+    assert _indices(pages) == [[0], [1]]
+    assert pages[0][0][1:] == pytest.approx((0, 0))
+
+
+def test_empty_input():
+    assert pack_shelves([], PAGE) == []
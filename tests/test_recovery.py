@@ -0,0 +1,135 @@
+"""app.recover_interrupted_jobs testleri
+
+İşler iş günlüğüne elle yazılır ve kurtarma çağrılır; yazdırma dosya arka
+ucuna (PRINT_SINK_DIR) yapılır.
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import uuid
+
+import pytest
+from PIL import Image
+
+import app
+from process_owner import current_owner
+
+
+@pytest.fixture(scope='module')
+def dead_owner():
+    """Bu makinede çalışıp bitmiş bir sürecin sahip kimliği"""
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return f'{socket.gethostname()}:{process.pid}:0.0'
+
+
+@pytest.fixture
+def image_entry(tmp_path):
+    def make(name='foto.png'):
+        path = str(tmp_path / f'{uuid.uuid4().hex[:8]}_{name}')
+        Image.new('RGB', (60, 40), 'red').save(path)
+        return {'name': name, 'path': path, 'size': os.path.getsize(path), 'type': 'png'}
+    return make
+
+
+def _new_job_id():
+    return uuid.uuid4().hex[:12]
+
+
+def _state(job_id):
+    return app.journal.history(job_id)[-1]['state']
+
+
+def _printed(job_id):
+    sink = app.config.PRINT_SINK_DIR
+    if not os.path.isdir(sink):
+        return []
+    return sorted(name for name in os.listdir(sink) if job_id in name)
+
+
+def _receive(job_id, entries, owner, kind='single', **data):
+    data = dict({'layout': '1', 'print_direct': True, 'color': None,
+                 'paper': None, 'client': 'test'}, **data)
+    app.journal.record(job_id, 'received', kind=kind, files=entries,
+                       owner=owner, **data)
+
+
+def test_job_of_live_owner_is_left_alone(image_entry):
+    job_id = _new_job_id()
+    _receive(job_id, [image_entry()], current_owner())
+    app.journal.record(job_id, 'rendering')
+    app.recover_interrupted_jobs()
+    assert _state(job_id) == 'rendering'
+    assert job_id in {job['job_id'] for job in app.journal.incomplete_jobs()}
+    app.journal.record(job_id, 'failed', message='test sonu')
+
+
+def test_job_on_other_host_is_left_alone(image_entry):
+    job_id = _new_job_id()
+    _receive(job_id, [image_entry()], 'baska-makine:1:0.0')
+    app.recover_interrupted_jobs()
+    assert _state(job_id) == 'received'
+    app.journal.record(job_id, 'failed', message='test sonu')
+
+
+def test_job_of_dead_owner_is_rerun(image_entry, dead_owner):
+    job_id = _new_job_id()
+    _receive(job_id, [image_entry()], dead_owner)
+    app.journal.record(job_id, 'rendering')
+    app.recover_interrupted_jobs()
+    assert _state(job_id) == 'done'
+    assert len(_printed(job_id)) == 1
+    # Kurtaran süreç işi kendi adına yeniden almıştır
+    received = [event for event in app.journal.history(job_id)
+                if event['state'] == 'received']
+    assert received[-1]['data']['owner'] == current_owner()
+
+
+def test_job_without_owner_is_treated_as_dead(image_entry):
+    job_id = _new_job_id()
+    _receive(job_id, [image_entry()], None, print_direct=False)
+    app.recover_interrupted_jobs()
+    assert _state(job_id) == 'done'
+    assert _printed(job_id) == []
+
+
+def test_single_job_interrupted_while_printing_is_not_reprinted(image_entry, dead_owner):
+    job_id = _new_job_id()
+    entry = image_entry()
+    _receive(job_id, [entry], dead_owner)
+    app.journal.record(job_id, 'printing', file=entry['path'])
+    app.recover_interrupted_jobs()
+    assert _state(job_id) == 'failed'
+    assert _printed(job_id) == []
+
+
+def test_batch_resumes_after_done_and_interrupted_files(image_entry, dead_owner):
+    job_id = _new_job_id()
+    done, interrupted, pending = (image_entry(f'{name}.png') for name in ('a', 'b', 'c'))
+    _receive(job_id, [done, interrupted, pending], dead_owner, kind='batch',
+             combine=False, pack=False)
+    app.journal.record(job_id, 'file_done', file=done['path'], success=True)
+    app.journal.record(job_id, 'printing', file=interrupted['path'])
+    app.recover_interrupted_jobs()
+    assert _state(job_id) in ('done', 'failed')
+    printed = _printed(job_id)
+    assert len(printed) == 1 and printed[0].endswith('_c_layout_1.pdf')
+
+
+def test_cli_job_is_failed_not_rerun(image_entry, dead_owner):
+    job_id = _new_job_id()
+    _receive(job_id, [image_entry()], dead_owner, kind='cli', combine=False, pack=False)
+    app.journal.record(job_id, 'rendering')
+    app.recover_interrupted_jobs()
+    assert _state(job_id) == 'failed'
+    assert _printed(job_id) == []
+
+
+def test_job_with_missing_files_fails(dead_owner):
+    job_id = _new_job_id()
+    missing = {'name': 'yok.png', 'path': '/nonexistent/yok.png', 'size': 1, 'type': 'png'}
+    _receive(job_id, [missing], dead_owner)
+    app.recover_interrupted_jobs()
+    assert _state(job_id) == 'failed'
@@ -0,0 +1,103 @@
+"""scheduler.FairScheduler adil sıralama testleri"""
+
+import contextvars
+import threading
+
+import pytest
+
+from scheduler import FairScheduler, PRIORITY_SMALL
+
+_request = contextvars.ContextVar('request', default=None)
+
+
+def _blocked_scheduler(quantum=100):
+    """Tek worker'lı zamanlayıcı; worker bir kapıda bekletilir
+
+    Kapı açılana kadar gönderilen görevler kuyrukta birikir, böylece
+    çalışma sırası yalnızca zamanlayıcının seçimine bağlı olur.
+    """
+    scheduler = FairScheduler(workers=1, quantum=quantum, name='test')
+    gate = threading.Event()
+    started = threading.Event()
+
+    def block():
+        started.set()
+        gate.wait(5)
+
+    scheduler.submit('gate', 1, block)
+    assert started.wait(5)
+    return scheduler, gate
+
+
+def _run(scheduler, gate, submissions):
+    order = []
+    futures = [scheduler.submit(client, cost, order.append, label, **options)
+               for client, cost, label, options in submissions]
+    gate.set()
+    for future in futures:
+        future.result(timeout=5)
+    return order
+
+
+def test_large_batch_does_not_starve_other_client():
+    scheduler, gate = _blocked_scheduler(quantum=100)
+    batch = [('batch', 100, f'batch-{i}', {}) for i in range(10)]
+    order = _run(scheduler, gate, batch + [('single', 100, 'single', {})])
+    # Sıraya sonra giren istemci, toplu işin tamamını beklemez
+    assert order.index('single') <= 2
+
+
+def test_clients_alternate_by_cost():
+    scheduler, gate = _blocked_scheduler(quantum=100)
+    submissions = [('a', 100, f'a{i}', {}) for i in range(3)] + \
+                  [('b', 100, f'b{i}', {}) for i in range(3)]
+    order = _run(scheduler, gate, submissions)
+    assert order == ['a0', 'b0', 'a1', 'b1', 'a2', 'b2']
+
+
+def test_small_priority_runs_first():
+    scheduler, gate = _blocked_scheduler()
+    submissions = [('batch', 100, f'batch-{i}', {}) for i in range(5)]
+    submissions.append(('batch', 100, 'small', {'priority': PRIORITY_SMALL}))
+    order = _run(scheduler, gate, submissions)
+    assert order[0] == 'small'
+
+
+def test_fifo_within_client():
+    scheduler, gate = _blocked_scheduler()
+    order = _run(scheduler, gate, [('a', 50, i, {}) for i in range(6)])
+    assert order == list(range(6))
+
+
+def test_exception_is_set_on_future():
+    scheduler = FairScheduler(workers=1, name='test')
+
+    def fail():
+        raise ValueError('render hatası')
+
+    future = scheduler.submit('a', 1, fail)
+    with pytest.raises(ValueError, match='render hatası'):
+        future.result(timeout=5)
+
+
+def test_task_runs_in_submitters_context():
+    scheduler = FairScheduler(workers=2, name='test')
+    token = _request.set('job-1')
+    try:
+        future = scheduler.submit('a', 1, _request.get)
+    finally:
+        _request.reset(token)
+    assert future.result(timeout=5) == 'job-1'
+
+
+def test_stats_reports_queued_tasks_per_client():
+    scheduler, gate = _blocked_scheduler()
+    futures = [scheduler.submit('a', 1, lambda: None) for _ in range(3)]
+    futures.append(scheduler.submit('b', 1, lambda: None))
+    stats = scheduler.stats()
+    assert stats['queued'] == 4
+    assert stats['clients'] == {'a': 3, 'b': 1}
+    assert stats['running'] == 1
+    gate.set()
+    for future in futures:
+        future.result(timeout=5)
@@ -0,0 +1,28 @@
+"""
+WSGI Giriş Noktası - Üretim Sunucusu
+
+Flask geliştirme sunucusu yerine üretimde kullanılacak giriş noktası.
+
+Kullanım:
+    # Waitress (Windows, Linux, macOS) - tek süreç, çok thread
+    python wsgi.py
+
+    # Gunicorn (Linux/macOS) - çok süreç, her süreçte çok thread
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+Thread ve worker sayıları config.py'deki SERVER_* ve RENDER_WORKERS
+ayarlarından okunur. Render slotları worker'lar arasında paylaştırıldığı
+için toplam eşzamanlı render sayısı RENDER_WORKERS'ı aşmaz.
+"""
+
+from app import app, config, print_startup_banner, prepare_service
+from server import serve_waitress
+
+# Gunicorn ve diğer WSGI sunucuları bu nesneyi kullanır
+application = app
+
+
+if __name__ == '__main__':
+    print_startup_banner()
+    prepare_service()
+    serve_waitress(application, config)